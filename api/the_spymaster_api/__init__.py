@@ -1 +1,2 @@
 from .client import TheSpymasterClient  # noqa
+from .client_game import apply_state_response  # noqa
@@ -8,7 +8,14 @@ from urllib3 import Retry
 from .client_classic import ClassicGameClient
 from .client_duet import DuetGameClient
 from .client_mini import MiniGameClient
-from .structs import SERVICE_ERRORS
+from .structs import (
+    SERVICE_ERRORS,
+    ListGamesRequest,
+    ListGamesResponse,
+    NextMoveBatchRequest,
+    NextMoveBatchResponse,
+    parse_response,
+)
 
 log = logging.getLogger(__name__)
 
@@ -29,5 +36,13 @@ class TheSpymasterClient(HTTPClient):
         data = self.post(endpoint="load-models/", data=request.model_dump())
         return LoadModelsResponse(**data)
 
+    def list_games(self, request: ListGamesRequest) -> ListGamesResponse:
+        data = self.get(endpoint="list/", data=request.model_dump(exclude_none=True))
+        return parse_response(ListGamesResponse, data=data, request=request)
+
+    def next_move_batch(self, request: NextMoveBatchRequest) -> NextMoveBatchResponse:
+        data = self.post(endpoint="next-move-batch/", data=request.model_dump())
+        return parse_response(NextMoveBatchResponse, data=data, request=request)
+
     def raise_error(self, request: dict):
         return self.get(endpoint="raise-error/", data=request)
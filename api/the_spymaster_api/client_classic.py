@@ -1,46 +1,49 @@
 from the_spymaster_api.structs import (
-    SERVICE_ERRORS,
+    AutoPlayRequest,
     ClueRequest,
     GetGameStateRequest,
     GuessRequest,
     NextMoveRequest,
+    parse_response,
 )
 from the_spymaster_api.structs.classic.requests import ClassicStartGameRequest
 from the_spymaster_api.structs.classic.responses import (
+    ClassicAutoPlayResponse,
     ClassicClueResponse,
     ClassicGetGameStateResponse,
     ClassicGuessResponse,
     ClassicNextMoveResponse,
     ClassicStartGameResponse,
 )
-from the_spymaster_util.http.client import DEFAULT_RETRY_STRATEGY, HTTPClient
+from the_spymaster_util.http.client import DEFAULT_RETRY_STRATEGY
 from urllib3 import Retry
 
+from .client_game import GameClient
 
-class ClassicGameClient(HTTPClient):
+
+class ClassicGameClient(GameClient):
     def __init__(self, game_api_url: str, retry_strategy: Retry | None = DEFAULT_RETRY_STRATEGY):
-        super().__init__(
-            base_url=f"{game_api_url}/classic",
-            retry_strategy=retry_strategy,
-            common_errors=SERVICE_ERRORS,
-        )
+        super().__init__(base_url=f"{game_api_url}/classic", retry_strategy=retry_strategy)
 
     def start_game(self, request: ClassicStartGameRequest) -> ClassicStartGameResponse:
         data = self.post(endpoint="start/", data=request.model_dump())
-        return ClassicStartGameResponse(**data)
+        return parse_response(ClassicStartGameResponse, data=data, request=request)
 
     def clue(self, request: ClueRequest) -> ClassicClueResponse:
         data = self.post(endpoint="clue/", data=request.model_dump())
-        return ClassicClueResponse(**data)
+        return parse_response(ClassicClueResponse, data=data, request=request)
 
     def guess(self, request: GuessRequest) -> ClassicGuessResponse:
         data = self.post(endpoint="guess/", data=request.model_dump())
-        return ClassicGuessResponse(**data)
+        return parse_response(ClassicGuessResponse, data=data, request=request)
 
     def next_move(self, request: NextMoveRequest) -> ClassicNextMoveResponse:
         data = self.post(endpoint="next-move/", data=request.model_dump())
-        return ClassicNextMoveResponse(**data)
+        return parse_response(ClassicNextMoveResponse, data=data, request=request)
+
+    def auto_play(self, request: AutoPlayRequest) -> ClassicAutoPlayResponse:
+        data = self.post(endpoint="auto-play/", data=request.model_dump())
+        return parse_response(ClassicAutoPlayResponse, data=data, request=request)
 
     def get_game_state(self, request: GetGameStateRequest) -> ClassicGetGameStateResponse:
-        data = self.get(endpoint="state/", data=request.model_dump())
-        return ClassicGetGameStateResponse(**data)
+        return self.get_conditional(endpoint="state/", request=request, response_type=ClassicGetGameStateResponse)
@@ -1,46 +1,49 @@
 from the_spymaster_api.structs import (
-    SERVICE_ERRORS,
+    AutoPlayRequest,
     ClueRequest,
     GetGameStateRequest,
     GuessRequest,
     NextMoveRequest,
+    parse_response,
 )
 from the_spymaster_api.structs.duet.requests import DuetStartGameRequest
 from the_spymaster_api.structs.duet.responses import (
+    DuetAutoPlayResponse,
     DuetClueResponse,
     DuetGetGameStateResponse,
     DuetGuessResponse,
     DuetNextMoveResponse,
     DuetStartGameResponse,
 )
-from the_spymaster_util.http.client import DEFAULT_RETRY_STRATEGY, HTTPClient
+from the_spymaster_util.http.client import DEFAULT_RETRY_STRATEGY
 from urllib3 import Retry
 
+from .client_game import GameClient
 
-class DuetGameClient(HTTPClient):
+
+class DuetGameClient(GameClient):
     def __init__(self, game_api_url: str, retry_strategy: Retry | None = DEFAULT_RETRY_STRATEGY):
-        super().__init__(
-            base_url=f"{game_api_url}/duet",
-            retry_strategy=retry_strategy,
-            common_errors=SERVICE_ERRORS,
-        )
+        super().__init__(base_url=f"{game_api_url}/duet", retry_strategy=retry_strategy)
 
     def start_game(self, request: DuetStartGameRequest) -> DuetStartGameResponse:
         data = self.post(endpoint="start/", data=request.model_dump())
-        return DuetStartGameResponse(**data)
+        return parse_response(DuetStartGameResponse, data=data, request=request)
 
     def clue(self, request: ClueRequest) -> DuetClueResponse:
         data = self.post(endpoint="clue/", data=request.model_dump())
-        return DuetClueResponse(**data)
+        return parse_response(DuetClueResponse, data=data, request=request)
 
     def guess(self, request: GuessRequest) -> DuetGuessResponse:
         data = self.post(endpoint="guess/", data=request.model_dump())
-        return DuetGuessResponse(**data)
+        return parse_response(DuetGuessResponse, data=data, request=request)
 
     def next_move(self, request: NextMoveRequest) -> DuetNextMoveResponse:
         data = self.post(endpoint="next-move/", data=request.model_dump())
-        return DuetNextMoveResponse(**data)
+        return parse_response(DuetNextMoveResponse, data=data, request=request)
+
+    def auto_play(self, request: AutoPlayRequest) -> DuetAutoPlayResponse:
+        data = self.post(endpoint="auto-play/", data=request.model_dump())
+        return parse_response(DuetAutoPlayResponse, data=data, request=request)
 
     def get_game_state(self, request: GetGameStateRequest) -> DuetGetGameStateResponse:
-        data = self.get(endpoint="state/", data=request.model_dump())
-        return DuetGetGameStateResponse(**data)
+        return self.get_conditional(endpoint="state/", request=request, response_type=DuetGetGameStateResponse)
@@ -0,0 +1,104 @@
+import json
+import logging
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from typing import Any, List, Tuple
+
+from pydantic import BaseModel
+from requests import Response
+from the_spymaster_util.http.client import DEFAULT_RETRY_STRATEGY, HTTPClient
+from urllib3 import Retry
+
+from .state_diff import apply_diff
+from .structs import SERVICE_ERRORS, BaseRequest, parse_response
+from .structs.abstract.responses import GetGameStateResponse
+
+log = logging.getLogger(__name__)
+
+
+class ETagCache:
+    """
+    The last ETag and parsed response of each request, least recently used first out.
+    """
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Any, Tuple[str, BaseModel]] = OrderedDict()
+
+    def get(self, key: Any) -> Tuple[str, BaseModel] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: Any, etag: str, response: BaseModel) -> None:
+        with self._lock:
+            self._entries[key] = (etag, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class _NotModified(Exception):
+    def __init__(self, response: Response):
+        super().__init__("Not modified")
+        self.response = response
+
+
+class GameClient(HTTPClient):
+    def __init__(self, base_url: str, retry_strategy: Retry | None = DEFAULT_RETRY_STRATEGY):
+        super().__init__(
+            base_url=base_url,
+            retry_strategy=retry_strategy,
+            common_errors=SERVICE_ERRORS,
+        )
+        self.etag_cache = ETagCache()
+
+    def get_conditional[R: BaseModel](self, endpoint: str, request: BaseRequest, response_type: type[R]) -> R:
+        """
+        GET with `If-None-Match`: when the server answers 304, the cached response is returned as is.
+        Cached responses are shared between calls, and must not be mutated.
+        """
+        data = request.model_dump(exclude_none=True)
+        key = (endpoint, json.dumps(data, sort_keys=True))
+        cached = self.etag_cache.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        responses: List[Response] = []
+
+        def get(url: str, **kwargs) -> Response:
+            # The request function `_http_call` sends with: it sees the response before the body is parsed.
+            response = self.session.get(url, **kwargs)
+            if response.status_code == HTTPStatus.NOT_MODIFIED:
+                raise _NotModified(response=response)
+            responses.append(response)
+            return response
+
+        try:
+            response_data = self._http_call(endpoint=endpoint, method=get, params=data, headers=headers)
+        except _NotModified:
+            if not cached:
+                raise
+            log.debug(f"GET {endpoint} not modified")
+            return cached[1]  # type: ignore[return-value]
+        parsed = parse_response(response_type, data=response_data, request=request)
+        etag = responses[-1].headers.get("ETag")
+        if etag:
+            self.etag_cache.set(key, etag=etag, response=parsed)
+        return parsed
+
+
+def apply_state_response[S: BaseModel](state: S | None, response: GetGameStateResponse[S]) -> S:
+    """
+    Returns the current game state out of a `get_game_state` response: the full state, when the response has one,
+    or the local `state` with the response delta applied. The local state must be of the request's `since_version`,
+    and is not modified.
+    """
+    if response.game_state is not None:
+        return response.game_state
+    if state is None or response.state_delta is None:
+        raise ValueError("The response has neither a game state nor a state delta")
+    data = apply_diff(state.model_dump(mode="json"), response.state_delta)
+    return type(state).model_validate(data)
@@ -1,46 +1,49 @@
 from the_spymaster_api.structs import (
-    SERVICE_ERRORS,
+    AutoPlayRequest,
     ClueRequest,
     GetGameStateRequest,
     GuessRequest,
     NextMoveRequest,
+    parse_response,
 )
 from the_spymaster_api.structs.mini.requests import MiniStartGameRequest
 from the_spymaster_api.structs.mini.responses import (
+    MiniAutoPlayResponse,
     MiniClueResponse,
     MiniGetGameStateResponse,
     MiniGuessResponse,
     MiniNextMoveResponse,
     MiniStartGameResponse,
 )
-from the_spymaster_util.http.client import DEFAULT_RETRY_STRATEGY, HTTPClient
+from the_spymaster_util.http.client import DEFAULT_RETRY_STRATEGY
 from urllib3 import Retry
 
+from .client_game import GameClient
 
-class MiniGameClient(HTTPClient):
+
+class MiniGameClient(GameClient):
     def __init__(self, game_api_url: str, retry_strategy: Retry | None = DEFAULT_RETRY_STRATEGY):
-        super().__init__(
-            base_url=f"{game_api_url}/mini",
-            retry_strategy=retry_strategy,
-            common_errors=SERVICE_ERRORS,
-        )
+        super().__init__(base_url=f"{game_api_url}/mini", retry_strategy=retry_strategy)
 
     def start_game(self, request: MiniStartGameRequest) -> MiniStartGameResponse:
         data = self.post(endpoint="start/", data=request.model_dump())
-        return MiniStartGameResponse(**data)
+        return parse_response(MiniStartGameResponse, data=data, request=request)
 
     def clue(self, request: ClueRequest) -> MiniClueResponse:
         data = self.post(endpoint="clue/", data=request.model_dump())
-        return MiniClueResponse(**data)
+        return parse_response(MiniClueResponse, data=data, request=request)
 
     def guess(self, request: GuessRequest) -> MiniGuessResponse:
         data = self.post(endpoint="guess/", data=request.model_dump())
-        return MiniGuessResponse(**data)
+        return parse_response(MiniGuessResponse, data=data, request=request)
 
     def next_move(self, request: NextMoveRequest) -> MiniNextMoveResponse:
         data = self.post(endpoint="next-move/", data=request.model_dump())
-        return MiniNextMoveResponse(**data)
+        return parse_response(MiniNextMoveResponse, data=data, request=request)
+
+    def auto_play(self, request: AutoPlayRequest) -> MiniAutoPlayResponse:
+        data = self.post(endpoint="auto-play/", data=request.model_dump())
+        return parse_response(MiniAutoPlayResponse, data=data, request=request)
 
     def get_game_state(self, request: GetGameStateRequest) -> MiniGetGameStateResponse:
-        data = self.get(endpoint="state/", data=request.model_dump())
-        return MiniGetGameStateResponse(**data)
+        return self.get_conditional(endpoint="state/", request=request, response_type=MiniGetGameStateResponse)
@@ -0,0 +1,83 @@
+import copy
+from typing import Any
+
+type Path = list[str | int]
+type DiffOperation = list[Any]
+
+SET = "set"
+EXTEND = "extend"
+DELETE = "del"
+
+
+def diff_state(old: Any, new: Any) -> list[DiffOperation]:
+    """
+    Computes a compact, JSON serializable list of operations that turns `old` into `new`.
+    Game states mostly grow (clues and guesses are appended) and flip a few flags (revealed cards, turn fields),
+    so lists are diffed by index and appended items are recorded once, instead of re-recording the whole list.
+    """
+    return _diff(old, new, path=[])
+
+
+def apply_diff(data: Any, operations: list[DiffOperation]) -> Any:
+    """
+    Applies operations created by `diff_state` on a copy of `data`, and returns the copy.
+    """
+    result = copy.deepcopy(data)
+    for operation in operations:
+        result = _apply_operation(result, operation)
+    return result
+
+
+def _diff(old: Any, new: Any, path: Path) -> list[DiffOperation]:
+    if isinstance(old, dict) and isinstance(new, dict):
+        return _diff_dicts(old, new, path=path)
+    if isinstance(old, list) and isinstance(new, list) and len(new) >= len(old):
+        return _diff_lists(old, new, path=path)
+    if type(old) is type(new) and old == new:
+        return []
+    return [[SET, path, new]]
+
+
+def _diff_dicts(old: dict, new: dict, path: Path) -> list[DiffOperation]:
+    operations: list[DiffOperation] = []
+    for key, value in new.items():
+        if key not in old:
+            operations.append([SET, [*path, key], value])
+            continue
+        operations.extend(_diff(old[key], value, path=[*path, key]))
+    for key in old.keys() - new.keys():
+        operations.append([DELETE, [*path, key]])
+    return operations
+
+
+def _diff_lists(old: list, new: list, path: Path) -> list[DiffOperation]:
+    operations: list[DiffOperation] = []
+    for i, (old_item, new_item) in enumerate(zip(old, new[: len(old)], strict=True)):
+        operations.extend(_diff(old_item, new_item, path=[*path, i]))
+    if len(new) > len(old):
+        operations.append([EXTEND, path, new[len(old) :]])
+    return operations
+
+
+def _apply_operation(data: Any, operation: DiffOperation) -> Any:
+    action, path = operation[0], operation[1]
+    if not path:
+        if action == SET:
+            return operation[2]
+        if action == EXTEND:
+            data.extend(operation[2])
+            return data
+        raise ValueError(f"Cannot apply [{action}] on the diff root")
+    container = data
+    for key in path[:-1]:
+        container = container[key]
+    last_key = path[-1]
+    if action == SET:
+        container[last_key] = operation[2]
+    elif action == EXTEND:
+        container[last_key].extend(operation[2])
+    elif action == DELETE:
+        del container[last_key]
+    else:
+        raise ValueError(f"Unknown diff action [{action}]")
+    return data
@@ -8,7 +8,11 @@ class StartGameResponse[StateType](BaseModel):
 
 
 class GetGameStateResponse[StateType](BaseModel):
-    game_state: StateType
+    # Requests with `since_version` get `state_delta` instead of `game_state`, unless the delta is not available.
+    # Either way, pass the response to `apply_state_response` to get the current state.
+    game_state: StateType | None = None
+    version: int | None = None
+    state_delta: list[list] | None = None
 
 
 class ClueResponse[StateType, ClueType](BaseModel):
@@ -27,3 +31,15 @@ class NextMoveResponse[StateType, ClueType, GuessType](BaseModel):
     given_clue: ClueType | None = None
     given_guess: GuessType | None = None
     used_model_identifier: APIModelIdentifier | None = None
+
+
+class PlayedMove[ClueType, GuessType](BaseModel):
+    used_solver: Solver
+    given_clue: ClueType | None = None
+    given_guess: GuessType | None = None
+    used_model_identifier: APIModelIdentifier | None = None
+
+
+class AutoPlayResponse[StateType, ClueType, GuessType](BaseModel):
+    game_state: StateType
+    moves: list[PlayedMove[ClueType, GuessType]]
@@ -1,6 +1,7 @@
 from codenames.classic.state import ClassicGameState
 from codenames.classic.types import ClassicGivenClue, ClassicGivenGuess
 from the_spymaster_api.structs.abstract.responses import (
+    AutoPlayResponse,
     ClueResponse,
     GetGameStateResponse,
     GuessResponse,
@@ -27,3 +28,7 @@ class ClassicGuessResponse(GuessResponse[ClassicGameState, ClassicGivenGuess]):
 
 class ClassicNextMoveResponse(NextMoveResponse[ClassicGameState, ClassicGivenClue, ClassicGivenGuess]):
     pass
+
+
+class ClassicAutoPlayResponse(AutoPlayResponse[ClassicGameState, ClassicGivenClue, ClassicGivenGuess]):
+    pass
@@ -1,6 +1,7 @@
 from codenames.duet.state import DuetGameState
 from codenames.duet.types import DuetGivenClue, DuetGivenGuess
 from the_spymaster_api.structs.abstract.responses import (
+    AutoPlayResponse,
     ClueResponse,
     GetGameStateResponse,
     GuessResponse,
@@ -27,3 +28,7 @@ class DuetGuessResponse(GuessResponse[DuetGameState, DuetGivenGuess]):
 
 class DuetNextMoveResponse(NextMoveResponse[DuetGameState, DuetGivenClue, DuetGivenGuess]):
     pass
+
+
+class DuetAutoPlayResponse(AutoPlayResponse[DuetGameState, DuetGivenClue, DuetGivenGuess]):
+    pass
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from http import HTTPStatus
+from typing import Optional
 
 from codenames.generic.exceptions import GameRuleError
-from the_spymaster_util.http.errors import BadRequestError, NotFoundError
+from the_spymaster_util.http.errors import APIError, BadRequestError, NotFoundError
 
 
 class APIGameRuleError(BadRequestError):
@@ -22,4 +23,39 @@ class GameDoesNotExistError(NotFoundError):
         return cls(message=f"Game {game_id} does not exist", data={"game_id": game_id})
 
 
-SERVICE_ERRORS = frozenset({GameDoesNotExistError, APIGameRuleError})
+class GameVersionConflictError(BadRequestError):
+    def __init__(
+        self,
+        *,
+        message: str,
+        http_status: HTTPStatus = HTTPStatus.CONFLICT,
+        data: Optional[dict] = None,
+        **kwargs,
+    ):
+        super().__init__(message=message, http_status=http_status, data=data, **kwargs)
+
+    @classmethod
+    def create(cls, game_id: str, expected_version: Optional[int]) -> GameVersionConflictError:
+        return cls(
+            message=f"Game {game_id} was modified concurrently, please retry",
+            data={"game_id": game_id, "expected_version": expected_version},
+        )
+
+
+class SolverTimeoutError(APIError):
+    def __init__(
+        self,
+        *,
+        message: str,
+        http_status: HTTPStatus = HTTPStatus.GATEWAY_TIMEOUT,
+        data: Optional[dict] = None,
+        **kwargs,
+    ):
+        super().__init__(message=message, http_status=http_status, data=data, **kwargs)
+
+    @classmethod
+    def create(cls, solver: str) -> SolverTimeoutError:
+        return cls(message=f"Solver {solver} did not answer in time, please retry", data={"solver": solver})
+
+
+SERVICE_ERRORS = frozenset({GameDoesNotExistError, GameVersionConflictError, APIGameRuleError, SolverTimeoutError})
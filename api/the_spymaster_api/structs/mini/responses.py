@@ -1,6 +1,7 @@
 from codenames.duet.types import DuetGivenClue, DuetGivenGuess
 from codenames.mini.state import MiniGameState
 from the_spymaster_api.structs.abstract.responses import (
+    AutoPlayResponse,
     ClueResponse,
     GetGameStateResponse,
     GuessResponse,
@@ -27,3 +28,7 @@ class MiniGuessResponse(GuessResponse[MiniGameState, DuetGivenGuess]):
 
 class MiniNextMoveResponse(NextMoveResponse[MiniGameState, DuetGivenClue, DuetGivenGuess]):
     pass
+
+
+class MiniAutoPlayResponse(AutoPlayResponse[MiniGameState, DuetGivenClue, DuetGivenGuess]):
+    pass
@@ -1,6 +1,7 @@
+from enum import Enum
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_serializer, field_validator
 from the_spymaster_solvers_api.structs.base import APIModelIdentifier, Solver
 
 
@@ -10,11 +11,44 @@ class BaseRequest(BaseModel):
         fields = {"drf_request": {"exclude": True}}
         arbitrary_types_allowed = True
 
+    # Response projection: the top level response fields to return (all by default), and whether to return the
+    # game state. Projected responses are parsed by the clients without their missing fields.
+    fields: Optional[List[str]] = None
+    include_state: bool = True
+
     @property
     def preforming_user(self):
         drf_request = getattr(self, "drf_request", None)
         return drf_request.user if drf_request else None
 
+    @property
+    def is_projected(self) -> bool:
+        return self.fields is not None or not self.include_state
+
+    def get_response_include(self) -> set[str] | None:
+        return set(self.fields) if self.fields is not None else None
+
+    def get_response_exclude(self) -> set[str] | None:
+        return None if self.include_state else {"game_state"}
+
+    @field_validator("fields", mode="before")
+    @classmethod
+    def _split_fields(cls, value):
+        # Query params carry the fields as a single comma separated value.
+        if isinstance(value, str):
+            return [field for field in value.split(",") if field]
+        return value
+
+    @field_serializer("fields")
+    def _join_fields(self, value: Optional[List[str]]) -> Optional[str]:
+        return ",".join(value) if value is not None else None
+
+
+class GameType(str, Enum):
+    CLASSIC = "classic"
+    DUET = "duet"
+    MINI = "mini"
+
 
 class ClueRequest(BaseRequest):
     game_id: str
@@ -30,9 +64,30 @@ class GuessRequest(BaseRequest):
 
 class GetGameStateRequest(BaseRequest):
     game_id: str
+    # The version of the caller's state: only the changes since it are returned, when they are available
+    # (the service keeps them only for games stored as a move log, otherwise the full state is returned).
+    since_version: int | None = None
 
 
 class NextMoveRequest(BaseRequest):
     game_id: str
     solver: Solver = Solver.NAIVE
     model_identifier: APIModelIdentifier | None = None
+
+
+class AutoPlayRequest(NextMoveRequest):
+    max_moves: int = Field(default=100, ge=1, le=200)
+    # Also saves the game every `save_every` moves, None saves it only once, after the last move.
+    save_every: int | None = Field(default=None, ge=1)
+
+
+class NextMoveBatchRequest(BaseRequest):
+    game_type: GameType
+    game_ids: List[str] = Field(min_length=1, max_length=100)
+    solver: Solver = Solver.NAIVE
+    model_identifier: APIModelIdentifier | None = None
+
+
+class ListGamesRequest(BaseRequest):
+    limit: int = Field(default=20, ge=1, le=100)
+    cursor: str | None = None
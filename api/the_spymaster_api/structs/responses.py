@@ -1,6 +1,10 @@
+from functools import lru_cache
 from typing import Any, Union
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+
+from .abstract.responses import PlayedMove
+from .requests import BaseRequest, GameType
 
 
 class HttpResponse(BaseModel):
@@ -19,3 +23,50 @@ class ErrorResponse(BaseModel):
     message: str | None
     details: Any
     model_config = ConfigDict(extra="allow")
+
+
+class GameSummary(BaseModel):
+    game_id: str
+    game_type: GameType
+    updated_ts: float
+
+
+class ListGamesResponse(BaseModel):
+    games: list[GameSummary]
+    next_cursor: str | None = None
+
+
+class NextMoveBatchResult(BaseModel):
+    game_id: str
+    # Set when the move was played and saved.
+    move: PlayedMove[dict, dict] | None = None
+    version: int | None = None
+    is_game_over: bool | None = None
+    # Set otherwise: the error payload the game's `next-move` endpoint would have answered with.
+    error: dict | None = None
+
+
+class NextMoveBatchResponse(BaseModel):
+    # In the order of the requested game ids.
+    results: list[NextMoveBatchResult]
+
+
+def parse_response[R: BaseModel](response_type: type[R], data: dict, request: BaseRequest) -> R:
+    """
+    Parses a response of the request. Fields that were projected out of the response are left unset
+    (accessing them raises AttributeError).
+    """
+    if not request.is_projected:
+        return response_type.model_validate(data)
+    values = {
+        name: _get_field_adapter(response_type, name).validate_python(data[name])
+        for name in response_type.model_fields
+        if name in data
+    }
+    return response_type.model_construct(**values)
+
+
+@lru_cache(maxsize=None)
+def _get_field_adapter(response_type: type[BaseModel], name: str) -> TypeAdapter:
+    # Building an adapter compiles a validator, which costs more than the validation itself.
+    return TypeAdapter(response_type.model_fields[name].rebuild_annotation())
@@ -1,5 +1,11 @@
 from mangum import Mangum
 
+from server.logic.move_cache import start_invocation
 from the_spymaster.asgi import application
 
-handle = Mangum(application, lifespan="off")
+_mangum = Mangum(application, lifespan="off")
+
+
+def handle(event, context):
+    start_invocation()
+    return _mangum(event, context)
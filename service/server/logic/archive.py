@@ -0,0 +1,134 @@
+import json
+from dataclasses import asdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Protocol
+from urllib.parse import urlparse
+
+import boto3
+import ulid
+from botocore.exceptions import ClientError
+from the_spymaster_util.logger import get_logger
+
+from server.logic.cache import LRUCache
+from server.logic.codecs import get_state_codec
+from server.logic.stores import GameSnapshot
+from the_spymaster.config import get_config
+
+log = get_logger(__name__)
+
+ARCHIVE_CODEC = "json+lzma"
+
+
+class ArchiveBackend(Protocol):
+    def put(self, key: str, data: bytes) -> None: ...
+
+    def get(self, key: str) -> bytes | None: ...
+
+
+class LocalArchiveBackend:
+    def __init__(self, root: Path):
+        self.root = root
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_bytes(data)
+        temp_path.replace(path)
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            return (self.root / key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+
+class S3ArchiveBackend:
+    """
+    Works with any S3-compatible object storage, given its `endpoint_url`.
+    """
+
+    def __init__(self, bucket: str, prefix: str, endpoint_url: str | None = None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+
+    def put(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self._get_key(key), Body=data)
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._get_key(key))
+        except ClientError as e:  # pylint: disable=invalid-name
+            if e.response.get("Error", {}).get("Code") == "NoSuchKey":
+                return None
+            raise
+        return response["Body"].read()
+
+    def _get_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+
+class GameArchive:
+    """
+    Games are archived in compressed batches, one object per batch, and each game points to its latest batch.
+    Rehydrating a game costs two object reads, and the decoded batches are cached, as games that were
+    archived together are often rehydrated together.
+    """
+
+    def __init__(self, backend: ArchiveBackend):
+        self.backend = backend
+        self.codec = get_state_codec(ARCHIVE_CODEC)
+        self._batches: LRUCache[str, Dict[str, dict]] = LRUCache(max_size=8, ttl=600)
+
+    def archive(self, snapshots: Dict[str, GameSnapshot]) -> str:
+        batch_key = f"batches/{ulid.new().str.lower()}"
+        batch = {game_id: asdict(snapshot) for game_id, snapshot in snapshots.items()}
+        self.backend.put(batch_key, self.codec.encode(batch))
+        for game_id in snapshots:
+            pointer = {"batch_key": batch_key}
+            self.backend.put(_get_pointer_key(game_id), json.dumps(pointer).encode())
+        log.info(f"Archived [{len(snapshots)}] games to [{batch_key}]")
+        return batch_key
+
+    def load(self, game_id: str) -> GameSnapshot | None:
+        pointer_data = self.backend.get(_get_pointer_key(game_id))
+        if pointer_data is None:
+            return None
+        batch_key = json.loads(pointer_data)["batch_key"]
+        batch = self._batches.get(batch_key)
+        if batch is None:
+            batch_data = self.backend.get(batch_key)
+            if batch_data is None:
+                log.warning(f"Archive batch [{batch_key}] of game [{game_id}] is missing")
+                return None
+            batch = self.codec.decode(batch_data)
+            self._batches.set(batch_key, batch)
+        snapshot_data = batch.get(game_id)
+        return GameSnapshot(**snapshot_data) if snapshot_data else None
+
+
+@lru_cache()
+def get_game_archive() -> GameArchive | None:
+    """
+    Returns None when archiving is not configured.
+    """
+    archive_url = get_config().game_archive_url
+    if not archive_url:
+        return None
+    parsed_url = urlparse(archive_url)
+    if parsed_url.scheme == "s3":
+        endpoint_url = get_config().game_archive_endpoint_url
+        backend: ArchiveBackend = S3ArchiveBackend(
+            bucket=parsed_url.netloc, prefix=parsed_url.path.strip("/"), endpoint_url=endpoint_url
+        )
+    elif parsed_url.scheme == "file":
+        backend = LocalArchiveBackend(root=Path(parsed_url.netloc + parsed_url.path))
+    else:
+        raise ValueError(f"Unsupported game archive url [{archive_url}], expected s3:// or file://")
+    return GameArchive(backend=backend)
+
+
+def _get_pointer_key(game_id: str) -> str:
+    return f"games/{game_id}.json"
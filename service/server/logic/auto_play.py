@@ -0,0 +1,60 @@
+import time
+from typing import Any, List
+
+from the_spymaster_api.structs import AutoPlayRequest, SolverTimeoutError
+from the_spymaster_api.structs.abstract.responses import NextMoveResponse
+from the_spymaster_util.logger import get_logger
+
+from server.logic.db import save_game
+from server.logic.next_move import NextMoveHandler
+from server.models.game import Game
+
+log = get_logger(__name__)
+
+
+def auto_play_game(
+    game: Game[Any], handler_type: type[NextMoveHandler], request: AutoPlayRequest, deadline: float | None = None
+) -> List[NextMoveResponse]:
+    """
+    Plays the game's next moves in memory, until the game is over, `max_moves` moves were played, or the deadline
+    (a `time.monotonic` timestamp) passed.
+    The game is saved once after the last move (and every `save_every` moves, if set), rather than after every move.
+    A version conflict is raised as is: the moves that were saved before it are kept.
+    """
+    game_state = game.state
+    played: List[NextMoveResponse] = []
+    unsaved_moves = 0
+    while len(played) < request.max_moves and not game_state.is_game_over:
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        handler = handler_type(
+            game_id=game.id,
+            game_state=game_state,
+            solver=request.solver,
+            model_identifier=request.model_identifier,
+            deadline=deadline,
+        )
+        try:
+            played.append(handler.handle())
+        except SolverTimeoutError:
+            # Out of time: the moves that were played are saved, and the caller may continue from them.
+            log.warning(f"Solvers did not answer in time, stopping auto play of game [{game.id}]")
+            break
+        unsaved_moves += 1
+        if request.save_every and unsaved_moves >= request.save_every:
+            _save(game=game, game_state=game_state)
+            unsaved_moves = 0
+    if unsaved_moves:
+        _save(game=game, game_state=game_state)
+    log.info(f"Auto played [{len(played)}] moves in game [{game.id}]", extra={"is_game_over": game_state.is_game_over})
+    return played
+
+
+def _save(game: Game[Any], game_state: Any) -> None:
+    game.set_state(game_state)
+    save_game(game)
+
+
+def to_played_moves(played: List[NextMoveResponse]) -> List[dict]:
+    # The played move fields of each response, without the (shared) game state.
+    return [{name: value for name, value in move if name != "game_state"} for move in played]
@@ -0,0 +1,27 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Callable, Iterable, List, Sequence
+
+
+def chunked[T](items: Sequence[T], size: int) -> List[Sequence[T]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def map_concurrently[T, R](func: Callable[[T], R], items: Iterable[T], max_workers: int) -> List[R]:
+    """
+    Like `map`, on a thread pool. Results keep the order of `items`, and the first raised error is re-raised.
+    Each item runs in a copy of the caller's context, so context variables (like the request's dump scope) are set.
+    """
+    items = list(items)
+    if len(items) <= 1 or max_workers <= 1:
+        return [func(item) for item in items]
+    contexts = [copy_context() for _ in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(lambda context, item: context.run(func, item), contexts, items))
+
+
+def backoff_sleep(attempt: int, base_backoff_ms: int) -> None:
+    # Full jitter: concurrent retries of throttled requests should not be synchronized.
+    time.sleep(random.uniform(0, base_backoff_ms * 2**attempt) / 1000)
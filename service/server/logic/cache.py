@@ -0,0 +1,106 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+from threading import RLock
+from typing import Callable
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hit_rate, 3),
+        }
+
+
+@dataclass
+class _CacheEntry[V]:
+    value: V
+    expire_ts: float
+
+
+class LRUCache[K: Hashable, V]:
+    """
+    Thread safe, size bounded, least-recently-used cache with a per-entry TTL.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        """
+        :param max_size: Maximal amount of entries kept, the least recently used entry is evicted first.
+        :param ttl: Time to live for each entry, in seconds.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries: OrderedDict[K, _CacheEntry[V]] = OrderedDict()
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry.expire_ts >= time.time()
+
+    def get(self, key: K, validator: Callable[[V], bool] | None = None) -> V | None:
+        """
+        :param validator: Optional freshness check, a cached value that fails it is dropped and counted as stale.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            if entry.expire_ts < time.time():
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        if validator is not None and not validator(entry.value):
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+                self.stats.stale += 1
+                self.stats.misses += 1
+            return None
+        with self._lock:
+            self.stats.hits += 1
+        return entry.value
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._entries[key] = _CacheEntry(value=value, expire_ts=time.time() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,104 @@
+import abc
+import json
+import lzma
+import zlib
+from typing import Dict
+
+# Keys and values that repeat in every serialized game state.
+# The dictionary primes the compressor, which matters a lot for payloads of only a few KBs.
+# Changing it breaks decoding of stored data: add a new codec with a new dictionary instead.
+_STATE_ZDICT_V1 = json.dumps(
+    [
+        {"word": "", "color": "NEUTRAL", "revealed": False, "formatted_word": ""},
+        {"word": "", "color": "BLUE", "revealed": True, "formatted_word": ""},
+        {"word": "", "color": "RED", "revealed": False, "formatted_word": ""},
+        {"word": "", "color": "GREEN", "revealed": False, "formatted_word": ""},
+        {"word": "", "color": "ASSASSIN", "revealed": False, "formatted_word": ""},
+        {"word": "", "color": "IRRELEVANT", "revealed": False, "formatted_word": ""},
+        {"guessed_card": {}, "for_clue": {"word": "", "card_amount": 2, "team": "BLUE"}},
+        {"guessed_card": {}, "for_clue": {"word": "", "card_amount": 1, "team": "RED"}},
+        {"word": "", "card_amount": 1, "for_words": None},
+        {"word": "", "card_amount": 1, "team": "MAIN"},
+        {"board": {"language": "english", "cards": []}, "score": {"blue": {"total": 9, "revealed": 0}}},
+        {"red": {"total": 8, "revealed": 0}, "current_team": "BLUE", "current_player_role": "SPYMASTER"},
+        {"current_player_role": "OPERATIVE", "left_guesses": 0, "winner": None, "game_result": None},
+        {"given_clues": [], "given_guesses": [], "clues": [], "dual_given_words": [], "dual_state": None},
+        {"side_a": {}, "side_b": {}, "current_playing_side": "SIDE_A", "timer_tokens": 9, "allowed_mistakes": 9},
+        {"score": {"main": {"total": 9, "revealed": 0}}, "win": False, "reason": "", "team": "RED"},
+    ],
+    separators=(",", ":"),
+).encode()
+
+
+class StateCodec(abc.ABC):
+    name: str
+
+    @abc.abstractmethod
+    def encode(self, state_data: dict) -> bytes: ...
+
+    @abc.abstractmethod
+    def decode(self, blob: bytes) -> dict: ...
+
+
+class JsonCodec(StateCodec):
+    name = "json"
+
+    def encode(self, state_data: dict) -> bytes:
+        return _dump_json(state_data)
+
+    def decode(self, blob: bytes) -> dict:
+        return json.loads(blob)
+
+
+class ZlibJsonCodec(StateCodec):
+    name = "json+zlib"
+
+    def encode(self, state_data: dict) -> bytes:
+        return zlib.compress(_dump_json(state_data), level=6)
+
+    def decode(self, blob: bytes) -> dict:
+        return json.loads(zlib.decompress(blob))
+
+
+class ZlibDictJsonCodec(StateCodec):
+    """
+    Raw deflate, primed with a dictionary of the repeating game state structure.
+    """
+
+    name = "json+zlib-dict-v1"
+
+    def encode(self, state_data: dict) -> bytes:
+        compressor = zlib.compressobj(level=9, wbits=-15, zdict=_STATE_ZDICT_V1)
+        return compressor.compress(_dump_json(state_data)) + compressor.flush()
+
+    def decode(self, blob: bytes) -> dict:
+        decompressor = zlib.decompressobj(wbits=-15, zdict=_STATE_ZDICT_V1)
+        return json.loads(decompressor.decompress(blob) + decompressor.flush())
+
+
+class LzmaJsonCodec(StateCodec):
+    name = "json+lzma"
+
+    def encode(self, state_data: dict) -> bytes:
+        return lzma.compress(_dump_json(state_data), format=lzma.FORMAT_RAW, filters=_LZMA_FILTERS)
+
+    def decode(self, blob: bytes) -> dict:
+        return json.loads(lzma.decompress(blob, format=lzma.FORMAT_RAW, filters=_LZMA_FILTERS))
+
+
+_LZMA_FILTERS = [{"id": lzma.FILTER_LZMA2, "preset": 6}]
+
+STATE_CODECS: Dict[str, StateCodec] = {
+    codec.name: codec for codec in (JsonCodec(), ZlibJsonCodec(), ZlibDictJsonCodec(), LzmaJsonCodec())
+}
+
+
+def get_state_codec(name: str) -> StateCodec:
+    try:
+        return STATE_CODECS[name]
+    except KeyError as e:  # pylint: disable=invalid-name
+        raise ValueError(f"Unknown state codec [{name}], supported codecs: {list(STATE_CODECS)}") from e
+
+
+def _dump_json(data: dict) -> bytes:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
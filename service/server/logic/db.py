@@ -1,49 +1,439 @@
+import base64
+import binascii
+import functools
+import json
+import threading
 import time
-from typing import Any, Dict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
 
-from pynamodb.attributes import JSONAttribute, NumberAttribute, UnicodeAttribute
-from pynamodb.exceptions import DoesNotExist as PynamoDoesNotExist
-from pynamodb.models import Model
-from the_spymaster_api.structs import GameDoesNotExistError
+from the_spymaster_api.state_diff import apply_diff, diff_state
+from the_spymaster_api.structs import GameDoesNotExistError, GameVersionConflictError
+from the_spymaster_util.http.errors import BadRequestError
+from the_spymaster_util.logger import get_logger
 
+from server.logic.archive import get_game_archive
+from server.logic.batching import chunked, map_concurrently
+from server.logic.cache import CacheStats, LRUCache
+from server.logic.stores import (
+    GameListing,
+    GameSnapshot,
+    GameStorageMode,
+    GameStoreConflictError,
+    ReadConsistency,
+    get_game_store,
+)
 from server.models.game import Game
 from the_spymaster.config import get_config
 
+log = get_logger(__name__)
 config = get_config()
 
 
-def get_game_item_id(game_id: str) -> str:
-    return f"game::{game_id}"
+@dataclass
+class CachedGame:
+    state_data: dict
+    version: int | None
+    snapshot_version: int | None
+    owner: str | None = None
+    # When the entry was last known to match the store (a `time.monotonic` timestamp).
+    validated_ts: float = field(default_factory=time.monotonic)
 
 
-class GameItem(Model):
-    class Meta:
-        table_name = config.game_items_table_name
-        host = config.dynamo_db_host
+@dataclass
+class GameCacheReadStats:
+    """
+    How cache hits were served. A validated hit still reads the game's version markers from the store (a DynamoDB
+    GetItem is billed by the full item size, so it costs as much as loading the game), and only saves the transfer,
+    decoding and replay of the state. Only hits within the opt-in `game_cache_validate_after` window save reads.
+    """
 
-    item_id = UnicodeAttribute(hash_key=True)
-    state_data = JSONAttribute(null=True)
-    updated_ts = NumberAttribute()
+    reads_saved: int = 0
+    validated_hits: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
 
-    def save(self, *args, **kwargs) -> Dict[str, Any]:
-        self.updated_ts = int(time.time())
-        return super().save(*args, **kwargs)
+    def record(self, reads_saved: int = 0, validated_hits: int = 0) -> None:
+        with self._lock:
+            self.reads_saved += reads_saved
+            self.validated_hits += validated_hits
 
-    @classmethod
-    def load(cls, game_id: str, *args, **kwargs) -> "GameItem":
-        hash_key = get_game_item_id(game_id=game_id)
-        return super().get(*args, hash_key=hash_key, **kwargs)  # type: ignore
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {"reads_saved": self.reads_saved, "validated_hits": self.validated_hits}
 
 
-def load_game[T: Game](game_id: str, game_type: type[T]) -> T:
-    try:
-        game_item = GameItem.load(game_id=game_id)
-    except PynamoDoesNotExist as e:  # pylint: disable=invalid-name
-        raise GameDoesNotExistError.create(game_id=game_id) from e
-    return game_type(id=game_id, state_data=game_item.state_data)
+@lru_cache()
+def get_game_cache() -> LRUCache[str, CachedGame]:
+    return LRUCache(max_size=config.game_cache_max_size, ttl=config.game_cache_ttl)
+
+
+def get_game_cache_stats() -> CacheStats:
+    return get_game_cache().stats
+
+
+@lru_cache()
+def get_game_cache_read_stats() -> GameCacheReadStats:
+    return GameCacheReadStats()
+
+
+def get_storage_mode() -> GameStorageMode:
+    return GameStorageMode(config.game_storage_mode)
+
+
+def load_game[T: Game](game_id: str, game_type: type[T], consistency: ReadConsistency = ReadConsistency.STRONG) -> T:
+    """
+    Games that are about to be modified must be loaded with STRONG consistency (the default).
+    Read-only flows may use EVENTUAL consistency, and get a slightly stale state at half the read cost.
+    A cached game is served only after its version is checked against the store. `game_cache_validate_after` opts in
+    to serving it unchecked for that many seconds after the last check. Within that window, a game written by another
+    process may be served stale (including to read-only flows): a save of it then fails the version check, which
+    drops it from the cache (and `retry_on_conflict` reloads it).
+    """
+    cache = get_game_cache()
+    validator = functools.partial(_is_fresh, game_id, consistency=consistency)
+    cached_game = cache.get(game_id, validator=validator)
+    if cached_game:
+        log.debug(f"Game [{game_id}] served from cache", extra={"cache_stats": _get_cache_stats()})
+    else:
+        cached_game = _load_stored_game(game_id=game_id, consistency=consistency)
+        cache.set(game_id, cached_game)
+        log.debug(f"Game [{game_id}] loaded from db", extra={"cache_stats": _get_cache_stats()})
+    return game_type(
+        id=game_id,
+        state_data=cached_game.state_data,
+        owner=cached_game.owner,
+        version=cached_game.version,
+        snapshot_version=cached_game.snapshot_version,
+        loaded_state_data=cached_game.state_data,
+    )
 
 
 def save_game(game: Game[Any]) -> None:
-    item_id = get_game_item_id(game_id=game.id)
-    game_item = GameItem(item_id=item_id, state_data=game.state_data)
-    game_item.save()
+    """
+    Saves the game only if it was not modified since it was loaded (or, for a new game, if it does not exist yet).
+    On success, the game's version is bumped. A game that was not modified since it was loaded is not written.
+
+    :raises GameVersionConflictError: If the stored game version does not match the loaded one.
+    """
+    if game.version is not None and not game.is_modified:
+        log.debug(f"Game [{game.id}] was not modified, skipping save")
+        return
+    game.dump_state()
+    new_version = (game.version or 0) + 1
+    if _should_append_move(game=game, new_version=new_version):
+        _append_game_move(game=game, new_version=new_version)
+    else:
+        if _has_move_log(game=game):
+            # The snapshot is only checked against the snapshot it replaces, so a concurrent writer of the same
+            # version could still append its move. Writing the move first makes one of the two writes conflict.
+            _append_game_move(game=game, new_version=new_version)
+        superseded_versions = range((game.snapshot_version or 0) + 1, new_version + 1)
+        _save_game_snapshot(game=game, new_version=new_version)
+        game.snapshot_version = new_version
+        _expire_superseded_moves(game_id=game.id, versions=superseded_versions)
+    game.version = new_version
+    game.mark_saved()
+    cached_game = CachedGame(
+        state_data=game.state_data,
+        version=game.version,
+        snapshot_version=game.snapshot_version,
+        owner=game.owner,
+    )
+    get_game_cache().set(game.id, cached_game)
+
+
+def load_games[T: Game](
+    game_ids: Sequence[str], game_type: type[T], consistency: ReadConsistency = ReadConsistency.STRONG
+) -> Dict[str, T]:
+    """
+    Bulk `load_game`, for tooling that touches many games. Games that do not exist are omitted from the result.
+    The cache is neither used nor filled, so bulk reads do not evict the games that are being played.
+    """
+    snapshots = get_game_store().load_snapshots(game_ids=game_ids, consistency=consistency)
+
+    def rebuild(item: tuple[str, GameSnapshot]) -> T:
+        game_id, snapshot = item
+        stored_game = _rebuild_stored_game(game_id=game_id, snapshot=snapshot, consistency=consistency)
+        return game_type(
+            id=game_id,
+            state_data=stored_game.state_data,
+            owner=stored_game.owner,
+            version=stored_game.version,
+            snapshot_version=stored_game.snapshot_version,
+            loaded_state_data=stored_game.state_data,
+        )
+
+    games = map_concurrently(rebuild, snapshots.items(), max_workers=config.game_batch_max_workers)
+    return {game.id: game for game in games}
+
+
+def save_games(games: Sequence[Game[Any]]) -> None:
+    """
+    Bulk `save_game`, for tooling that touches many games, such as migrations.
+    Batch writes cannot be conditional, so unlike `save_game`, concurrent changes to the same games are overwritten.
+    Every game is written as a snapshot, which also compacts move logs.
+    """
+    snapshots = {game.id: _to_snapshot(game=game, version=(game.version or 0) + 1) for game in games}
+    if len(snapshots) != len(games):
+        raise ValueError("Each game can be saved only once in a batch")
+    superseded_versions = {game.id: range((game.snapshot_version or 0) + 1, (game.version or 0) + 1) for game in games}
+    get_game_store().save_snapshots(snapshots=snapshots)
+    cache = get_game_cache()
+    for game in games:
+        game.version = game.snapshot_version = snapshots[game.id].version
+        _expire_superseded_moves(game_id=game.id, versions=superseded_versions[game.id])
+        game.mark_saved()
+        cache.invalidate(game.id)
+
+
+def archive_expiring_games(lead_time: float, batch_size: int) -> int:
+    """
+    Copies games that expire within `lead_time` seconds to the archive, so they can be rehydrated after the store
+    deletes them. Returns the amount of archived games.
+    """
+    archive = get_game_archive()
+    if archive is None:
+        raise ValueError("Game archive is not configured (game_archive_url)")
+    store = get_game_store()
+    game_ids = list(store.iter_expiring_game_ids(expire_before=time.time() + lead_time))
+    for chunk in chunked(game_ids, size=batch_size):
+        snapshots = store.load_snapshots(game_ids=chunk)
+        archived_snapshots = {}
+        for game_id, snapshot in snapshots.items():
+            stored_game = _rebuild_stored_game(game_id=game_id, snapshot=snapshot, consistency=ReadConsistency.STRONG)
+            archived_snapshots[game_id] = GameSnapshot(
+                version=stored_game.version,
+                storage_mode=GameStorageMode.FULL.value,
+                state_data=stored_game.state_data,
+                expire_ts=snapshot.expire_ts,
+                owner=snapshot.owner,
+                game_type=snapshot.game_type,
+            )
+        archive.archive(snapshots=archived_snapshots)
+        for game_id, snapshot in snapshots.items():
+            store.mark_archived(game_id=game_id, version=snapshot.version)
+    return len(game_ids)
+
+
+def list_games(owner: str, limit: int, cursor: str | None = None) -> Tuple[List[GameListing], str | None]:
+    """
+    Lists the owner's games, most recently saved first. Pass the returned cursor to get the next page
+    (None means there are no more games). A page may be empty even if the previous one returned a cursor.
+
+    :raises BadRequestError: If the cursor is malformed.
+    """
+    page = get_game_store().list_owner_games(owner=owner, limit=limit, cursor=_decode_cursor(cursor))
+    next_cursor = _encode_cursor(page.next_cursor) if page.next_cursor else None
+    return page.listings, next_cursor
+
+
+def load_state_delta(
+    game: Game[Any], since_version: int, consistency: ReadConsistency = ReadConsistency.EVENTUAL
+) -> List[list] | None:
+    """
+    Returns the diff operations that turn the game state of `since_version` into the game's state, from the move log.
+    Returns None if the moves are not available: the game is not stored as a move log, a snapshot was written since
+    `since_version`, or `since_version` is not a version of the game.
+    """
+    if game.version is None or since_version < 0 or since_version > game.version:
+        return None
+    if since_version == game.version:
+        return []
+    # Moves up to the snapshot the game was rebuilt from may be left over from writes that lost to a snapshot.
+    if game.snapshot_version is not None and since_version < game.snapshot_version:
+        return None
+    versions = range(since_version + 1, game.version + 1)
+    deltas = get_game_store().load_moves(game_id=game.id, versions=versions, consistency=consistency)
+    if len(deltas) != len(versions):
+        return None
+    return [operation for version in versions for operation in deltas[version]]
+
+
+def retry_on_conflict[**P, R](func: Callable[P, R]) -> Callable[P, R]:
+    """
+    Re-runs a whole load-modify-save flow when the save loses an optimistic concurrency race.
+    The flow must load the game itself, so every attempt is applied on top of the latest stored state.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        retries = config.game_save_conflict_retries
+        for attempt in range(retries):
+            try:
+                return func(*args, **kwargs)
+            except GameVersionConflictError as e:  # pylint: disable=invalid-name
+                log.info(f"Game version conflict, retrying ({attempt + 1}/{retries})", extra={"data": e.data})
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def _has_move_log(game: Game[Any]) -> bool:
+    if get_storage_mode() != GameStorageMode.MOVE_LOG:
+        return False
+    return game.version is not None and game.loaded_state_data is not None
+
+
+def _should_append_move(game: Game[Any], new_version: int) -> bool:
+    if not _has_move_log(game=game):
+        return False
+    # A finished game is compacted, which also gives it the shorter expiry of finished games.
+    return new_version % config.game_snapshot_interval != 0 and not game.state.is_game_over
+
+
+def _get_expire_ts(game: Game[Any]) -> float | None:
+    ttl_days = config.game_finished_ttl_days if game.state.is_game_over else config.game_abandoned_ttl_days
+    return _get_expire_ts_in(ttl_days=ttl_days)
+
+
+def _get_expire_ts_in(ttl_days: float) -> float | None:
+    if not ttl_days:
+        return None
+    return time.time() + ttl_days * 24 * 60 * 60
+
+
+def _to_snapshot(game: Game[Any], version: int) -> GameSnapshot:
+    return GameSnapshot(
+        version=version,
+        storage_mode=get_storage_mode().value,
+        state_data=game.dump_state(),
+        expire_ts=_get_expire_ts(game),
+        owner=game.owner,
+        game_type=type(game).get_game_type().value,
+    )
+
+
+def _encode_cursor(cursor: dict) -> str:
+    # Opaque to clients, so stores may change their cursor format without an API change.
+    return base64.urlsafe_b64encode(json.dumps(cursor, separators=(",", ":")).encode()).decode()
+
+
+def _decode_cursor(cursor: str | None) -> dict | None:
+    if not cursor:
+        return None
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:  # pylint: disable=invalid-name
+        raise BadRequestError(message="Invalid cursor.") from e
+    if not isinstance(decoded, dict):
+        raise BadRequestError(message="Invalid cursor.")
+    return decoded
+
+
+def _save_game_snapshot(game: Game[Any], new_version: int) -> None:
+    snapshot = _to_snapshot(game=game, version=new_version)
+    # The store holds the snapshot the game was rebuilt from, which may be older than the game itself.
+    with _conflict_guard(game=game):
+        get_game_store().save_snapshot(game_id=game.id, snapshot=snapshot, expected_version=game.snapshot_version)
+
+
+def _expire_superseded_moves(game_id: str, versions: range) -> None:
+    # Expired rather than deleted: a writer that loaded the game before the snapshot must still conflict on them,
+    # instead of appending a move that the snapshot already covers.
+    if not versions:
+        return
+    expire_ts = time.time() + config.game_superseded_moves_ttl
+    try:
+        get_game_store().expire_moves(game_id=game_id, versions=versions, expire_ts=expire_ts)
+    except Exception:  # pylint: disable=broad-exception-caught
+        # The moves still expire with the game, failing to expire them early should not fail the save.
+        log.warning(f"Failed expiring the superseded moves of game [{game_id}]", exc_info=True)
+
+
+def _append_game_move(game: Game[Any], new_version: int) -> None:
+    delta = diff_state(game.loaded_state_data, game.state_data)
+    # Concurrent writers of the same version collide on the move key.
+    with _conflict_guard(game=game):
+        get_game_store().append_move(game_id=game.id, version=new_version, delta=delta, expire_ts=_get_expire_ts(game))
+
+
+@contextmanager
+def _conflict_guard(game: Game[Any]) -> Iterator[None]:
+    try:
+        yield
+    except GameStoreConflictError as e:  # pylint: disable=invalid-name
+        get_game_cache().invalidate(game.id)
+        raise GameVersionConflictError.create(game_id=game.id, expected_version=game.version) from e
+
+
+def _load_stored_game(game_id: str, consistency: ReadConsistency) -> CachedGame:
+    try:
+        snapshot = get_game_store().load_snapshot(game_id=game_id, consistency=consistency)
+    except GameDoesNotExistError:
+        snapshot = _rehydrate_game(game_id=game_id)
+    return _rebuild_stored_game(game_id=game_id, snapshot=snapshot, consistency=consistency)
+
+
+def _rehydrate_game(game_id: str) -> GameSnapshot:
+    """
+    Restores an expired game from the archive into the store.
+
+    :raises GameDoesNotExistError: If the game is not archived either.
+    """
+    archive = get_game_archive()
+    archived_snapshot = archive.load(game_id=game_id) if archive else None
+    if archived_snapshot is None:
+        raise GameDoesNotExistError.create(game_id=game_id)
+    # Played again, so it is not abandoned anymore.
+    archived_snapshot.expire_ts = _get_expire_ts_in(ttl_days=config.game_abandoned_ttl_days)
+    store = get_game_store()
+    try:
+        store.save_snapshot(game_id=game_id, snapshot=archived_snapshot, expected_version=None)
+    except GameStoreConflictError:
+        # Rehydrated concurrently (or was not deleted yet).
+        return store.load_snapshot(game_id=game_id)
+    log.info(f"Game [{game_id}] rehydrated from archive")
+    return archived_snapshot
+
+
+def _rebuild_stored_game(game_id: str, snapshot: GameSnapshot, consistency: ReadConsistency) -> CachedGame:
+    state_data, version = snapshot.state_data, snapshot.version
+    if version is not None and (snapshot.has_move_log or get_storage_mode() == GameStorageMode.MOVE_LOG):
+        for move_version, delta in _load_game_moves(game_id=game_id, after_version=version, consistency=consistency):
+            state_data = apply_diff(state_data, delta)
+            version = move_version
+    return CachedGame(state_data=state_data, version=version, snapshot_version=snapshot.version, owner=snapshot.owner)
+
+
+def _load_game_moves(game_id: str, after_version: int, consistency: ReadConsistency) -> List[tuple[int, list]]:
+    # A snapshot is written at least every `game_snapshot_interval` versions, so the tail is bounded by it.
+    # Moves written before the latest snapshot are never requested.
+    versions = range(after_version + 1, after_version + config.game_snapshot_interval)
+    deltas = get_game_store().load_moves(game_id=game_id, versions=versions, consistency=consistency)
+    tail = []
+    for version in versions:
+        delta = deltas.get(version)
+        if delta is None:
+            break
+        tail.append((version, delta))
+    return tail
+
+
+def _is_fresh(game_id: str, cached: CachedGame, consistency: ReadConsistency) -> bool:
+    now = time.monotonic()
+    if now - cached.validated_ts < config.game_cache_validate_after:
+        get_game_cache_read_stats().record(reads_saved=1)
+        return True
+    if not _matches_store(game_id=game_id, cached=cached, consistency=consistency):
+        return False
+    cached.validated_ts = now
+    get_game_cache_read_stats().record(validated_hits=1)
+    return True
+
+
+def _matches_store(game_id: str, cached: CachedGame, consistency: ReadConsistency) -> bool:
+    # Only version markers are fetched, which saves the transfer, decoding and replay of the full state (not reads).
+    store = get_game_store()
+    head = store.load_head(game_id=game_id, consistency=consistency)
+    if head.version != cached.snapshot_version:
+        return False
+    if not head.has_move_log and get_storage_mode() != GameStorageMode.MOVE_LOG:
+        return True
+    next_version = (cached.version or 0) + 1
+    return not store.has_move(game_id=game_id, version=next_version, consistency=consistency)
+
+
+def _get_cache_stats() -> dict:
+    return {**get_game_cache().stats.as_dict(), **get_game_cache_read_stats().as_dict()}
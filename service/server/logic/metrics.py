@@ -0,0 +1,37 @@
+import json
+import sys
+import time
+from typing import Dict
+
+from the_spymaster.config import get_config
+
+config = get_config()
+
+
+def emit_metrics(metrics: Dict[str, float], properties: dict | None = None) -> dict:
+    """
+    Writes the metrics to stdout as a CloudWatch embedded metric format (EMF) line: when a Lambda function writes it,
+    CloudWatch extracts the metrics from the log line, without an API call. `properties` are kept in the line (and are
+    searchable in Logs Insights), but are not metrics. Returns the written document (nothing is written unless
+    `metrics_emf` is set).
+    """
+    document = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [
+                {
+                    "Namespace": config.metrics_namespace,
+                    "Dimensions": [["environment"]],
+                    "Metrics": [{"Name": name} for name in metrics],
+                }
+            ],
+        },
+        "environment": config.env_verbose_name,
+        **(properties or {}),
+        **metrics,
+    }
+    if config.metrics_emf:
+        # Not through the logger: EMF must be the whole log line, and the log formatters wrap it.
+        sys.stdout.write(json.dumps(document, separators=(",", ":")) + "\n")
+        sys.stdout.flush()
+    return document
@@ -0,0 +1,180 @@
+import json
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from the_spymaster_solvers_api.structs.base import APIModelIdentifier
+from the_spymaster_solvers_api.structs.requests import LoadModelsRequest
+from the_spymaster_solvers_api.structs.responses import LoadModelsResponse
+from the_spymaster_util.logger import get_logger
+
+from server.logic.solvers import get_solvers_client
+from server.logic.stores import ModelPreload, get_model_usage_store
+from the_spymaster.config import get_config
+
+log = get_logger(__name__)
+config = get_config()
+
+HOUR = 60 * 60
+
+# Request counts, by hour and model usage key.
+type ModelUsage = Dict[int, Dict[str, int]]
+
+
+def get_model_usage_key(language: str, model_identifier: APIModelIdentifier | None) -> str:
+    """
+    A stable string of a requested model: the model identifier, or the language of a request for its default model.
+    """
+    data = model_identifier.model_dump(mode="json") if model_identifier else {"language": language}
+    return json.dumps(data, sort_keys=True, separators=(",", ":"))
+
+
+def get_model_identifier(model_key: str) -> APIModelIdentifier | None:
+    """
+    The model identifier of a model usage key, None for a language's default model.
+    """
+    data = json.loads(model_key)
+    return APIModelIdentifier(**data) if "model_name" in data else None
+
+
+def get_current_hour() -> int:
+    return int(time.time() // HOUR)
+
+
+@dataclass
+class ColdModelStats:
+    """
+    Requests since the last preload, and how many of them asked for a model that was not pre-loaded.
+    """
+
+    requests: int = 0
+    cold_requests: int = 0
+
+    @property
+    def cold_rate(self) -> float:
+        return self.cold_requests / self.requests if self.requests else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "cold_requests": self.cold_requests,
+            "cold_rate": round(self.cold_rate, 3),
+        }
+
+
+class ModelUsageRecorder:
+    """
+    Thread safe. Counts the requested models in memory, and adds the counts to the model usage store at most once
+    every `flush_interval` seconds, in a background thread (off the request path). On Lambda, the thread is frozen
+    with the container once the response is returned, and resumes in a later invocation.
+    Recording is best effort: counts that failed to flush, or that were not flushed before the process ended, are lost.
+    """
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._counts: Dict[Tuple[int, str], int] = {}
+        self._flushed_ts = time.monotonic()
+        self._flush_thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def record(self, language: str, model_identifier: APIModelIdentifier | None) -> None:
+        key = get_current_hour(), get_model_usage_key(language=language, model_identifier=model_identifier)
+        now = time.monotonic()
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+            if now - self._flushed_ts < self.flush_interval:
+                return
+            if self._flush_thread is not None and self._flush_thread.is_alive():
+                return
+            # Counts recorded while the thread runs are flushed by the next one.
+            self._flushed_ts = now
+            self._flush_thread = threading.Thread(target=self.flush, name="model-usage-flush", daemon=True)
+            self._flush_thread.start()
+
+    def flush(self) -> None:
+        """
+        Adds the recorded counts to the store, in the calling thread.
+        """
+        with self._lock:
+            counts, self._counts = self._counts, {}
+            self._flushed_ts = time.monotonic()
+        usage: ModelUsage = {}
+        for (hour, model_key), count in counts.items():
+            usage.setdefault(hour, {})[model_key] = count
+        ttl_days = config.model_usage_ttl_days
+        store = get_model_usage_store()
+        for hour, requests in usage.items():
+            expire_ts = (hour + 1) * HOUR + ttl_days * 24 * 60 * 60 if ttl_days else None
+            try:
+                store.add_model_usage(hour=hour, requests=requests, expire_ts=expire_ts)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # Usage only picks the pre-loaded models, failing to record it should not fail anything else.
+                log.warning(f"Failed recording the model usage of hour [{hour}]", exc_info=True)
+        log.debug("Flushed model usage", extra={"model_usage": usage})
+
+    def join(self, timeout: float | None = None) -> None:
+        """
+        Waits for a running background flush to end.
+        """
+        with self._lock:
+            flush_thread = self._flush_thread
+        if flush_thread is not None:
+            flush_thread.join(timeout)
+
+
+@lru_cache()
+def get_model_usage_recorder() -> ModelUsageRecorder:
+    return ModelUsageRecorder(flush_interval=config.model_usage_flush_interval)
+
+
+def load_model_usage(since_hour: int) -> ModelUsage:
+    """
+    Loads the stored usage from `since_hour` up to the current hour (inclusive).
+    """
+    return get_model_usage_store().load_model_usage(hours=range(since_hour, get_current_hour() + 1))
+
+
+def get_hot_model_keys(usage: ModelUsage, top: int) -> List[Tuple[str, int]]:
+    """
+    The `top` most requested models, with their request counts, most requested first.
+    """
+    totals: Counter[str] = Counter()
+    for requests in usage.values():
+        totals.update(requests)
+    return totals.most_common(top)
+
+
+def get_cold_model_stats(preload: ModelPreload) -> ColdModelStats:
+    """
+    Usage is counted by hour, so the requests of the preload's hour that preceded it are counted as well.
+    """
+    preloaded_keys = set(preload.model_keys)
+    stats = ColdModelStats()
+    for requests in load_model_usage(since_hour=int(preload.preloaded_ts // HOUR)).values():
+        for model_key, count in requests.items():
+            stats.requests += count
+            if model_key not in preloaded_keys:
+                stats.cold_requests += count
+    return stats
+
+
+def preload_models(model_keys: List[str]) -> LoadModelsResponse:
+    """
+    Loads the models into the solvers backend, and saves them as the last preload (which cold stats are relative to).
+    A default model key loads the default models of all languages, as the solvers backend has no per language flag.
+    """
+    model_identifiers = [get_model_identifier(model_key) for model_key in model_keys]
+    request = LoadModelsRequest(
+        model_identifiers=[identifier for identifier in model_identifiers if identifier is not None],
+        load_default_models=any(identifier is None for identifier in model_identifiers),
+    )
+    response = get_solvers_client().load_models(request)
+    get_model_usage_store().save_model_preload(ModelPreload(model_keys=model_keys, preloaded_ts=time.time()))
+    log.info(
+        f"Pre-loaded [{response.success_count}] models, [{response.fail_count}] failed",
+        extra={"model_keys": model_keys},
+    )
+    return response
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict
+
+from pydantic import BaseModel
+from the_spymaster_solvers_api.structs.requests import BaseGenerateRequest
+from the_spymaster_util.logger import get_logger
+
+from server.logic.cache import CacheStats, LRUCache
+from server.logic.stores import get_game_store
+from the_spymaster.config import get_config
+
+log = get_logger(__name__)
+config = get_config()
+
+
+@dataclass
+class _Prefetch:
+    future: Future
+    # The Lambda invocation that started the prefetch (see `start_invocation`).
+    invocation: int
+
+
+# Results being generated in the background, by cache key.
+_in_flight: Dict[str, _Prefetch] = {}
+_in_flight_lock = threading.Lock()
+# Lambda invocations handled by this process, as a one item list so it can be bumped in place.
+_invocation = [0]
+
+
+def start_invocation() -> None:
+    """
+    Called by the Lambda handler before each invocation. Lambda runs one invocation at a time per container, and
+    freezes the container once the response is returned: a prefetch started by an earlier invocation only progressed
+    while later invocations ran (competing with them for CPU), and may be far from done.
+    """
+    with _in_flight_lock:
+        _invocation[0] += 1
+
+
+@lru_cache()
+def get_move_cache() -> LRUCache[str, BaseModel]:
+    return LRUCache(max_size=config.move_cache_max_size, ttl=config.move_cache_ttl)
+
+
+def get_move_cache_stats() -> CacheStats:
+    return get_move_cache().stats
+
+
+@lru_cache()
+def get_prefetch_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=config.next_move_speculation_workers, thread_name_prefix="move-prefetch")
+
+
+def get_move_cache_key(request: BaseGenerateRequest) -> str:
+    """
+    A stable hash of everything the solver result depends on: the spymaster or operative state, the solver,
+    and the model identifier. Equal requests hash the same across processes, whatever their field order.
+    """
+    data = {"request_type": type(request).__name__, **request.model_dump(mode="json")}
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def generate_move_cached[Q: BaseGenerateRequest, R: BaseModel](
+    request: Q, response_type: type[R], generate: Callable[[Q], R], deadline: float | None = None
+) -> R:
+    """
+    Returns the solver result of a request, generating it only if the same request was not answered before.
+    Results are looked up in memory first, then in the game store (if `move_cache_persist` is set).
+    A result that is being prefetched is waited for until the deadline (a `time.monotonic` timestamp), rather than
+    generated again. A prefetch started by an earlier Lambda invocation is waited for at most
+    `move_prefetch_carryover_wait` seconds, and then generated directly.
+    Cached results are shared, and must not be mutated.
+    """
+    if config.move_cache_max_size <= 0:
+        return generate(request)
+    key = get_move_cache_key(request)
+    cache = get_move_cache()
+    cached = cache.get(key)
+    if isinstance(cached, response_type):
+        log.debug(f"Move [{key[:12]}] served from cache", extra={"cache_stats": cache.stats.as_dict()})
+        return cached
+    prefetched = _wait_for_prefetch(key=key, deadline=deadline)
+    if isinstance(prefetched, response_type):
+        log.debug(f"Move [{key[:12]}] served from a prefetch")
+        return prefetched
+    return _generate_and_cache(key=key, request=request, response_type=response_type, generate=generate)
+
+
+def prefetch_move[Q: BaseGenerateRequest, R: BaseModel](
+    request: Q, response_type: type[R], generate: Callable[[Q], R]
+) -> bool:
+    """
+    Starts generating the solver result of a request in the background, into the move cache.
+    Returns False if the result is already cached or being generated (or caching is disabled).
+    On Lambda, the prefetch only runs until the invocation's response is returned (see `start_invocation`).
+    """
+    if config.move_cache_max_size <= 0:
+        return False
+    key = get_move_cache_key(request)
+    with _in_flight_lock:
+        if key in _in_flight or key in get_move_cache():
+            return False
+        # The prefetch drops itself from `_in_flight` under the lock, so only after it was added.
+        future = get_prefetch_executor().submit(_prefetch, key, request, response_type, generate)
+        _in_flight[key] = _Prefetch(future=future, invocation=_invocation[0])
+    log.debug(f"Prefetching move [{key[:12]}]")
+    return True
+
+
+def _prefetch[Q: BaseGenerateRequest, R: BaseModel](
+    key: str, request: Q, response_type: type[R], generate: Callable[[Q], R]
+) -> R:
+    try:
+        return _generate_and_cache(key=key, request=request, response_type=response_type, generate=generate)
+    except Exception:
+        log.warning(f"Failed prefetching move [{key[:12]}]", exc_info=True)
+        raise
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop(key, None)
+
+
+def _wait_for_prefetch(key: str, deadline: float | None) -> Any:
+    with _in_flight_lock:
+        prefetch = _in_flight.get(key)
+        is_carried_over = prefetch is not None and prefetch.invocation != _invocation[0]
+    if prefetch is None:
+        return None
+    timeout = max(deadline - time.monotonic(), 0) if deadline is not None else None
+    if is_carried_over:
+        carryover_wait = config.move_prefetch_carryover_wait
+        timeout = min(timeout, carryover_wait) if timeout is not None else carryover_wait
+    try:
+        return prefetch.future.result(timeout=timeout)
+    except Exception:  # pylint: disable=broad-exception-caught
+        # Already logged by the prefetch (or still running), the caller generates the move itself.
+        return None
+
+
+def _generate_and_cache[Q: BaseGenerateRequest, R: BaseModel](
+    key: str, request: Q, response_type: type[R], generate: Callable[[Q], R]
+) -> R:
+    response = _load_persisted_result(key=key, response_type=response_type)
+    if response is None:
+        response = generate(request)
+        _persist_result(key=key, response=response)
+    get_move_cache().set(key, response)
+    return response
+
+
+def _load_persisted_result[R: BaseModel](key: str, response_type: type[R]) -> R | None:
+    if not config.move_cache_persist:
+        return None
+    result = get_game_store().load_move_result(key=key)
+    if result is None:
+        return None
+    log.debug(f"Move [{key[:12]}] served from the game store")
+    return response_type.model_validate(result)
+
+
+def _persist_result(key: str, response: BaseModel) -> None:
+    if not config.move_cache_persist:
+        return
+    ttl_days = config.move_cache_persist_ttl_days
+    expire_ts = time.time() + ttl_days * 24 * 60 * 60 if ttl_days else None
+    try:
+        get_game_store().save_move_result(key=key, result=response.model_dump(mode="json"), expire_ts=expire_ts)
+    except Exception:  # pylint: disable=broad-exception-caught
+        # The move was generated, failing to cache it should not fail the request.
+        log.warning(f"Failed persisting move [{key[:12]}]", exc_info=True)
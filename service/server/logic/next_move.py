@@ -1,26 +1,50 @@
 import logging
+from functools import lru_cache
+from typing import Any, Tuple
 
 from codenames.classic.state import ClassicGameState
-from codenames.duet.state import DuetSideState
+from codenames.duet.state import DuetGameState, DuetSideState
 from codenames.generic.player import PlayerRole
 from the_spymaster_api.structs import Solver
 from the_spymaster_api.structs.abstract.responses import NextMoveResponse
 from the_spymaster_api.structs.classic.responses import ClassicNextMoveResponse
+from the_spymaster_api.structs.duet.responses import DuetNextMoveResponse
 from the_spymaster_api.structs.mini.responses import MiniNextMoveResponse
-from the_spymaster_solvers_api.client import TheSpymasterSolversClient
 from the_spymaster_solvers_api.structs.base import APIModelIdentifier
 from the_spymaster_solvers_api.structs.requests import (
     GenerateClueRequest,
     GenerateGuessRequest,
 )
+from the_spymaster_solvers_api.structs.responses import (
+    GenerateClueResponse,
+    GenerateGuessResponse,
+)
 from the_spymaster_util.http.errors import BadRequestError
 
+from server.logic.cache import LRUCache
+from server.logic.db import save_game
+from server.logic.model_usage import get_model_usage_recorder
+from server.logic.solver_calls import get_solver_caller
+from server.logic.solvers import get_solvers_client
+from server.models.game import Game
 from the_spymaster.config import get_config
 
 log = logging.getLogger(__name__)
 config = get_config()
 
-type SupportedGameState = ClassicGameState | DuetSideState
+type SupportedGameState = ClassicGameState | DuetSideState | DuetGameState
+# The state a move is played on: the game state, or the current side's state of a Duet game.
+type PlayerState = ClassicGameState | DuetSideState
+# Game id, team (or Duet side) and role of a player that is played by the AI.
+type AIPlayerKey = Tuple[str, str, PlayerRole]
+
+
+@lru_cache()
+def get_ai_players() -> LRUCache[AIPlayerKey, Tuple[Solver, APIModelIdentifier | None]]:
+    """
+    The solver and model of the last next move of each AI player, for speculation and Duet side prefetching.
+    """
+    return LRUCache(max_size=config.move_cache_max_size, ttl=config.move_cache_ttl)
 
 
 class NextMoveHandler[GameState: SupportedGameState, ResponseType: NextMoveResponse]:
@@ -30,33 +54,93 @@ class NextMoveHandler[GameState: SupportedGameState, ResponseType: NextMoveRespo
         game_state: GameState,
         solver: Solver,
         model_identifier: APIModelIdentifier | None = None,
+        deadline: float | None = None,
     ) -> None:
+        """
+        :param deadline: The `time.monotonic` timestamp by which the solvers must answer, None for no deadline.
+        """
         self.game_id = game_id
         self.game_state = game_state
         self.solver = solver
         self.model_identifier = model_identifier
-        self.solvers_client = TheSpymasterSolversClient(base_url=config.solvers_backend_url)
+        self.deadline = deadline
+        self.solvers_client = get_solvers_client()
         self._response_type = self._get_response_type(game_state=self.game_state)
         # self.model_adapter = get_adapter_for_model(self.model_identifier)
 
+    @classmethod
+    def speculate(cls, game_id: str, game_state: GameState) -> bool:
+        """
+        Opt-in (`next_move_speculation`): called after a human move is saved. If the next player is played by the AI
+        (it asked for a next move in this game before), starts generating its move in the background, with the same
+        solver and model. The following `handle` of the unchanged state gets it without waiting for the solvers.
+        On Lambda, the container is frozen once the response is returned, so the speculation may only finish during
+        the next invocation (see `start_invocation`).
+        """
+        if not config.next_move_speculation:
+            return False
+        ai_player = get_ai_players().get(get_ai_player_key(game_id=game_id, game_state=game_state))
+        if ai_player is None:
+            return False
+        solver, model_identifier = ai_player
+        handler = cls(game_id=game_id, game_state=game_state, solver=solver, model_identifier=model_identifier)
+        return handler.prefetch()
+
+    def prefetch(self) -> bool:
+        """
+        Starts generating the current player's move in the background, without playing it.
+        """
+        if self.game_state.is_game_over:
+            return False
+        solver_caller = get_solver_caller()
+        if self.player_state.current_player_role == PlayerRole.SPYMASTER:
+            return solver_caller.prefetch(
+                self._get_clue_request(), response_type=GenerateClueResponse, generate=self.solvers_client.generate_clue
+            )
+        return solver_caller.prefetch(
+            self._get_guess_request(), response_type=GenerateGuessResponse, generate=self.solvers_client.generate_guess
+        )
+
     def handle(self) -> ResponseType:
         if self.game_state.is_game_over:
             raise BadRequestError(message=f"Cannot make move: Game [{self.game_id}] is already over")
-        if self.game_state.current_player_role == PlayerRole.SPYMASTER:
+        ai_player_key = get_ai_player_key(game_id=self.game_id, game_state=self.game_state)
+        get_ai_players().set(ai_player_key, (self.solver, self.model_identifier))
+        language = self.player_state.board.language
+        get_model_usage_recorder().record(language=language, model_identifier=self.model_identifier)
+        player_role = self.player_state.current_player_role
+        if player_role == PlayerRole.SPYMASTER:
             return self._make_spymaster_move()
-        if self.game_state.current_player_role == PlayerRole.OPERATIVE:
+        if player_role == PlayerRole.OPERATIVE:
             return self._make_operative_move()
-        raise ValueError(
-            f"Cannot make move: Unknown player role [{self.game_state.current_player_role}] in game [{self.game_id}]"
+        raise ValueError(f"Cannot make move: Unknown player role [{player_role}] in game [{self.game_id}]")
+
+    @property
+    def player_state(self) -> PlayerState:
+        return get_player_state(self.game_state)
+
+    def _get_clue_request(self) -> GenerateClueRequest:
+        return GenerateClueRequest(
+            spymaster_state=self.player_state,
+            model_identifier=self.model_identifier,
+            solver=self.solver,
         )
 
-    def _make_spymaster_move(self) -> ResponseType:
-        generate_clue_request = GenerateClueRequest(
-            spymaster_state=self.game_state,
+    def _get_guess_request(self) -> GenerateGuessRequest:
+        return GenerateGuessRequest(
+            operative_state=self.player_state.operative_state,
             model_identifier=self.model_identifier,
             solver=self.solver,
         )
-        generate_clue_response = self.solvers_client.generate_clue(request=generate_clue_request)
+
+    def _make_spymaster_move(self) -> ResponseType:
+        generate_clue_request = self._get_clue_request()
+        generate_clue_response = get_solver_caller().generate(
+            generate_clue_request,
+            response_type=GenerateClueResponse,
+            generate=self.solvers_client.generate_clue,
+            deadline=self.deadline,
+        )
         given_clue = self.game_state.process_clue(clue=generate_clue_response.suggested_clue)
         return self._response_type(  # type: ignore
             game_state=self.game_state,  # type: ignore
@@ -66,12 +150,13 @@ class NextMoveHandler[GameState: SupportedGameState, ResponseType: NextMoveRespo
         )
 
     def _make_operative_move(self) -> ResponseType:
-        generate_guess_request = GenerateGuessRequest(
-            operative_state=self.game_state.operative_state,
-            model_identifier=self.model_identifier,
-            solver=self.solver,
+        generate_guess_request = self._get_guess_request()
+        generate_guess_response = get_solver_caller().generate(
+            generate_guess_request,
+            response_type=GenerateGuessResponse,
+            generate=self.solvers_client.generate_guess,
+            deadline=self.deadline,
         )
-        generate_guess_response = self.solvers_client.generate_guess(request=generate_guess_request)
         given_guess = self.game_state.process_guess(guess=generate_guess_response.suggested_guess)
         return self._response_type(  # type: ignore
             game_state=self.game_state,  # type: ignore
@@ -86,4 +171,40 @@ class NextMoveHandler[GameState: SupportedGameState, ResponseType: NextMoveRespo
             return ClassicNextMoveResponse
         if isinstance(game_state, DuetSideState):
             return MiniNextMoveResponse
+        if isinstance(game_state, DuetGameState):
+            return DuetNextMoveResponse
         raise ValueError(f"Unsupported game state type: {type(game_state)}")
+
+
+def play_next_move[ResponseType: NextMoveResponse](
+    game: Game[Any],
+    handler_type: type[NextMoveHandler[Any, ResponseType]],
+    solver: Solver,
+    model_identifier: APIModelIdentifier | None = None,
+    deadline: float | None = None,
+) -> ResponseType:
+    """
+    Plays the current player's move with the AI, and saves the game.
+    """
+    game_state = game.state
+    handler = handler_type(
+        game_id=game.id, game_state=game_state, solver=solver, model_identifier=model_identifier, deadline=deadline
+    )
+    response = handler.handle()
+    game.set_state(game_state)
+    save_game(game)
+    return response
+
+
+def get_player_state(game_state: SupportedGameState) -> PlayerState:
+    if isinstance(game_state, DuetGameState):
+        return game_state.current_side_state
+    return game_state
+
+
+def get_ai_player_key(game_id: str, game_state: SupportedGameState) -> AIPlayerKey:
+    if isinstance(game_state, DuetGameState):
+        # Both sides of a Duet game are the same team.
+        side_state = game_state.current_side_state
+        return game_id, game_state.current_playing_side.value, side_state.current_player_role
+    return game_id, str(game_state.current_team), game_state.current_player_role
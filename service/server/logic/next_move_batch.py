@@ -0,0 +1,85 @@
+from typing import Any, Dict, List, Tuple
+
+from codenames.generic.exceptions import GameRuleError
+from the_spymaster_api.structs import (
+    APIGameRuleError,
+    GameDoesNotExistError,
+    GameType,
+    NextMoveBatchRequest,
+    NextMoveBatchResult,
+    SolverTimeoutError,
+)
+from the_spymaster_util.http.errors import BadRequestError, InternalServerError
+from the_spymaster_util.logger import get_logger
+
+from server.logic.batching import map_concurrently
+from server.logic.db import load_games
+from server.logic.next_move import NextMoveHandler, play_next_move
+from server.logic.next_move_classic import ClassicNextMoveHandler
+from server.logic.next_move_duet import DuetNextMoveHandler
+from server.logic.next_move_mini import MiniNextMoveHandler
+from server.models.game import ClassicGame, DuetGame, Game, MiniGame
+from the_spymaster.config import get_config
+
+log = get_logger(__name__)
+config = get_config()
+
+NEXT_MOVE_TYPES: Dict[GameType, Tuple[type[Game], type[NextMoveHandler]]] = {
+    GameType.CLASSIC: (ClassicGame, ClassicNextMoveHandler),
+    GameType.DUET: (DuetGame, DuetNextMoveHandler),
+    GameType.MINI: (MiniGame, MiniNextMoveHandler),
+}
+
+
+def play_next_moves(request: NextMoveBatchRequest, deadline: float | None = None) -> List[NextMoveBatchResult]:
+    """
+    Plays the next move of many games: the games are loaded in one batch, then each game's move is generated and
+    saved on a bounded thread pool, so the solver calls of the batch overlap.
+    A game that fails (missing, over, version conflict, solver error) gets an error result, the others are kept.
+    Each game is saved with the usual conditional write, so concurrent moves of its players are not overwritten.
+    """
+    game_type, handler_type = NEXT_MOVE_TYPES[request.game_type]
+    game_ids = list(dict.fromkeys(request.game_ids))
+    games = load_games(game_ids, game_type=game_type)
+
+    def play(game_id: str) -> NextMoveBatchResult:
+        try:
+            game = games.get(game_id)
+            if game is None:
+                raise GameDoesNotExistError.create(game_id=game_id)
+            return _play_next_move(game=game, handler_type=handler_type, request=request, deadline=deadline)
+        except Exception as e:  # pylint: disable=invalid-name,broad-exception-caught
+            return NextMoveBatchResult(game_id=game_id, error=_get_error_payload(game_id=game_id, error=e))
+
+    results = map_concurrently(play, game_ids, max_workers=config.next_move_batch_max_workers)
+    failed = sum(result.error is not None for result in results)
+    log.info(f"Played next moves of [{len(results)}] games, [{failed}] failed", extra={"solver": request.solver})
+    return results
+
+
+def _play_next_move(
+    game: Game[Any], handler_type: type[NextMoveHandler], request: NextMoveBatchRequest, deadline: float | None
+) -> NextMoveBatchResult:
+    response = play_next_move(
+        game,
+        handler_type=handler_type,
+        solver=request.solver,
+        model_identifier=request.model_identifier,
+        deadline=deadline,
+    )
+    return NextMoveBatchResult(
+        game_id=game.id,
+        move=response.model_dump(exclude={"game_state"}),
+        version=game.version,
+        is_game_over=game.state.is_game_over,
+    )
+
+
+def _get_error_payload(game_id: str, error: Exception) -> dict:
+    # The same payloads the exception handler middleware answers single game requests with.
+    if isinstance(error, GameRuleError):
+        error = APIGameRuleError.from_game_rule_error(error)
+    if isinstance(error, BadRequestError | SolverTimeoutError):
+        return error.response_payload
+    log.exception(f"Next move of game [{game_id}] failed")
+    return InternalServerError().response_payload
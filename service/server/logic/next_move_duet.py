@@ -0,0 +1,52 @@
+from codenames.duet.state import DuetGameState, DuetSide
+from codenames.generic.player import PlayerRole
+from the_spymaster_api.structs.duet.responses import DuetNextMoveResponse
+
+from server.logic.next_move import NextMoveHandler, get_ai_players
+from server.logic.next_move_mini import MiniNextMoveHandler
+
+
+class DuetNextMoveHandler(NextMoveHandler[DuetGameState, DuetNextMoveResponse]):
+    """
+    Plays the move of the current side's player. A guess may hand the turn to the other side, so while an operative
+    of an AI played Duet game moves, the other side's next move is generated concurrently, into the move cache.
+    When the turn switches, that move is ready: an AI turn costs about one solver round trip, rather than two.
+    A correct guess also reveals its card on the other side's board, so if it switched the turn, the other side's
+    move is prefetched again, from its board after the guess.
+    """
+
+    def handle(self) -> DuetNextMoveResponse:
+        if self.game_state.is_game_over or self.player_state.current_player_role != PlayerRole.OPERATIVE:
+            return super().handle()
+        self._prefetch_dual_side()
+        playing_side = self.game_state.current_playing_side
+        response = super().handle()
+        given_guess = response.given_guess
+        if given_guess and given_guess.correct and self.game_state.current_playing_side != playing_side:
+            self._prefetch_side(self.game_state.current_playing_side)
+        return response
+
+    def prefetch(self) -> bool:
+        """
+        Starts generating both sides' moves in the background, concurrently.
+        """
+        dual_prefetched = self._prefetch_dual_side()
+        return super().prefetch() or dual_prefetched
+
+    def _prefetch_dual_side(self) -> bool:
+        return self._prefetch_side(self.game_state.current_playing_side.opposite)
+
+    def _prefetch_side(self, side: DuetSide) -> bool:
+        # Only if the side is played by the AI, with its own solver and model.
+        side_state = self.game_state.side_a if side == DuetSide.SIDE_A else self.game_state.side_b
+        if side_state.is_game_over:
+            return False
+        ai_player = get_ai_players().get((self.game_id, side.value, side_state.current_player_role))
+        if ai_player is None:
+            return False
+        solver, model_identifier = ai_player
+        # A single Duet side is played like a Mini game.
+        handler = MiniNextMoveHandler(
+            game_id=self.game_id, game_state=side_state, solver=solver, model_identifier=model_identifier
+        )
+        return handler.prefetch()
@@ -0,0 +1,81 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Set, Tuple
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+# Dumps of the current request, by model identity. The model is kept alongside its dump, so its id is not reused.
+_request_dumps: ContextVar[Dict[int, Tuple[BaseModel, dict]] | None] = ContextVar("request_dumps", default=None)
+
+
+@contextmanager
+def dump_scope() -> Iterator[None]:
+    """
+    Within a scope, each model is dumped at most once by `dump_model`, and the dump is reused by `dump_response`.
+    A game state is dumped for storage when the game is saved, and the same dump is embedded in the response body.
+    """
+    token = _request_dumps.set({})
+    try:
+        yield
+    finally:
+        _request_dumps.reset(token)
+
+
+def dump_model(model: BaseModel) -> dict:
+    """
+    The returned dump is shared, and must not be mutated.
+    The model must not be mutated after it is dumped, unless it is passed to `forget_dump`.
+    """
+    dumps = _request_dumps.get()
+    if dumps is None:
+        return model.model_dump()
+    cached = dumps.get(id(model))
+    if cached is not None:
+        return cached[1]
+    data = model.model_dump()
+    dumps[id(model)] = (model, data)
+    return data
+
+
+def forget_dump(model: BaseModel) -> None:
+    dumps = _request_dumps.get()
+    if dumps is not None:
+        dumps.pop(id(model), None)
+
+
+def dump_response(response: BaseModel) -> dict:
+    """
+    Like `response.model_dump()`, reusing the dumps of top level fields that were already dumped in this scope.
+    """
+    reused = _get_reused_dumps(response)
+    if not reused:
+        return response.model_dump()
+    data = response.model_dump(exclude=set(reused))
+    # Keep the order of the fields.
+    ordered = {name: reused[name] if name in reused else data.pop(name) for name in type(response).model_fields}
+    return ordered | data
+
+
+def dump_response_json(response: BaseModel, include: Set[str] | None = None, exclude: Set[str] | None = None) -> bytes:
+    """
+    Like `response.model_dump_json()`, as bytes. Encoded by pydantic-core (in Rust), rather than by the `json` module.
+    Projected responses (with `include` or `exclude` fields) are encoded without reusing dumps.
+    """
+    if include is not None or exclude is not None:
+        return to_json(response, include=include, exclude=exclude)
+    if not _get_reused_dumps(response):
+        return to_json(response)
+    return to_json(dump_response(response))
+
+
+def _get_reused_dumps(response: BaseModel) -> Dict[str, dict]:
+    dumps = _request_dumps.get()
+    if not dumps:
+        return {}
+    reused = {}
+    for name in type(response).model_fields:
+        cached = dumps.get(id(getattr(response, name)))
+        if cached is not None:
+            reused[name] = cached[1]
+    return reused
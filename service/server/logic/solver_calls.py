@@ -0,0 +1,339 @@
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+from typing import Callable, Deque, Set
+
+from pydantic import BaseModel
+from requests import RequestException
+from the_spymaster_api.structs import SolverTimeoutError
+from the_spymaster_solvers_api.structs import Solver
+from the_spymaster_solvers_api.structs.requests import BaseGenerateRequest
+from the_spymaster_util.http.errors import APIError
+from the_spymaster_util.logger import get_logger
+
+from server.logic.metrics import emit_metrics
+from server.logic.move_cache import generate_move_cached, prefetch_move
+from the_spymaster.config import get_config
+
+log = get_logger(__name__)
+config = get_config()
+
+HEDGE_PERCENTILE = 0.95
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass
+class SolverCallStats:
+    calls: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    timeouts: int = 0
+    failures: int = 0
+    fallbacks: int = 0
+    breaker_trips: int = 0
+
+    @property
+    def hedge_rate(self) -> float:
+        return self.hedged / self.calls if self.calls else 0.0
+
+    @property
+    def hedge_win_rate(self) -> float:
+        return self.hedge_wins / self.hedged if self.hedged else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "fallbacks": self.fallbacks,
+            "breaker_trips": self.breaker_trips,
+            "hedge_rate": round(self.hedge_rate, 3),
+            "hedge_win_rate": round(self.hedge_win_rate, 3),
+        }
+
+
+class CircuitBreaker:
+    """
+    Thread safe. Opens after `failure_threshold` consecutive failures, and lets calls through again `reset_timeout`
+    seconds later, one trial call at a time (half open). A successful trial closes it, a failed one opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_ts: float | None = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            return self._get_state()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._get_state()
+            if state == BreakerState.CLOSED:
+                return True
+            if state == BreakerState.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> bool:
+        """
+        Returns whether this success closed the breaker.
+        """
+        with self._lock:
+            was_open = self._opened_ts is not None
+            self._failures = 0
+            self._opened_ts = None
+            self._trial_in_flight = False
+            return was_open
+
+    def release_trial(self) -> None:
+        """
+        Lets another trial call through, when an allowed call did not reach the backend (and tested nothing).
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """
+        Returns whether this failure opened the breaker.
+        """
+        with self._lock:
+            self._failures += 1
+            was_open = self._opened_ts is not None
+            self._trial_in_flight = False
+            if self._failures < self.failure_threshold and not was_open:
+                return False
+            self._opened_ts = time.monotonic()
+            return not was_open
+
+    def _get_state(self) -> BreakerState:
+        if self._opened_ts is None:
+            return BreakerState.CLOSED
+        if time.monotonic() - self._opened_ts >= self.reset_timeout:
+            return BreakerState.HALF_OPEN
+        return BreakerState.OPEN
+
+
+class LatencyTracker:
+    """
+    Thread safe window of the latest call durations, in seconds.
+    """
+
+    def __init__(self, window: int, min_samples: int):
+        self.min_samples = min_samples
+        self._durations: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, duration: float) -> None:
+        with self._lock:
+            self._durations.append(duration)
+
+    def percentile(self, fraction: float) -> float | None:
+        """
+        None until the window has `min_samples` durations.
+        """
+        with self._lock:
+            if len(self._durations) < self.min_samples:
+                return None
+            durations = sorted(self._durations)
+        return durations[min(int(len(durations) * fraction), len(durations) - 1)]
+
+
+class SolverCaller:
+    """
+    Solver calls within a deadline (a `time.monotonic` timestamp, None for no deadline).
+
+    A call that is slower than the recent p95 latency is hedged: a duplicate request is sent, and the first answer
+    wins. Calls of non-naive solvers go through a circuit breaker: while the backend is timing out or failing,
+    they quickly fall back to the naive solver, instead of burning the request's time on a degraded backend.
+    A non-naive call also leaves `solvers_fallback_reserve` seconds of the deadline for its naive fallback.
+    The stats are emitted as metrics after every call, and whenever the breaker opens or closes.
+    """
+
+    def __init__(self, breaker: CircuitBreaker, latencies: LatencyTracker, max_workers: int, hedging: bool = True):
+        self.breaker = breaker
+        self.latencies = latencies
+        self.hedging = hedging
+        self.stats = SolverCallStats()
+        self._stats_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="solver-call")
+
+    def generate[Q: BaseGenerateRequest, R: BaseModel](
+        self, request: Q, response_type: type[R], generate: Callable[[Q], R], deadline: float | None = None
+    ) -> R:
+        """
+        Generates the request's move through the move cache, falling back to the naive solver when the requested
+        solver is unavailable.
+
+        :raises SolverTimeoutError: If no answer arrived before the deadline.
+        """
+        if request.solver != Solver.NAIVE:
+            guarded_deadline = deadline - config.solvers_fallback_reserve if deadline is not None else None
+            has_time = guarded_deadline is None or guarded_deadline > time.monotonic()
+            if has_time and self.breaker.allow_request():
+                try:
+                    return self._generate(request, response_type, generate=generate, deadline=guarded_deadline)
+                except Exception as e:  # pylint: disable=invalid-name,broad-exception-caught
+                    if not _is_backend_failure(e):
+                        raise
+                finally:
+                    # Served from the move cache or a prefetch: a backend call would have already ended the trial.
+                    self.breaker.release_trial()
+            self._increment(fallbacks=1)
+            log.info(
+                f"Solver [{request.solver.value}] is unavailable, falling back to the naive solver",
+                extra={"solver_call_stats": self.get_stats()},
+            )
+            request = request.model_copy(update={"solver": Solver.NAIVE})
+        return self._generate(request, response_type, generate=generate, deadline=deadline)
+
+    def prefetch[Q: BaseGenerateRequest, R: BaseModel](
+        self, request: Q, response_type: type[R], generate: Callable[[Q], R]
+    ) -> bool:
+        """
+        Starts generating the request's move in the background, into the move cache (see `prefetch_move`), hedged
+        like any other call. Prefetches are speculative: while the breaker is not closed they are skipped, rather
+        than falling back to the naive solver or taking the trial call. Their backend failures count towards
+        opening the breaker.
+        """
+        if request.solver != Solver.NAIVE and self.breaker.state != BreakerState.CLOSED:
+            log.debug(f"Solver [{request.solver.value}] is unavailable, skipping the prefetch")
+            return False
+        # No request is waiting for it, the call is bounded by the solvers client's read timeout.
+        call = functools.partial(self._call_hedged, generate=generate, deadline=None)
+        return prefetch_move(request, response_type=response_type, generate=call)
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            return {**self.stats.as_dict(), "breaker_state": self.breaker.state.value}
+
+    def _generate[Q: BaseGenerateRequest, R: BaseModel](
+        self, request: Q, response_type: type[R], generate: Callable[[Q], R], deadline: float | None
+    ) -> R:
+        call = functools.partial(self._call_hedged, generate=generate, deadline=deadline)
+        return generate_move_cached(request, response_type=response_type, generate=call, deadline=deadline)
+
+    def _call_hedged[Q: BaseGenerateRequest, R: BaseModel](
+        self, request: Q, generate: Callable[[Q], R], deadline: float | None
+    ) -> R:
+        # The breaker only records calls that reach the backend (not move cache hits).
+        try:
+            response = self._race_hedged(request, generate=generate, deadline=deadline)
+        except Exception as e:  # pylint: disable=invalid-name
+            if request.solver != Solver.NAIVE:
+                if _is_backend_failure(e):
+                    self._record_failure(solver=request.solver, error=e)
+                else:
+                    # Not the backend's fault (for example, an unknown model): the backend answered.
+                    self._record_success()
+            raise
+        else:
+            if request.solver != Solver.NAIVE:
+                self._record_success()
+            return response
+        finally:
+            self._emit_stats()
+
+    def _race_hedged[Q: BaseGenerateRequest, R: BaseModel](
+        self, request: Q, generate: Callable[[Q], R], deadline: float | None
+    ) -> R:
+        self._increment(calls=1)
+        start = time.monotonic()
+        hedge_delay = self.latencies.percentile(HEDGE_PERCENTILE) if self.hedging else None
+        hedge_ts = start + hedge_delay if hedge_delay is not None else None
+        primary = self._executor.submit(generate, request)
+        pending: Set[Future[R]] = {primary}
+        error: BaseException | None = None
+        while pending:
+            wake_ts = min((ts for ts in (deadline, hedge_ts) if ts is not None), default=None)
+            timeout = max(wake_ts - time.monotonic(), 0) if wake_ts is not None else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    self.latencies.record(time.monotonic() - start)
+                    if future is not primary:
+                        self._increment(hedge_wins=1)
+                    return future.result()
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                break
+            if pending and hedge_ts is not None and now >= hedge_ts:
+                log.debug(f"Solver call is slower than [{hedge_delay:.3f}s], hedging")
+                pending.add(self._executor.submit(generate, request))
+                hedge_ts = None
+                self._increment(hedged=1)
+        if not pending and error is not None:
+            raise error
+        # The abandoned calls are bounded by the solvers client's read timeout.
+        self._increment(timeouts=1)
+        raise SolverTimeoutError.create(solver=request.solver)
+
+    def _record_success(self) -> None:
+        if self.breaker.record_success():
+            log.info(
+                "Solvers backend recovered, closed the circuit breaker", extra={"solver_call_stats": self.get_stats()}
+            )
+            self._emit_stats()
+
+    def _record_failure(self, solver: Solver, error: Exception) -> None:
+        tripped = self.breaker.record_failure()
+        self._increment(failures=1, breaker_trips=int(tripped))
+        extra = {"solver_call_stats": self.get_stats()}
+        if tripped:
+            log.warning(f"Solvers backend is failing, opened the circuit breaker: {error}", extra=extra)
+            self._emit_stats()
+        else:
+            log.info(f"Solver [{solver.value}] call failed: {error}", extra=extra)
+
+    def _emit_stats(self) -> None:
+        stats = self.get_stats()
+        metrics = {
+            "solver_hedge_rate": stats["hedge_rate"],
+            "solver_hedge_win_rate": stats["hedge_win_rate"],
+            "solver_breaker_open": int(stats["breaker_state"] != BreakerState.CLOSED.value),
+        }
+        emit_metrics(metrics, properties={"solver_call_stats": stats})
+
+    def _increment(self, **amounts: int) -> None:
+        with self._stats_lock:
+            for name, amount in amounts.items():
+                setattr(self.stats, name, getattr(self.stats, name) + amount)
+
+
+@lru_cache()
+def get_solver_caller() -> SolverCaller:
+    breaker = CircuitBreaker(
+        failure_threshold=config.solvers_breaker_failures, reset_timeout=config.solvers_breaker_reset_timeout
+    )
+    latencies = LatencyTracker(window=config.solvers_latency_window, min_samples=config.solvers_hedge_min_samples)
+    return SolverCaller(
+        breaker=breaker,
+        latencies=latencies,
+        max_workers=config.solvers_pool_maxsize,
+        hedging=config.solvers_hedging,
+    )
+
+
+def _is_backend_failure(error: Exception) -> bool:
+    if isinstance(error, SolverTimeoutError | RequestException):
+        return True
+    return isinstance(error, APIError) and error.status_code >= 500
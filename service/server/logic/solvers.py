@@ -1,11 +1,45 @@
 from functools import lru_cache
 
+from requests.adapters import HTTPAdapter
 from the_spymaster_solvers_api import TheSpymasterSolversClient
+from the_spymaster_solvers_api.client import DEFAULT_RETRY_STRATEGY
 
 from the_spymaster.config import get_config
 
 
 @lru_cache()
-def get_solvers_client():
+def get_solvers_client() -> TheSpymasterSolversClient:
+    """
+    One client per process, shared by all requests and threads, so solver calls reuse kept-alive connections
+    instead of paying for a new session and TCP (and TLS) handshake on every call.
+    """
     config = get_config()
-    return TheSpymasterSolversClient(base_url=config.solvers_backend_url)
+    client = TheSpymasterSolversClient(base_url=config.solvers_backend_url)
+    mount_connection_pool(client, pool_maxsize=config.solvers_pool_maxsize, read_timeout=config.solvers_read_timeout)
+    return client
+
+
+def mount_connection_pool(
+    client: TheSpymasterSolversClient, pool_maxsize: int, read_timeout: float | None = None
+) -> None:
+    # The default adapter keeps up to 10 connections per host, concurrent requests beyond them open (and close)
+    # throwaway connections. The solvers backend is a single host, so a single pool is enough.
+    adapter = _TimeoutHTTPAdapter(
+        pool_connections=1, pool_maxsize=pool_maxsize, max_retries=DEFAULT_RETRY_STRATEGY, timeout=read_timeout
+    )
+    client.session.mount("http://", adapter)
+    client.session.mount("https://", adapter)
+
+
+class _TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    Requests without a timeout of their own get the adapter's one, so solver calls that were given up on by their
+    caller do not hold a connection (and a thread) forever.
+    """
+
+    def __init__(self, *args, timeout: float | None = None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, timeout=None, **kwargs):  # pylint: disable=arguments-differ
+        return super().send(request, timeout=timeout if timeout is not None else self.timeout, **kwargs)
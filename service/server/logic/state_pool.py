@@ -0,0 +1,203 @@
+import functools
+import threading
+import time
+from collections import deque
+from collections.abc import Hashable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Set
+
+from codenames.classic.board import ClassicBoard
+from codenames.classic.state import ClassicGameState
+from codenames.classic.team import ClassicTeam
+from codenames.duet.board import DuetBoard
+from codenames.duet.state import DuetGameState
+from codenames.generic.board import Vocabulary
+from codenames.mini.state import MiniGameState
+from codenames.utils.vocabulary.languages import get_vocabulary
+from the_spymaster_api.structs import GameType
+from the_spymaster_util.logger import get_logger
+
+from server.logic.metrics import emit_metrics
+from the_spymaster.config import get_config
+
+log = get_logger(__name__)
+config = get_config()
+
+
+@dataclass
+class PoolStats:
+    hits: int = 0
+    misses: int = 0
+    generated: int = 0
+    # Time spent generating items on the cold path (by misses), and while refilling (the pool's warm-up).
+    cold_seconds: float = 0.0
+    refill_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def cold_ms(self) -> float:
+        return self.cold_seconds * 1000 / self.misses if self.misses else 0.0
+
+    @property
+    def refill_ms(self) -> float:
+        return self.refill_seconds * 1000 / self.generated if self.generated else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "generated": self.generated,
+            "hit_rate": round(self.hit_rate, 3),
+            "cold_ms": round(self.cold_ms, 3),
+            "refill_ms": round(self.refill_ms, 3),
+        }
+
+
+class ItemPool[K: Hashable, V]:
+    """
+    Thread safe pool of pre-generated items, by key. Each item is handed out once, so it may be mutated by its taker.
+    A key whose pool drops to half of `size` is refilled on a background thread, one refill per key at a time.
+    When a key's pool is empty, the item is generated on the caller's thread (the cold path).
+    The mean generation latencies of the cold path and of refills are emitted as metrics after each refill.
+    """
+
+    def __init__(self, size: int, name: str = "item_pool"):
+        """
+        :param size: Maximal amount of pooled items per key, 0 disables pooling.
+        :param name: Prefix of the emitted metric names.
+        """
+        self.size = size
+        self.name = name
+        self.stats = PoolStats()
+        self._items: Dict[K, Deque[V]] = {}
+        self._refilling: Set[K] = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="item-pool") if size > 0 else None
+
+    def pop(self, key: K, generate: Callable[[], V]) -> V:
+        """
+        :param generate: Creates a new item of the key, used for the cold path and for refilling.
+        """
+        with self._lock:
+            items = self._items.setdefault(key, deque())
+            taken = [items.popleft()] if items else []
+            if taken:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+            should_refill = self._executor is not None and len(items) <= self.size // 2 and key not in self._refilling
+            if should_refill:
+                self._refilling.add(key)
+        if should_refill and self._executor is not None:
+            self._executor.submit(self._refill, key, generate)
+        if taken:
+            return taken[0]
+        log.debug(
+            f"Pool of [{key}] is empty, generating on the request path", extra={"pool_stats": self.stats.as_dict()}
+        )
+        start = time.perf_counter()
+        item = generate()
+        with self._lock:
+            self.stats.cold_seconds += time.perf_counter() - start
+        return item
+
+    def fill(self, key: K, generate: Callable[[], V]) -> int:
+        """
+        Generates items until the key's pool is full, and returns the amount of generated items.
+        """
+        generated = 0
+        while self._has_room(key):
+            start = time.perf_counter()
+            item = generate()
+            with self._lock:
+                items = self._items.setdefault(key, deque())
+                if len(items) >= self.size:
+                    break
+                items.append(item)
+                self.stats.generated += 1
+                self.stats.refill_seconds += time.perf_counter() - start
+            generated += 1
+        return generated
+
+    def pooled(self, key: K) -> int:
+        with self._lock:
+            return len(self._items.get(key, ()))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def _has_room(self, key: K) -> bool:
+        with self._lock:
+            return len(self._items.get(key, ())) < self.size
+
+    def _refill(self, key: K, generate: Callable[[], V]) -> None:
+        try:
+            generated = self.fill(key, generate)
+            log.debug(f"Pool of [{key}] refilled with {generated} items", extra={"pool_stats": self.stats.as_dict()})
+            self._emit_stats()
+        except Exception:  # pylint: disable=broad-exception-caught
+            log.exception(f"Failed refilling pool of [{key}]")
+        finally:
+            with self._lock:
+                self._refilling.discard(key)
+
+    def _emit_stats(self) -> None:
+        with self._lock:
+            stats = self.stats.as_dict()
+        metrics = {
+            f"{self.name}_hit_rate": stats["hit_rate"],
+            f"{self.name}_cold_ms": stats["cold_ms"],
+            f"{self.name}_refill_ms": stats["refill_ms"],
+        }
+        emit_metrics(metrics, properties={"pool_stats": stats})
+
+
+@lru_cache()
+def get_state_pool() -> ItemPool[tuple, Any]:
+    return ItemPool(size=config.board_pool_size, name="state_pool")
+
+
+@lru_cache()
+def get_cached_vocabulary(language: str) -> Vocabulary:
+    return get_vocabulary(language=language)
+
+
+def new_classic_state(language: str, first_team: ClassicTeam | None = None) -> ClassicGameState:
+    """
+    A new game state, on a freshly shuffled board.
+    """
+    key = (GameType.CLASSIC, language, first_team)
+    return get_state_pool().pop(key, generate=functools.partial(generate_classic_state, language, first_team))
+
+
+def new_duet_state(language: str) -> DuetGameState:
+    key = (GameType.DUET, language)
+    return get_state_pool().pop(key, generate=functools.partial(generate_duet_state, language))
+
+
+def new_mini_state(language: str, green_amount: int) -> MiniGameState:
+    key = (GameType.MINI, language, green_amount)
+    return get_state_pool().pop(key, generate=functools.partial(generate_mini_state, language, green_amount))
+
+
+def generate_classic_state(language: str, first_team: ClassicTeam | None) -> ClassicGameState:
+    vocabulary = get_cached_vocabulary(language=language)
+    board = ClassicBoard.from_vocabulary(vocabulary=vocabulary, first_team=first_team)
+    return ClassicGameState.from_board(board=board)
+
+
+def generate_duet_state(language: str) -> DuetGameState:
+    board = DuetBoard.from_vocabulary(vocabulary=get_cached_vocabulary(language=language))
+    return DuetGameState.from_board(board=board)
+
+
+def generate_mini_state(language: str, green_amount: int) -> MiniGameState:
+    board = DuetBoard.from_vocabulary(vocabulary=get_cached_vocabulary(language=language), green_amount=green_amount)
+    return MiniGameState.from_board(board=board)
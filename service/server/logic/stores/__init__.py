@@ -0,0 +1,2 @@
+from .base import *  # noqa
+from .factory import *  # noqa
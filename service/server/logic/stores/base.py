@@ -0,0 +1,186 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Iterator, List, Protocol, Sequence
+
+
+class GameStorageMode(str, Enum):
+    """
+    FULL: Every save rewrites the whole game state.
+    MOVE_LOG: Every save appends a small move item (a diff from the previous state) under the game key,
+    and the whole state is re-written as a snapshot only once every `game_snapshot_interval` versions.
+    Loading rebuilds the state from the latest snapshot and the moves that follow it.
+    Both modes read each other's items, but a single game should not be written by both modes concurrently.
+    """
+
+    FULL = "full"
+    MOVE_LOG = "move_log"
+
+
+class ReadConsistency(str, Enum):
+    """
+    STRONG: Reads reflect every write that succeeded before them. Required before applying a move to a game.
+    EVENTUAL: Reads may miss very recent writes, at half the read cost on DynamoDB. Good enough for state polling.
+    """
+
+    STRONG = "strong"
+    EVENTUAL = "eventual"
+
+
+class GameStoreConflictError(Exception):
+    """
+    A conditional write failed: the stored snapshot version or move did not match the expected one.
+    """
+
+
+@dataclass
+class GameHead:
+    version: int | None
+    storage_mode: str | None
+
+    @property
+    def has_move_log(self) -> bool:
+        return self.storage_mode == GameStorageMode.MOVE_LOG
+
+
+@dataclass
+class GameSnapshot(GameHead):
+    state_data: dict
+    # Unix time after which the store may delete the game, None to keep it forever.
+    expire_ts: float | None = None
+    # Listing attributes: games of anonymous users have no owner, and are not listed.
+    owner: str | None = None
+    game_type: str | None = None
+
+
+@dataclass
+class GameListing:
+    game_id: str
+    game_type: str
+    updated_ts: float
+
+
+@dataclass
+class GameListPage:
+    listings: List[GameListing]
+    # Store specific and JSON serializable, None on the last page.
+    next_cursor: dict | None = None
+
+
+@dataclass
+class ModelPreload:
+    # Model usage keys (see `server.logic.model_usage`) of the models that were pre-loaded.
+    model_keys: List[str]
+    preloaded_ts: float
+
+
+class GameStore(Protocol):
+    """
+    Storage engine of game snapshots and move logs.
+    Versioning, move log replay and caching are implemented on top of it, in `server.logic.db`.
+    """
+
+    def load_snapshot(self, game_id: str, consistency: ReadConsistency = ReadConsistency.STRONG) -> GameSnapshot:
+        """
+        :raises GameDoesNotExistError: If the game was never saved.
+        """
+
+    def load_head(self, game_id: str, consistency: ReadConsistency = ReadConsistency.STRONG) -> GameHead:
+        """
+        Like `load_snapshot`, without the state data.
+
+        :raises GameDoesNotExistError: If the game was never saved.
+        """
+
+    def save_snapshot(self, game_id: str, snapshot: GameSnapshot, expected_version: int | None) -> None:
+        """
+        Writes the snapshot only if the stored snapshot version is `expected_version`
+        (`None` means no versioned snapshot is stored).
+
+        :raises GameStoreConflictError: If the stored snapshot version is different.
+        """
+
+    def load_snapshots(
+        self, game_ids: Sequence[str], consistency: ReadConsistency = ReadConsistency.STRONG
+    ) -> Dict[str, GameSnapshot]:
+        """
+        Bulk `load_snapshot`, by game id. Games that were never saved are omitted.
+        """
+
+    def save_snapshots(self, snapshots: Dict[str, GameSnapshot]) -> None:
+        """
+        Bulk, unconditional `save_snapshot`, by game id.
+        """
+
+    def append_move(self, game_id: str, version: int, delta: List[list], expire_ts: float | None = None) -> None:
+        """
+        An `expire_ts` also refreshes the game's expiry, and makes it expiring again if it was archived.
+
+        :raises GameStoreConflictError: If a move of this version already exists.
+        """
+
+    def load_moves(
+        self, game_id: str, versions: range, consistency: ReadConsistency = ReadConsistency.STRONG
+    ) -> Dict[int, List[list]]:
+        """
+        Returns the stored moves deltas out of the requested versions, by version.
+        """
+
+    def has_move(self, game_id: str, version: int, consistency: ReadConsistency = ReadConsistency.STRONG) -> bool: ...
+
+    def expire_moves(self, game_id: str, versions: range, expire_ts: float) -> None:
+        """
+        Sets the expiry of the stored moves out of the requested versions (moves a snapshot superseded).
+        Expired moves are neither loaded nor found, and are deleted by the store.
+        """
+
+    def iter_expiring_game_ids(self, expire_before: float) -> Iterator[str]:
+        """
+        Yields games which expire before the given time, and were not archived since they were last saved.
+        """
+
+    def mark_archived(self, game_id: str, version: int | None) -> None:
+        """
+        Marks the game as archived, unless its snapshot was re-written since it was archived (its version changed).
+        """
+
+    def list_owner_games(self, owner: str, limit: int, cursor: dict | None = None) -> GameListPage:
+        """
+        Lists the owner's games, most recently saved first.
+        """
+
+    def load_move_result(self, key: str) -> dict | None:
+        """
+        Returns a solver result saved by `save_move_result`, None if there is none (or it expired).
+        """
+
+    def save_move_result(self, key: str, result: dict, expire_ts: float | None = None) -> None:
+        """
+        Unconditionally writes a solver result. Results are content addressed, so concurrent writes of a key are equal.
+        """
+
+
+class ModelUsageStore(Protocol):
+    """
+    Storage of the solver model usage counts and the last model preload (see `server.logic.model_usage`).
+    The game stores implement it as well, in the same table or database.
+    """
+
+    def add_model_usage(self, hour: int, requests: Dict[str, int], expire_ts: float | None = None) -> None:
+        """
+        Adds request counts to the stored counts of an hour (Unix time // 3600), by model usage key.
+        Concurrent adds of the same hour are all counted.
+
+        :raises GameStoreConflictError: If the hour kept being modified concurrently.
+        """
+
+    def load_model_usage(self, hours: Sequence[int]) -> Dict[int, Dict[str, int]]:
+        """
+        Returns the request counts of the requested hours, by hour and model usage key. Hours without usage are omitted.
+        """
+
+    def load_model_preload(self) -> ModelPreload | None:
+        """
+        Returns the last saved model preload, None if models were never pre-loaded.
+        """
+
+    def save_model_preload(self, preload: ModelPreload) -> None: ...
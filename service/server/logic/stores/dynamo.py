@@ -0,0 +1,561 @@
+import functools
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Type
+
+from pynamodb.attributes import (
+    BinaryAttribute,
+    JSONAttribute,
+    NumberAttribute,
+    TTLAttribute,
+    UnicodeAttribute,
+    VersionAttribute,
+)
+from pynamodb.exceptions import GetError, PutError, UpdateError
+from pynamodb.indexes import GlobalSecondaryIndex, IncludeProjection, KeysOnlyProjection
+from pynamodb.models import Model
+from the_spymaster_api.structs import GameDoesNotExistError
+from the_spymaster_util.logger import get_logger
+
+from server.logic.batching import backoff_sleep, chunked, map_concurrently
+from server.logic.codecs import get_state_codec
+from server.logic.stores.base import (
+    GameHead,
+    GameListing,
+    GameListPage,
+    GameSnapshot,
+    GameStorageMode,
+    GameStoreConflictError,
+    ModelPreload,
+    ReadConsistency,
+)
+from the_spymaster.config import get_config
+
+log = get_logger(__name__)
+config = get_config()
+
+# DynamoDB limits of a single BatchGetItem / BatchWriteItem request.
+BATCH_GET_LIMIT = 100
+BATCH_WRITE_LIMIT = 25
+
+# Game state is stored as JSON in the `state_data` attribute, rather than as an encoded `state_blob`.
+JSON_ATTRIBUTE_CODEC = "json-attribute"
+
+
+def get_game_item_id(game_id: str) -> str:
+    return f"game::{game_id}"
+
+
+def get_game_id(game_item_id: str) -> str:
+    return game_item_id.removeprefix("game::")
+
+
+def get_game_move_item_id(game_id: str, version: int) -> str:
+    return f"game::{game_id}::move::{version}"
+
+
+def get_move_result_item_id(key: str) -> str:
+    return f"move-result::{key}"
+
+
+def get_model_usage_item_id(hour: int) -> str:
+    return f"model-usage::{hour}"
+
+
+MODEL_PRELOAD_ITEM_ID = "model-preload"
+
+# Expiring games are spread over several index partitions, so game saves do not all write to a single one.
+ARCHIVE_INDEX_SHARDS = 8
+
+
+def get_archive_shard(game_id: str) -> int:
+    return zlib.crc32(game_id.encode()) % ARCHIVE_INDEX_SHARDS
+
+
+class RawBinaryAttribute(BinaryAttribute):
+    """
+    PynamoDB 5 base64 encodes binary values on top of the wire encoding, which stores a third more bytes.
+    This attribute stores the raw bytes (like PynamoDB 6's `legacy_encoding=False`).
+    """
+
+    def serialize(self, value: bytes) -> bytes:
+        return value
+
+    def deserialize(self, value: bytes) -> bytes:
+        return value
+
+
+class GameOwnerIndex(GlobalSecondaryIndex):
+    """
+    Games by owner, most recently saved last. Move items and games of anonymous users have no owner,
+    so they are not indexed.
+    """
+
+    class Meta:
+        index_name = "owner-updated_ts-index"
+        projection = IncludeProjection(["game_type"])
+        read_capacity_units = 1
+        write_capacity_units = 1
+
+    owner = UnicodeAttribute(hash_key=True)
+    updated_ts = NumberAttribute(range_key=True)
+
+
+class GameArchiveIndex(GlobalSecondaryIndex):
+    """
+    Expiring games that were not archived since they were last saved, by expiry. Sparse: only such games have an
+    `archive_shard`, which archiving removes.
+    """
+
+    class Meta:
+        index_name = "archive_shard-expire_ts-index"
+        projection = KeysOnlyProjection()
+        read_capacity_units = 1
+        write_capacity_units = 1
+
+    archive_shard = NumberAttribute(hash_key=True)
+    expire_ts = TTLAttribute(range_key=True)
+
+
+class GameItem(Model):
+    class Meta:
+        table_name = config.game_items_table_name
+        host = config.dynamo_db_host
+        # Retries of unprocessed batch items (PynamoDB's defaults, also used by the batch get below)
+        max_retry_attempts = 3
+        base_backoff_ms = 25
+
+    item_id = UnicodeAttribute(hash_key=True)
+    state_data = JSONAttribute(null=True)
+    state_blob = RawBinaryAttribute(null=True)
+    state_codec = UnicodeAttribute(null=True)
+    updated_ts = NumberAttribute()
+    version = VersionAttribute()
+    storage_mode = UnicodeAttribute(null=True)
+    expire_ts = TTLAttribute(null=True)
+    archived_ts = NumberAttribute(null=True)
+    owner = UnicodeAttribute(null=True)
+    game_type = UnicodeAttribute(null=True)
+    archive_shard = NumberAttribute(null=True)
+
+    owner_index = GameOwnerIndex()
+    archive_index = GameArchiveIndex()
+
+    def save(self, *args, **kwargs) -> Dict[str, Any]:
+        self.updated_ts = time.time()
+        return super().save(*args, **kwargs)
+
+    @classmethod
+    def load(cls, game_id: str, *args, **kwargs) -> "GameItem":
+        hash_key = get_game_item_id(game_id=game_id)
+        return super().get(*args, hash_key=hash_key, **kwargs)  # type: ignore
+
+    @property
+    def has_move_log(self) -> bool:
+        return self.storage_mode == GameStorageMode.MOVE_LOG
+
+    def get_state_data(self) -> dict:
+        if self.state_blob is None:
+            return self.state_data
+        return get_state_codec(self.state_codec).decode(self.state_blob)
+
+    def set_state_data(self, state_data: dict, codec_name: str) -> None:
+        if codec_name == JSON_ATTRIBUTE_CODEC:
+            self.state_data, self.state_blob, self.state_codec = state_data, None, None
+            return
+        codec = get_state_codec(codec_name)
+        self.state_data, self.state_blob, self.state_codec = None, codec.encode(state_data), codec.name
+
+
+class GameMoveItem(Model):
+    class Meta:
+        table_name = config.game_items_table_name
+        host = config.dynamo_db_host
+
+    item_id = UnicodeAttribute(hash_key=True)
+    version = NumberAttribute()
+    delta = JSONAttribute()
+    updated_ts = NumberAttribute()
+    expire_ts = TTLAttribute(null=True)
+
+    def save(self, *args, **kwargs) -> Dict[str, Any]:
+        self.updated_ts = time.time()
+        return super().save(*args, **kwargs)
+
+
+class MoveResultItem(Model):
+    class Meta:
+        table_name = config.game_items_table_name
+        host = config.dynamo_db_host
+
+    item_id = UnicodeAttribute(hash_key=True)
+    result = JSONAttribute()
+    updated_ts = NumberAttribute()
+    expire_ts = TTLAttribute(null=True)
+
+    def save(self, *args, **kwargs) -> Dict[str, Any]:
+        self.updated_ts = time.time()
+        return super().save(*args, **kwargs)
+
+
+class ModelUsageItem(Model):
+    """
+    Request counts of an hour, by model usage key. Counts are merged into the item under its version, so concurrent
+    processes that flush the same hour do not overwrite each other.
+    """
+
+    class Meta:
+        table_name = config.game_items_table_name
+        host = config.dynamo_db_host
+        max_retry_attempts = 3
+        base_backoff_ms = 25
+
+    item_id = UnicodeAttribute(hash_key=True)
+    hour = NumberAttribute()
+    requests = JSONAttribute()
+    updated_ts = NumberAttribute()
+    version = VersionAttribute()
+    expire_ts = TTLAttribute(null=True)
+
+    def save(self, *args, **kwargs) -> Dict[str, Any]:
+        self.updated_ts = time.time()
+        return super().save(*args, **kwargs)
+
+
+class ModelPreloadItem(Model):
+    class Meta:
+        table_name = config.game_items_table_name
+        host = config.dynamo_db_host
+
+    item_id = UnicodeAttribute(hash_key=True)
+    model_keys = JSONAttribute()
+    preloaded_ts = NumberAttribute()
+
+
+@dataclass
+class ReadCapacityStats:
+    reads: int = 0
+    capacity_units: float = 0
+
+    @property
+    def units_per_read(self) -> float:
+        return self.capacity_units / self.reads if self.reads else 0.0
+
+
+@dataclass
+class ConsumedCapacityStats:
+    """
+    Read capacity units reported by DynamoDB, by read consistency.
+    """
+
+    by_consistency: Dict[ReadConsistency, ReadCapacityStats] = field(
+        default_factory=lambda: {consistency: ReadCapacityStats() for consistency in ReadConsistency}
+    )
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, consistency: ReadConsistency, capacity_units: float) -> None:
+        with self._lock:
+            stats = self.by_consistency[consistency]
+            stats.reads += 1
+            stats.capacity_units += capacity_units
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                consistency.value: {
+                    "reads": stats.reads,
+                    "capacity_units": stats.capacity_units,
+                    "units_per_read": stats.units_per_read,
+                }
+                for consistency, stats in self.by_consistency.items()
+            }
+
+
+class DynamoGameStore:
+    """
+    Snapshots and moves are items of the same table, so a game and its log live under a single key prefix.
+    """
+
+    def __init__(self):
+        self.capacity_stats = ConsumedCapacityStats()
+
+    def load_snapshot(self, game_id: str, consistency: ReadConsistency = ReadConsistency.STRONG) -> GameSnapshot:
+        game_item = self._load_game_item(game_id=game_id, consistency=consistency)
+        return _to_snapshot(game_item)
+
+    def load_head(self, game_id: str, consistency: ReadConsistency = ReadConsistency.STRONG) -> GameHead:
+        attributes = ["version", "storage_mode"]
+        game_item = self._load_game_item(game_id=game_id, consistency=consistency, attributes_to_get=attributes)
+        return GameHead(version=game_item.version, storage_mode=game_item.storage_mode)
+
+    def save_snapshot(self, game_id: str, snapshot: GameSnapshot, expected_version: int | None) -> None:
+        # The version is incremented by PynamoDB on save.
+        stored_version = snapshot.version - 1 if snapshot.version is not None and snapshot.version > 1 else None
+        game_item = _to_game_item(game_id=game_id, snapshot=snapshot, version=stored_version)
+        if expected_version is None:
+            condition = GameItem.version.does_not_exist()
+        else:
+            condition = GameItem.version == expected_version
+        with _conflict_guard():
+            game_item.save(condition=condition, add_version_condition=False)
+
+    def load_snapshots(
+        self, game_ids: Sequence[str], consistency: ReadConsistency = ReadConsistency.STRONG
+    ) -> Dict[str, GameSnapshot]:
+        keys = [{"item_id": get_game_item_id(game_id=game_id)} for game_id in dict.fromkeys(game_ids)]
+        chunks = chunked(keys, size=BATCH_GET_LIMIT)
+        load_chunk = functools.partial(self._batch_get_chunk, consistency=consistency)
+        snapshots = {}
+        for game_items in map_concurrently(load_chunk, chunks, max_workers=config.game_batch_max_workers):
+            for game_item in game_items:
+                snapshots[get_game_id(game_item.item_id)] = _to_snapshot(game_item)
+        return snapshots
+
+    def save_snapshots(self, snapshots: Dict[str, GameSnapshot]) -> None:
+        # Batch writes skip `Model.save`, so versions are written as is.
+        game_items = [
+            _to_game_item(game_id=game_id, snapshot=snapshot, version=snapshot.version)
+            for game_id, snapshot in snapshots.items()
+        ]
+        chunks = chunked(game_items, size=BATCH_WRITE_LIMIT)
+        map_concurrently(_batch_write_chunk, chunks, max_workers=config.game_batch_max_workers)
+
+    def append_move(self, game_id: str, version: int, delta: List[list], expire_ts: float | None = None) -> None:
+        item_id = get_game_move_item_id(game_id=game_id, version=version)
+        move_item = GameMoveItem(item_id=item_id, version=version, delta=delta, expire_ts=_to_datetime(expire_ts))
+        with _conflict_guard():
+            move_item.save(condition=GameMoveItem.item_id.does_not_exist())
+        if expire_ts is not None:
+            self._refresh_expiry(game_id=game_id, expire_ts=expire_ts)
+
+    def load_moves(
+        self, game_id: str, versions: range, consistency: ReadConsistency = ReadConsistency.STRONG
+    ) -> Dict[int, List[list]]:
+        keys = [get_game_move_item_id(game_id=game_id, version=v) for v in versions]
+        consistent_read = consistency == ReadConsistency.STRONG
+        move_items = GameMoveItem.batch_get(keys, consistent_read=consistent_read)
+        return {int(item.version): item.delta for item in move_items if not _is_expired(item)}
+
+    def has_move(self, game_id: str, version: int, consistency: ReadConsistency = ReadConsistency.STRONG) -> bool:
+        move_id = get_game_move_item_id(game_id=game_id, version=version)
+        move_item = self._get_item(
+            GameMoveItem, hash_key=move_id, consistency=consistency, attributes_to_get=["version", "expire_ts"]
+        )
+        return move_item is not None and not _is_expired(move_item)
+
+    def expire_moves(self, game_id: str, versions: range, expire_ts: float) -> None:
+        # An item per move (the items are small, so each update costs a single write unit).
+        connection = GameMoveItem._get_connection()  # pylint: disable=protected-access
+
+        def expire_move(version: int) -> None:
+            try:
+                connection.update_item(
+                    get_game_move_item_id(game_id=game_id, version=version),
+                    actions=[GameMoveItem.expire_ts.set(_to_datetime(expire_ts))],
+                    condition=GameMoveItem.item_id.exists(),
+                )
+            except UpdateError as e:  # pylint: disable=invalid-name
+                if e.cause_response_code != "ConditionalCheckFailedException":
+                    raise
+
+        map_concurrently(expire_move, versions, max_workers=config.game_batch_max_workers)
+
+    def iter_expiring_game_ids(self, expire_before: float) -> Iterator[str]:
+        # Move items, and snapshots written before TTLs were introduced, have no `archive_shard`.
+        range_key_condition = GameArchiveIndex.expire_ts < _to_datetime(expire_before)
+        for shard in range(ARCHIVE_INDEX_SHARDS):
+            for game_item in GameItem.archive_index.query(shard, range_key_condition=range_key_condition):
+                yield get_game_id(game_item.item_id)
+
+    def mark_archived(self, game_id: str, version: int | None) -> None:
+        # `Model.update` would bump the version, and fail the next save of a loaded game.
+        connection = GameItem._get_connection()  # pylint: disable=protected-access
+        condition = GameItem.version.does_not_exist() if version is None else GameItem.version == version
+        try:
+            connection.update_item(
+                get_game_item_id(game_id=game_id),
+                actions=[GameItem.archived_ts.set(time.time()), GameItem.archive_shard.remove()],
+                condition=condition & GameItem.item_id.exists(),
+            )
+        except UpdateError as e:  # pylint: disable=invalid-name
+            if e.cause_response_code != "ConditionalCheckFailedException":
+                raise
+            log.info(f"Game [{game_id}] was modified or deleted after it was archived")
+
+    def _refresh_expiry(self, game_id: str, expire_ts: float) -> None:
+        # Snapshots are not written on every move, so the game would otherwise expire (or stay archived) mid-match.
+        connection = GameItem._get_connection()  # pylint: disable=protected-access
+        actions = [
+            GameItem.expire_ts.set(_to_datetime(expire_ts)),
+            GameItem.archive_shard.set(get_archive_shard(game_id)),
+            GameItem.archived_ts.remove(),
+        ]
+        try:
+            connection.update_item(
+                get_game_item_id(game_id=game_id), actions=actions, condition=GameItem.item_id.exists()
+            )
+        except UpdateError:
+            # The move is saved, and the game still expires no sooner than its last snapshot.
+            log.warning(f"Failed refreshing the expiry of game [{game_id}]", exc_info=True)
+
+    def list_owner_games(self, owner: str, limit: int, cursor: dict | None = None) -> GameListPage:
+        # The cursor is DynamoDB's last evaluated key, which is the index key of the last listed game.
+        results = GameItem.owner_index.query(
+            owner, scan_index_forward=False, limit=limit, last_evaluated_key=cursor, page_size=limit
+        )
+        listings = [
+            GameListing(game_id=get_game_id(item.item_id), game_type=item.game_type, updated_ts=item.updated_ts)
+            for item in results
+        ]
+        return GameListPage(listings=listings, next_cursor=results.last_evaluated_key)
+
+    def load_move_result(self, key: str) -> dict | None:
+        # Results never change once written, so a stale read can only miss a very recent result.
+        item_id = get_move_result_item_id(key=key)
+        result_item = self._get_item(MoveResultItem, hash_key=item_id, consistency=ReadConsistency.EVENTUAL)
+        return result_item.result if result_item else None
+
+    def save_move_result(self, key: str, result: dict, expire_ts: float | None = None) -> None:
+        item_id = get_move_result_item_id(key=key)
+        MoveResultItem(item_id=item_id, result=result, expire_ts=_to_datetime(expire_ts)).save()
+
+    def add_model_usage(self, hour: int, requests: Dict[str, int], expire_ts: float | None = None) -> None:
+        item_id = get_model_usage_item_id(hour=hour)
+        for attempt in range(ModelUsageItem.Meta.max_retry_attempts):
+            if attempt:
+                backoff_sleep(attempt=attempt - 1, base_backoff_ms=ModelUsageItem.Meta.base_backoff_ms)
+            usage_item = self._get_item(ModelUsageItem, hash_key=item_id, consistency=ReadConsistency.STRONG)
+            if usage_item is None:
+                usage_item = ModelUsageItem(item_id=item_id, hour=hour, requests={})
+            merged = dict(usage_item.requests)
+            for model_key, count in requests.items():
+                merged[model_key] = merged.get(model_key, 0) + count
+            usage_item.requests = merged
+            usage_item.expire_ts = _to_datetime(expire_ts)
+            try:
+                with _conflict_guard():
+                    usage_item.save()
+                return
+            except GameStoreConflictError:
+                log.info(f"Model usage of hour [{hour}] was modified concurrently, retrying")
+        raise GameStoreConflictError()
+
+    def load_model_usage(self, hours: Sequence[int]) -> Dict[int, Dict[str, int]]:
+        keys = [get_model_usage_item_id(hour=hour) for hour in hours]
+        return {int(item.hour): item.requests for item in ModelUsageItem.batch_get(keys)}
+
+    def load_model_preload(self) -> ModelPreload | None:
+        preload_item = self._get_item(
+            ModelPreloadItem, hash_key=MODEL_PRELOAD_ITEM_ID, consistency=ReadConsistency.STRONG
+        )
+        if preload_item is None:
+            return None
+        return ModelPreload(model_keys=preload_item.model_keys, preloaded_ts=preload_item.preloaded_ts)
+
+    def save_model_preload(self, preload: ModelPreload) -> None:
+        ModelPreloadItem(
+            item_id=MODEL_PRELOAD_ITEM_ID, model_keys=preload.model_keys, preloaded_ts=preload.preloaded_ts
+        ).save()
+
+    def _batch_get_chunk(self, keys: Sequence[dict], consistency: ReadConsistency) -> List[GameItem]:
+        # Unlike `Model.batch_get`, unprocessed keys (throttling) are retried with a backoff.
+        connection = GameItem._get_connection()  # pylint: disable=protected-access
+        table_name = GameItem.Meta.table_name
+        game_items: List[GameItem] = []
+        for attempt in range(GameItem.Meta.max_retry_attempts):
+            if attempt:
+                backoff_sleep(attempt=attempt - 1, base_backoff_ms=GameItem.Meta.base_backoff_ms)
+            consistent_read = consistency == ReadConsistency.STRONG
+            data = connection.batch_get_item(keys, consistent_read=consistent_read)  # type: ignore[arg-type]
+            capacity_units = sum(float(c.get("CapacityUnits", 0)) for c in data.get("ConsumedCapacity", []))
+            self.capacity_stats.record(consistency=consistency, capacity_units=capacity_units)
+            game_items.extend(GameItem.from_raw_data(item) for item in data["Responses"].get(table_name, []))
+            keys = data.get("UnprocessedKeys", {}).get(table_name, {}).get("Keys")
+            if not keys:
+                return game_items
+            log.info(f"Retrying [{len(keys)}] unprocessed keys of a batch get")
+        raise GetError("Failed to batch get items: max_retry_attempts exceeded")
+
+    def _load_game_item(self, game_id: str, consistency: ReadConsistency, **kwargs) -> GameItem:
+        hash_key = get_game_item_id(game_id=game_id)
+        game_item = self._get_item(GameItem, hash_key=hash_key, consistency=consistency, **kwargs)
+        if game_item is None:
+            raise GameDoesNotExistError.create(game_id=game_id)
+        return game_item
+
+    def _get_item[M: Model](
+        self, model: Type[M], hash_key: str, consistency: ReadConsistency, attributes_to_get: List[str] | None = None
+    ) -> M | None:
+        # Like `Model.get`, but keeps the consumed capacity, which PynamoDB drops.
+        connection = model._get_connection()  # pylint: disable=protected-access
+        data = connection.get_item(
+            hash_key,
+            consistent_read=consistency == ReadConsistency.STRONG,
+            attributes_to_get=attributes_to_get,
+        )
+        capacity_units = float(data.get("ConsumedCapacity", {}).get("CapacityUnits", 0))
+        self.capacity_stats.record(consistency=consistency, capacity_units=capacity_units)
+        log.debug(
+            f"Read [{hash_key}] with [{consistency.value}] consistency, consumed [{capacity_units}] units",
+            extra={"capacity_stats": self.capacity_stats.as_dict()},
+        )
+        item_data = data.get("Item")
+        return model.from_raw_data(item_data) if item_data else None
+
+
+def _to_snapshot(game_item: GameItem) -> GameSnapshot:
+    expire_ts = game_item.expire_ts.timestamp() if game_item.expire_ts else None
+    return GameSnapshot(
+        version=game_item.version,
+        storage_mode=game_item.storage_mode,
+        state_data=game_item.get_state_data(),
+        expire_ts=expire_ts,
+        owner=game_item.owner,
+        game_type=game_item.game_type,
+    )
+
+
+def _to_game_item(game_id: str, snapshot: GameSnapshot, version: int | None) -> GameItem:
+    game_item = GameItem(
+        item_id=get_game_item_id(game_id=game_id),
+        storage_mode=snapshot.storage_mode,
+        expire_ts=_to_datetime(snapshot.expire_ts),
+        owner=snapshot.owner,
+        game_type=snapshot.game_type,
+        archive_shard=get_archive_shard(game_id) if snapshot.expire_ts is not None else None,
+    )
+    if version is not None:
+        game_item.version = version
+    game_item.set_state_data(snapshot.state_data, codec_name=config.game_state_codec)
+    return game_item
+
+
+def _batch_write_chunk(game_items: Sequence[GameItem]) -> None:
+    # `BatchWrite` retries unprocessed items with a backoff.
+    with GameItem.batch_write() as batch:
+        for game_item in game_items:
+            game_item.updated_ts = time.time()
+            batch.save(game_item)
+
+
+def _is_expired(move_item: GameMoveItem) -> bool:
+    # DynamoDB deletes expired items lazily, up to a few days after they expire.
+    return move_item.expire_ts is not None and move_item.expire_ts.timestamp() < time.time()
+
+
+def _to_datetime(timestamp: float | None) -> Optional[datetime]:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc) if timestamp is not None else None
+
+
+@contextmanager
+def _conflict_guard() -> Iterator[None]:
+    try:
+        yield
+    except PutError as e:  # pylint: disable=invalid-name
+        if e.cause_response_code != "ConditionalCheckFailedException":
+            raise
+        raise GameStoreConflictError() from e
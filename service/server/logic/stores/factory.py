@@ -0,0 +1,35 @@
+from enum import Enum
+from functools import lru_cache
+
+from server.logic.stores.base import GameStore, ModelUsageStore
+from server.logic.stores.dynamo import DynamoGameStore
+from server.logic.stores.memory import InMemoryGameStore
+from server.logic.stores.sqlite import SqliteGameStore
+from the_spymaster.config import get_config
+
+
+class GameStoreEngine(str, Enum):
+    DYNAMODB = "dynamodb"
+    SQLITE = "sqlite"
+    MEMORY = "memory"
+
+
+type _Store = DynamoGameStore | SqliteGameStore | InMemoryGameStore
+
+
+def get_game_store() -> GameStore:
+    return _create_store(engine=GameStoreEngine(get_config().game_store))
+
+
+def get_model_usage_store() -> ModelUsageStore:
+    return _create_store(engine=GameStoreEngine(get_config().game_store))
+
+
+@lru_cache()
+def _create_store(engine: GameStoreEngine) -> _Store:
+    config = get_config()
+    if engine == GameStoreEngine.SQLITE:
+        return SqliteGameStore(path=config.game_store_sqlite_path, codec_name=config.game_state_codec)
+    if engine == GameStoreEngine.MEMORY:
+        return InMemoryGameStore()
+    return DynamoGameStore()
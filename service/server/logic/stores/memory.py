@@ -0,0 +1,181 @@
+import threading
+import time
+from dataclasses import replace
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from the_spymaster_api.structs import GameDoesNotExistError
+
+from server.logic.stores.base import (
+    GameHead,
+    GameListing,
+    GameListPage,
+    GameSnapshot,
+    GameStoreConflictError,
+    ModelPreload,
+    ReadConsistency,
+)
+
+
+class InMemoryGameStore:  # pylint: disable=unused-argument,too-many-instance-attributes
+    """
+    Process local store, for tests, benchmarks and load tests without external services.
+    State data is kept by reference (it is never mutated in place), so reads and writes cost no serialization.
+    Reads are always strongly consistent, and games never expire (superseded moves do).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots: Dict[str, GameSnapshot] = {}
+        self._moves: Dict[Tuple[str, int], List[list]] = {}
+        self._move_expire_ts: Dict[Tuple[str, int], float] = {}
+        self._archived_versions: Dict[str, int | None] = {}
+        self._updated_ts: Dict[str, float] = {}
+        self._move_results: Dict[str, dict] = {}
+        self._model_usage: Dict[int, Dict[str, int]] = {}
+        self._model_preload: ModelPreload | None = None
+
+    def load_snapshot(self, game_id: str, consistency: ReadConsistency = ReadConsistency.STRONG) -> GameSnapshot:
+        with self._lock:
+            snapshot = self._snapshots.get(game_id)
+        if snapshot is None:
+            raise GameDoesNotExistError.create(game_id=game_id)
+        return snapshot
+
+    def load_head(self, game_id: str, consistency: ReadConsistency = ReadConsistency.STRONG) -> GameHead:
+        snapshot = self.load_snapshot(game_id=game_id)
+        return GameHead(version=snapshot.version, storage_mode=snapshot.storage_mode)
+
+    def save_snapshot(self, game_id: str, snapshot: GameSnapshot, expected_version: int | None) -> None:
+        with self._lock:
+            stored = self._snapshots.get(game_id)
+            stored_version = stored.version if stored else None
+            if stored_version != expected_version:
+                raise GameStoreConflictError()
+            self._snapshots[game_id] = replace(snapshot)
+            self._archived_versions.pop(game_id, None)
+            self._updated_ts[game_id] = time.time()
+
+    def load_snapshots(
+        self, game_ids: Sequence[str], consistency: ReadConsistency = ReadConsistency.STRONG
+    ) -> Dict[str, GameSnapshot]:
+        with self._lock:
+            return {game_id: self._snapshots[game_id] for game_id in game_ids if game_id in self._snapshots}
+
+    def save_snapshots(self, snapshots: Dict[str, GameSnapshot]) -> None:
+        now = time.time()
+        with self._lock:
+            for game_id, snapshot in snapshots.items():
+                self._snapshots[game_id] = replace(snapshot)
+                self._archived_versions.pop(game_id, None)
+                self._updated_ts[game_id] = now
+
+    def append_move(self, game_id: str, version: int, delta: List[list], expire_ts: float | None = None) -> None:
+        with self._lock:
+            self._drop_expired_moves()
+            if (game_id, version) in self._moves:
+                raise GameStoreConflictError()
+            self._moves[game_id, version] = delta
+            snapshot = self._snapshots.get(game_id)
+            if snapshot and expire_ts is not None:
+                self._snapshots[game_id] = replace(snapshot, expire_ts=expire_ts)
+                self._archived_versions.pop(game_id, None)
+
+    def load_moves(
+        self, game_id: str, versions: range, consistency: ReadConsistency = ReadConsistency.STRONG
+    ) -> Dict[int, List[list]]:
+        with self._lock:
+            self._drop_expired_moves()
+            return {v: self._moves[game_id, v] for v in versions if (game_id, v) in self._moves}
+
+    def has_move(self, game_id: str, version: int, consistency: ReadConsistency = ReadConsistency.STRONG) -> bool:
+        with self._lock:
+            self._drop_expired_moves()
+            return (game_id, version) in self._moves
+
+    def expire_moves(self, game_id: str, versions: range, expire_ts: float) -> None:
+        with self._lock:
+            for version in versions:
+                if (game_id, version) in self._moves:
+                    self._move_expire_ts[game_id, version] = expire_ts
+
+    def iter_expiring_game_ids(self, expire_before: float) -> Iterator[str]:
+        with self._lock:
+            expiring = [
+                game_id
+                for game_id, snapshot in self._snapshots.items()
+                if snapshot.expire_ts is not None
+                and snapshot.expire_ts < expire_before
+                and self._archived_versions.get(game_id, -1) != snapshot.version
+            ]
+        yield from expiring
+
+    def mark_archived(self, game_id: str, version: int | None) -> None:
+        with self._lock:
+            snapshot = self._snapshots.get(game_id)
+            if snapshot and snapshot.version == version:
+                self._archived_versions[game_id] = version
+
+    def list_owner_games(self, owner: str, limit: int, cursor: dict | None = None) -> GameListPage:
+        with self._lock:
+            listings = [
+                GameListing(game_id=game_id, game_type=snapshot.game_type, updated_ts=self._updated_ts[game_id])
+                for game_id, snapshot in self._snapshots.items()
+                if snapshot.owner == owner and snapshot.game_type
+            ]
+        listings.sort(key=_sort_key, reverse=True)
+        if cursor:
+            listings = [
+                listing for listing in listings if _sort_key(listing) < (cursor["updated_ts"], cursor["game_id"])
+            ]
+        if len(listings) <= limit:
+            return GameListPage(listings=listings)
+        last = listings[limit - 1]
+        return GameListPage(
+            listings=listings[:limit], next_cursor={"updated_ts": last.updated_ts, "game_id": last.game_id}
+        )
+
+    def load_move_result(self, key: str) -> dict | None:
+        with self._lock:
+            return self._move_results.get(key)
+
+    def save_move_result(self, key: str, result: dict, expire_ts: float | None = None) -> None:
+        with self._lock:
+            self._move_results[key] = result
+
+    def add_model_usage(self, hour: int, requests: Dict[str, int], expire_ts: float | None = None) -> None:
+        with self._lock:
+            hour_usage = self._model_usage.setdefault(hour, {})
+            for model_key, count in requests.items():
+                hour_usage[model_key] = hour_usage.get(model_key, 0) + count
+
+    def load_model_usage(self, hours: Sequence[int]) -> Dict[int, Dict[str, int]]:
+        with self._lock:
+            return {hour: dict(self._model_usage[hour]) for hour in hours if hour in self._model_usage}
+
+    def load_model_preload(self) -> ModelPreload | None:
+        with self._lock:
+            return self._model_preload
+
+    def save_model_preload(self, preload: ModelPreload) -> None:
+        with self._lock:
+            self._model_preload = replace(preload)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._model_usage.clear()
+            self._model_preload = None
+            self._move_results.clear()
+            self._snapshots.clear()
+            self._moves.clear()
+            self._move_expire_ts.clear()
+            self._archived_versions.clear()
+            self._updated_ts.clear()
+
+    def _drop_expired_moves(self) -> None:
+        now = time.time()
+        for key in [key for key, expire_ts in self._move_expire_ts.items() if expire_ts < now]:
+            del self._moves[key], self._move_expire_ts[key]
+
+
+def _sort_key(listing: GameListing) -> Tuple[float, str]:
+    return listing.updated_ts, listing.game_id
@@ -0,0 +1,292 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Sequence
+
+from the_spymaster_api.structs import GameDoesNotExistError
+
+from server.logic.batching import chunked
+from server.logic.codecs import get_state_codec
+from server.logic.stores.base import (
+    GameHead,
+    GameListing,
+    GameListPage,
+    GameSnapshot,
+    GameStoreConflictError,
+    ModelPreload,
+    ReadConsistency,
+)
+from server.logic.stores.dynamo import JSON_ATTRIBUTE_CODEC
+
+# Stay below the bound parameters limit of older SQLite versions (999).
+_MAX_QUERY_PARAMETERS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id TEXT PRIMARY KEY,
+    version INTEGER,
+    storage_mode TEXT,
+    state_codec TEXT NOT NULL,
+    state_blob BLOB NOT NULL,
+    updated_ts REAL NOT NULL,
+    expire_ts REAL,
+    archived_ts REAL,
+    owner TEXT,
+    game_type TEXT
+);
+CREATE INDEX IF NOT EXISTS games_owner_updated_ts ON games (owner, updated_ts);
+CREATE INDEX IF NOT EXISTS games_archive_expire_ts ON games (expire_ts) WHERE archived_ts IS NULL;
+CREATE TABLE IF NOT EXISTS game_moves (
+    game_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    delta TEXT NOT NULL,
+    updated_ts REAL NOT NULL,
+    expire_ts REAL,
+    PRIMARY KEY (game_id, version)
+);
+CREATE TABLE IF NOT EXISTS move_results (
+    key TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    updated_ts REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS model_usage (
+    hour INTEGER NOT NULL,
+    model_key TEXT NOT NULL,
+    requests INTEGER NOT NULL,
+    PRIMARY KEY (hour, model_key)
+);
+CREATE TABLE IF NOT EXISTS model_preloads (
+    preload_id INTEGER PRIMARY KEY CHECK (preload_id = 1),
+    model_keys TEXT NOT NULL,
+    preloaded_ts REAL NOT NULL
+);
+"""
+
+_NOT_EXPIRED = "(expire_ts IS NULL OR expire_ts >= ?)"
+_SNAPSHOT_COLUMNS = ("version", "storage_mode", "state_codec", "state_blob", "expire_ts", "owner", "game_type")
+_SELECT_SNAPSHOT = ", ".join(_SNAPSHOT_COLUMNS)
+_SNAPSHOT_PLACEHOLDERS = ", ".join("?" * len(_SNAPSHOT_COLUMNS))
+_INSERT_SNAPSHOT = (
+    f"INSERT INTO games ({_SELECT_SNAPSHOT}, updated_ts, game_id) VALUES ({_SNAPSHOT_PLACEHOLDERS}, ?, ?)"
+)
+_UPDATE_SNAPSHOT = ", ".join(f"{column} = ?" for column in _SNAPSHOT_COLUMNS)
+
+
+class SqliteGameStore:  # pylint: disable=unused-argument
+    """
+    Single file store, for running the service on one box without DynamoDB.
+    A single connection is shared between threads, and serialized with a lock.
+    Reads are always strongly consistent, and games never expire (superseded moves do).
+    """
+
+    def __init__(self, path: str, codec_name: str):
+        # Without a JSON attribute, the closest thing is a plain JSON blob.
+        codec_name = "json" if codec_name == JSON_ATTRIBUTE_CODEC else codec_name
+        self.codec = get_state_codec(codec_name)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+        self._migrate()
+
+    def load_snapshot(self, game_id: str, consistency: ReadConsistency = ReadConsistency.STRONG) -> GameSnapshot:
+        query = f"SELECT {_SELECT_SNAPSHOT} FROM games WHERE game_id = ?"
+        return _to_snapshot(self._fetch_one(game_id=game_id, query=query))
+
+    def load_head(self, game_id: str, consistency: ReadConsistency = ReadConsistency.STRONG) -> GameHead:
+        query = "SELECT version, storage_mode FROM games WHERE game_id = ?"
+        version, storage_mode = self._fetch_one(game_id=game_id, query=query)
+        return GameHead(version=version, storage_mode=storage_mode)
+
+    def save_snapshot(self, game_id: str, snapshot: GameSnapshot, expected_version: int | None) -> None:
+        values = (*self._encode(snapshot), time.time(), game_id)
+        with self._lock:
+            if expected_version is None:
+                try:
+                    self._connection.execute(_INSERT_SNAPSHOT, values)
+                except sqlite3.IntegrityError as e:  # pylint: disable=invalid-name
+                    raise GameStoreConflictError() from e
+                return
+            cursor = self._connection.execute(
+                f"UPDATE games SET {_UPDATE_SNAPSHOT}, updated_ts = ?, archived_ts = NULL "
+                "WHERE game_id = ? AND version = ?",
+                (*values, expected_version),
+            )
+        if cursor.rowcount == 0:
+            raise GameStoreConflictError()
+
+    def load_snapshots(
+        self, game_ids: Sequence[str], consistency: ReadConsistency = ReadConsistency.STRONG
+    ) -> Dict[str, GameSnapshot]:
+        snapshots = {}
+        for chunk in chunked(game_ids, size=_MAX_QUERY_PARAMETERS):
+            placeholders = ", ".join("?" * len(chunk))
+            query = f"SELECT {_SELECT_SNAPSHOT}, game_id FROM games WHERE game_id IN ({placeholders})"
+            with self._lock:
+                rows = self._connection.execute(query, tuple(chunk)).fetchall()
+            snapshots.update({row[-1]: _to_snapshot(row[:-1]) for row in rows})
+        return snapshots
+
+    def save_snapshots(self, snapshots: Dict[str, GameSnapshot]) -> None:
+        now = time.time()
+        rows = [(*self._encode(snapshot), now, game_id) for game_id, snapshot in snapshots.items()]
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.executemany(_INSERT_SNAPSHOT.replace("INSERT", "INSERT OR REPLACE", 1), rows)
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def append_move(self, game_id: str, version: int, delta: List[list], expire_ts: float | None = None) -> None:
+        with self._lock:
+            # An expired move is replaced, like DynamoDB would have deleted it.
+            self._connection.execute(
+                "DELETE FROM game_moves WHERE game_id = ? AND version = ? AND expire_ts < ?",
+                (game_id, version, time.time()),
+            )
+            try:
+                self._connection.execute(
+                    "INSERT INTO game_moves (game_id, version, delta, updated_ts) VALUES (?, ?, ?, ?)",
+                    (game_id, version, json.dumps(delta), time.time()),
+                )
+            except sqlite3.IntegrityError as e:  # pylint: disable=invalid-name
+                raise GameStoreConflictError() from e
+            if expire_ts is not None:
+                self._connection.execute(
+                    "UPDATE games SET expire_ts = ?, archived_ts = NULL WHERE game_id = ?", (expire_ts, game_id)
+                )
+
+    def load_moves(
+        self, game_id: str, versions: range, consistency: ReadConsistency = ReadConsistency.STRONG
+    ) -> Dict[int, List[list]]:
+        query = (
+            "SELECT version, delta FROM game_moves WHERE game_id = ? AND version >= ? AND version < ? "
+            f"AND {_NOT_EXPIRED}"
+        )
+        with self._lock:
+            rows = self._connection.execute(query, (game_id, versions.start, versions.stop, time.time())).fetchall()
+        return {version: json.loads(delta) for version, delta in rows}
+
+    def has_move(self, game_id: str, version: int, consistency: ReadConsistency = ReadConsistency.STRONG) -> bool:
+        query = f"SELECT 1 FROM game_moves WHERE game_id = ? AND version = ? AND {_NOT_EXPIRED}"
+        with self._lock:
+            return self._connection.execute(query, (game_id, version, time.time())).fetchone() is not None
+
+    def expire_moves(self, game_id: str, versions: range, expire_ts: float) -> None:
+        query = "UPDATE game_moves SET expire_ts = ? WHERE game_id = ? AND version >= ? AND version < ?"
+        with self._lock:
+            self._connection.execute(query, (expire_ts, game_id, versions.start, versions.stop))
+            # Nothing else deletes expired rows.
+            self._connection.execute("DELETE FROM game_moves WHERE expire_ts < ?", (time.time(),))
+
+    def iter_expiring_game_ids(self, expire_before: float) -> Iterator[str]:
+        query = "SELECT game_id FROM games WHERE expire_ts < ? AND archived_ts IS NULL"
+        with self._lock:
+            rows = self._connection.execute(query, (expire_before,)).fetchall()
+        for (game_id,) in rows:
+            yield game_id
+
+    def mark_archived(self, game_id: str, version: int | None) -> None:
+        query = "UPDATE games SET archived_ts = ? WHERE game_id = ? AND version IS ?"
+        with self._lock:
+            self._connection.execute(query, (time.time(), game_id, version))
+
+    def list_owner_games(self, owner: str, limit: int, cursor: dict | None = None) -> GameListPage:
+        # Keyset pagination, the cursor is the sort key of the last listed game.
+        query = "SELECT game_id, game_type, updated_ts FROM games WHERE owner = ?"
+        parameters: tuple = (owner,)
+        if cursor:
+            query += " AND (updated_ts, game_id) < (?, ?)"
+            parameters += (cursor["updated_ts"], cursor["game_id"])
+        query += " ORDER BY updated_ts DESC, game_id DESC LIMIT ?"
+        with self._lock:
+            rows = self._connection.execute(query, (*parameters, limit + 1)).fetchall()
+        listings = [GameListing(game_id=game_id, game_type=game_type, updated_ts=ts) for game_id, game_type, ts in rows]
+        if len(listings) <= limit:
+            return GameListPage(listings=listings)
+        last = listings[limit - 1]
+        return GameListPage(
+            listings=listings[:limit], next_cursor={"updated_ts": last.updated_ts, "game_id": last.game_id}
+        )
+
+    def load_move_result(self, key: str) -> dict | None:
+        with self._lock:
+            row = self._connection.execute("SELECT result FROM move_results WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_move_result(self, key: str, result: dict, expire_ts: float | None = None) -> None:
+        query = "INSERT OR REPLACE INTO move_results (key, result, updated_ts) VALUES (?, ?, ?)"
+        with self._lock:
+            self._connection.execute(query, (key, json.dumps(result), time.time()))
+
+    def add_model_usage(self, hour: int, requests: Dict[str, int], expire_ts: float | None = None) -> None:
+        query = (
+            "INSERT INTO model_usage (hour, model_key, requests) VALUES (?, ?, ?) "
+            "ON CONFLICT (hour, model_key) DO UPDATE SET requests = requests + excluded.requests"
+        )
+        rows = [(hour, model_key, count) for model_key, count in requests.items()]
+        with self._lock:
+            self._connection.executemany(query, rows)
+
+    def load_model_usage(self, hours: Sequence[int]) -> Dict[int, Dict[str, int]]:
+        usage: Dict[int, Dict[str, int]] = {}
+        for chunk in chunked(hours, size=_MAX_QUERY_PARAMETERS):
+            placeholders = ", ".join("?" * len(chunk))
+            query = f"SELECT hour, model_key, requests FROM model_usage WHERE hour IN ({placeholders})"
+            with self._lock:
+                rows = self._connection.execute(query, tuple(chunk)).fetchall()
+            for hour, model_key, count in rows:
+                usage.setdefault(hour, {})[model_key] = count
+        return usage
+
+    def load_model_preload(self) -> ModelPreload | None:
+        with self._lock:
+            row = self._connection.execute("SELECT model_keys, preloaded_ts FROM model_preloads").fetchone()
+        return ModelPreload(model_keys=json.loads(row[0]), preloaded_ts=row[1]) if row else None
+
+    def save_model_preload(self, preload: ModelPreload) -> None:
+        query = "INSERT OR REPLACE INTO model_preloads (preload_id, model_keys, preloaded_ts) VALUES (1, ?, ?)"
+        with self._lock:
+            self._connection.execute(query, (json.dumps(preload.model_keys), preload.preloaded_ts))
+
+    def _migrate(self) -> None:
+        # Files created before superseded moves expired.
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(game_moves)")}
+        if "expire_ts" not in columns:
+            self._connection.execute("ALTER TABLE game_moves ADD COLUMN expire_ts REAL")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS game_moves_expire_ts ON game_moves (expire_ts)")
+
+    def _encode(self, snapshot: GameSnapshot) -> tuple:
+        state_blob = self.codec.encode(snapshot.state_data)
+        return (
+            snapshot.version,
+            snapshot.storage_mode,
+            self.codec.name,
+            state_blob,
+            snapshot.expire_ts,
+            snapshot.owner,
+            snapshot.game_type,
+        )
+
+    def _fetch_one(self, game_id: str, query: str) -> tuple:
+        with self._lock:
+            row = self._connection.execute(query, (game_id,)).fetchone()
+        if row is None:
+            raise GameDoesNotExistError.create(game_id=game_id)
+        return row
+
+
+def _to_snapshot(row: tuple) -> GameSnapshot:
+    version, storage_mode, state_codec, state_blob, expire_ts, owner, game_type = row
+    state_data = get_state_codec(state_codec).decode(state_blob)
+    return GameSnapshot(
+        version=version,
+        storage_mode=storage_mode,
+        state_data=state_data,
+        expire_ts=expire_ts,
+        owner=owner,
+        game_type=game_type,
+    )
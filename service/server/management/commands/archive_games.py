@@ -0,0 +1,28 @@
+from django.core.management import BaseCommand
+
+from server.logic.db import archive_expiring_games
+from the_spymaster.config import get_config
+
+
+class Command(BaseCommand):
+    help = "Archive games that are about to expire, so they can be rehydrated after they are deleted."
+
+    def add_arguments(self, parser):
+        config = get_config()
+        parser.add_argument(
+            "--lead-days",
+            type=float,
+            default=config.game_archive_lead_days,
+            help="Archive games that expire within this many days.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=config.game_archive_batch_size,
+            help="Amount of games in each archive object.",
+        )
+
+    def handle(self, *args, **options):
+        lead_time = options["lead_days"] * 24 * 60 * 60
+        archived_count = archive_expiring_games(lead_time=lead_time, batch_size=options["batch_size"])
+        self.stdout.write(f"Archived {archived_count} games")
@@ -0,0 +1,78 @@
+import json
+import random
+import timeit
+from typing import Any, Callable, List
+
+from codenames.classic.state import ClassicGameState
+from codenames.duet.board import DuetBoard
+from codenames.duet.state import DuetGameState
+from codenames.generic.exceptions import GameRuleError
+from codenames.generic.move import PASS_GUESS, Clue, Guess
+from codenames.generic.player import PlayerRole
+from codenames.mini.state import MiniGameState
+from codenames.utils.vocabulary.languages import get_vocabulary
+from django.core.management import BaseCommand
+
+from server.logic.codecs import STATE_CODECS
+from server.logic.stores.dynamo import JSON_ATTRIBUTE_CODEC
+
+
+class Command(BaseCommand):
+    help = "Compare the stored size and encode/decode time of game state codecs on randomly played games."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--games", type=int, default=10, help="Amount of games to sample per game type.")
+        parser.add_argument("--moves", type=int, default=20, help="Maximal amount of moves played in each game.")
+        parser.add_argument("--iterations", type=int, default=100, help="Encode/decode iterations per state.")
+
+    def handle(self, *args, **options):
+        states = build_sample_states(games=options["games"], moves=options["moves"])
+        iterations = options["iterations"]
+        baseline_size = _average(states, lambda data: len(json.dumps(data).encode()))
+        self.stdout.write(f"{len(states)} sample states, {iterations} iterations each")
+        self.stdout.write(f"{'codec':<20}{'avg bytes':>12}{'ratio':>8}{'encode us':>12}{'decode us':>12}")
+        self.stdout.write(f"{JSON_ATTRIBUTE_CODEC:<20}{baseline_size:>12.0f}{1:>8.2f}{'-':>12}{'-':>12}")
+        for codec in STATE_CODECS.values():
+            blobs = [codec.encode(data) for data in states]
+            size = _average(blobs, len)
+            encode_us = _average(states, lambda data, c=codec: _time_us(lambda: c.encode(data), iterations))
+            decode_us = _average(blobs, lambda blob, c=codec: _time_us(lambda: c.decode(blob), iterations))
+            ratio = baseline_size / size
+            self.stdout.write(f"{codec.name:<20}{size:>12.0f}{ratio:>8.2f}{encode_us:>12.1f}{decode_us:>12.1f}")
+
+
+def build_sample_states(games: int, moves: int) -> List[dict]:
+    vocabulary = get_vocabulary(language="english")
+    states: List[dict] = []
+    for _ in range(games):
+        classic_state = ClassicGameState.from_language(language="english")
+        duet_state = DuetGameState.from_board(board=DuetBoard.from_vocabulary(vocabulary=vocabulary))
+        mini_state = MiniGameState.from_board(board=DuetBoard.from_vocabulary(vocabulary=vocabulary))
+        for state in (classic_state, duet_state, mini_state):
+            play_random_moves(state=state, moves=moves)
+            states.append(state.model_dump())
+    return states
+
+
+def play_random_moves(state: Any, moves: int) -> None:
+    for i in range(moves):
+        if state.is_game_over:
+            return
+        side_state = getattr(state, "current_side_state", state)
+        try:
+            if side_state.current_player_role == PlayerRole.SPYMASTER:
+                state.process_clue(Clue(word=f"clue{i}", card_amount=random.randint(1, 3)))
+                continue
+            hidden_cards = [i for i, card in enumerate(side_state.board.cards) if not card.revealed]
+            card_index = random.choice(hidden_cards) if hidden_cards and random.random() > 0.1 else PASS_GUESS
+            state.process_guess(Guess(card_index=card_index))
+        except GameRuleError:
+            return
+
+
+def _time_us(func: Callable[[], Any], iterations: int) -> float:
+    return timeit.timeit(func, number=iterations) / iterations * 1_000_000
+
+
+def _average[T](items: List[T], func: Callable[[T], float]) -> float:
+    return sum(func(item) for item in items) / len(items)
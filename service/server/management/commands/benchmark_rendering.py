@@ -0,0 +1,49 @@
+import timeit
+from typing import Any, Callable
+
+from codenames.classic.state import ClassicGameState
+from django.core.management import BaseCommand
+from django.http import HttpResponse, JsonResponse
+from the_spymaster_api.structs import Solver
+from the_spymaster_api.structs.classic.responses import ClassicNextMoveResponse
+from the_spymaster_solvers_api.structs import APIModelIdentifier
+
+from server.logic.serialization import dump_response_json
+from server.management.commands.benchmark_codecs import play_random_moves
+
+
+class Command(BaseCommand):
+    help = "Compare the dict + JsonResponse rendering of endpoint responses with the model_dump_json fast path."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--moves", type=int, default=20, help="Maximal amount of moves played in the game.")
+        parser.add_argument("--iterations", type=int, default=2000, help="Renders per path.")
+
+    def handle(self, *args, **options):
+        response = build_next_move_response(moves=options["moves"])
+        iterations = options["iterations"]
+        json_response_us = _time_us(lambda: JsonResponse(response.model_dump()).content, iterations)
+        fast_path_us = _time_us(
+            lambda: HttpResponse(dump_response_json(response), content_type="application/json").content, iterations
+        )
+        size = len(dump_response_json(response))
+        self.stdout.write(f"ClassicNextMoveResponse of {size} bytes, {iterations} iterations")
+        self.stdout.write(f"{'path':<28}{'render us':>12}")
+        self.stdout.write(f"{'model_dump + JsonResponse':<28}{json_response_us:>12.1f}")
+        self.stdout.write(f"{'model_dump_json':<28}{fast_path_us:>12.1f}")
+        self.stdout.write(f"Speedup: {json_response_us / fast_path_us:.2f}x")
+
+
+def build_next_move_response(moves: int) -> ClassicNextMoveResponse:
+    game_state = ClassicGameState.from_language(language="english")
+    play_random_moves(state=game_state, moves=moves)
+    return ClassicNextMoveResponse(
+        game_state=game_state,
+        used_solver=Solver.NAIVE,
+        given_clue=game_state.given_clues[-1] if game_state.given_clues else None,
+        used_model_identifier=APIModelIdentifier(language="english", model_name="wiki-50", is_stemmed=False),
+    )
+
+
+def _time_us(func: Callable[[], Any], iterations: int) -> float:
+    return timeit.timeit(func, number=iterations) / iterations * 1_000_000
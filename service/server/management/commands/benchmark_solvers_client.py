@@ -0,0 +1,66 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+from django.core.management import BaseCommand
+from the_spymaster_solvers_api import TheSpymasterSolversClient
+
+from server.logic.solvers import mount_connection_pool
+
+
+class _StubSolversHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive.
+    # Headers and body are written separately, which Nagle and delayed ACKs would stall on kept-alive connections.
+    disable_nagle_algorithm = True
+    connections = 0
+    connections_lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with self.connections_lock:
+            type(self).connections += 1
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class Command(BaseCommand):
+    help = "Compare solver calls through a new client per call with calls through the shared, pooled client."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--calls", type=int, default=500, help="Solver calls per path.")
+
+    def handle(self, *args, **options):
+        calls = options["calls"]
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _StubSolversHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            shared_client = TheSpymasterSolversClient(base_url=base_url)
+            mount_connection_pool(shared_client, pool_maxsize=4)
+            paths: dict[str, Callable[[], TheSpymasterSolversClient]] = {
+                "client per call": lambda: TheSpymasterSolversClient(base_url=base_url),
+                "shared client": lambda: shared_client,
+            }
+            self.stdout.write(f"{calls} calls per path, against a local stub (no TLS)")
+            self.stdout.write(f"{'path':<20}{'call us':>10}{'connections':>14}")
+            for name, get_client in paths.items():
+                _StubSolversHandler.connections = 0
+                start = time.perf_counter()
+                for _ in range(calls):
+                    get_client().post(endpoint="generate-clue", data={}, log_http_data=False)
+                call_us = (time.perf_counter() - start) / calls * 1_000_000
+                self.stdout.write(f"{name:<20}{call_us:>10.1f}{_StubSolversHandler.connections:>14}")
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,46 @@
+import functools
+import time
+import timeit
+from typing import Any, Callable
+
+from django.core.management import BaseCommand
+
+from server.logic.state_pool import (
+    ItemPool,
+    generate_classic_state,
+    generate_duet_state,
+    generate_mini_state,
+)
+
+
+class Command(BaseCommand):
+    help = "Compare the initial game state creation of start requests, with and without a pre-generated state pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--language", default="english")
+        parser.add_argument("--iterations", type=int, default=500, help="Started games per path.")
+
+    def handle(self, *args, **options):
+        language, iterations = options["language"], options["iterations"]
+        generators: dict[str, Callable[[], Any]] = {
+            "classic": functools.partial(generate_classic_state, language, None),
+            "duet": functools.partial(generate_duet_state, language),
+            "mini": functools.partial(generate_mini_state, language, 10),
+        }
+        self.stdout.write(f"{iterations} starts per path, warm-up of {iterations * 2 + 1} states, language: {language}")
+        self.stdout.write(f"{'game':<10}{'warm-up ms':>12}{'cold us':>10}{'warm us':>10}{'speedup':>10}")
+        for name, generate in generators.items():
+            # Twice the popped amount, so popping never drops the pool to its refill mark.
+            pool: ItemPool[str, Any] = ItemPool(size=iterations * 2 + 1)
+            start = time.perf_counter()
+            pool.fill(name, generate)
+            warm_up_ms = (time.perf_counter() - start) * 1000
+            cold_us = _time_us(generate, iterations)
+            warm_us = _time_us(lambda p=pool, n=name, g=generate: p.pop(n, generate=g), iterations)
+            self.stdout.write(
+                f"{name:<10}{warm_up_ms:>12.1f}{cold_us:>10.1f}{warm_us:>10.2f}{cold_us / warm_us:>9.0f}x"
+            )
+
+
+def _time_us(func: Callable[[], Any], iterations: int) -> float:
+    return timeit.timeit(func, number=iterations) / iterations * 1_000_000
@@ -4,7 +4,7 @@ import logging
 
 from django.core.management import BaseCommand
 
-from server.logic.db import GameItem
+from server.logic.stores.dynamo import GameItem
 
 log = logging.getLogger(__name__)
 
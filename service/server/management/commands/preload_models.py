@@ -0,0 +1,56 @@
+from django.core.management import BaseCommand
+
+from server.logic.model_usage import (
+    get_cold_model_stats,
+    get_current_hour,
+    get_hot_model_keys,
+    load_model_usage,
+    preload_models,
+)
+from server.logic.stores import get_model_usage_store
+from the_spymaster.config import get_config
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-load the most requested solver models, by recorded usage, before traffic arrives. "
+        "Run on a schedule, it also reports how many requests since the last run were for models it did not pre-load."
+    )
+
+    def add_arguments(self, parser):
+        config = get_config()
+        parser.add_argument(
+            "--lookback-hours",
+            type=int,
+            default=config.model_preload_lookback_hours,
+            help="Pick the models by the usage of this many latest hours.",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=config.model_preload_top,
+            help="Amount of most requested models to pre-load.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Report the hot models without loading them.")
+
+    def handle(self, *args, **options):
+        last_preload = get_model_usage_store().load_model_preload()
+        if last_preload is None:
+            self.stdout.write("Models were never pre-loaded")
+        else:
+            cold_stats = get_cold_model_stats(last_preload)
+            self.stdout.write(
+                f"Since the last preload: {cold_stats.cold_requests} of {cold_stats.requests} requests "
+                f"were for cold models ({cold_stats.cold_rate:.1%})"
+            )
+        usage = load_model_usage(since_hour=get_current_hour() - options["lookback_hours"] + 1)
+        hot_model_keys = get_hot_model_keys(usage, top=options["top"])
+        if not hot_model_keys:
+            self.stdout.write("No model usage was recorded, nothing to pre-load")
+            return
+        for model_key, requests in hot_model_keys:
+            self.stdout.write(f"{requests:>8} {model_key}")
+        if options["dry_run"]:
+            return
+        response = preload_models([model_key for model_key, _ in hot_model_keys])
+        self.stdout.write(f"Pre-loaded {response.success_count} models, {response.fail_count} failed")
@@ -1,4 +1,4 @@
-import json
+import logging
 import traceback
 from typing import Any, Mapping
 
@@ -10,7 +10,7 @@ from django.core.handlers.wsgi import WSGIRequest
 from django.http import JsonResponse
 from django.http.response import HttpResponseBase
 from django.utils.deprecation import MiddlewareMixin
-from the_spymaster_api.structs import APIGameRuleError
+from the_spymaster_api.structs import APIGameRuleError, SolverTimeoutError
 from the_spymaster_util.http.client import extract_context
 from the_spymaster_util.http.defs import CONTEXT_ID_HEADER_KEY
 from the_spymaster_util.http.errors import (
@@ -22,6 +22,8 @@ from the_spymaster_util.http.errors import (
 from the_spymaster_util.logger import get_logger, wrap
 from the_spymaster_util.measure_time import MeasureTime
 
+from server.views.json_body import load_json_body
+
 log = get_logger(__name__)
 
 
@@ -40,6 +42,10 @@ class SpymasterExceptionHandlerMiddleware(MiddlewareMixin):
         log.debug("Processing exception: %s", exception, exc_info=True)
         if isinstance(exception, BadRequestError):
             return response_from_api_error(e=exception)
+        if isinstance(exception, SolverTimeoutError):
+            # A server side error, but an expected one (the client may retry): not reported as uncaught.
+            log.warning(f"Responding with a solver timeout: {exception}")
+            return response_from_api_error(e=exception)
         if isinstance(exception, ValidationError):
             api_error = BadRequestError(message=str(exception))
             return response_from_api_error(e=api_error)
@@ -86,11 +92,11 @@ class ContextLoggingMiddleware(MiddlewareMixin):
 def _log_request(request: WSGIRequest):
     request_context = extract_context(request.headers)
     log.set_context(context=request_context)
-    try:
-        data = json.loads(request.body.decode())
-    except:  # noqa  # pylint: disable=invalid-name, bare-except
-        data = {}
-    data["request_meta"] = _get_string_values(request.META)  # Meta also contains headers
+    if not log.isEnabledFor(logging.DEBUG):
+        return request
+    # Decoded only for the log (the endpoint validates the raw bytes), and kept for requests that also have params.
+    body = load_json_body(request) or {}
+    data = {**body, "request_meta": _get_string_values(request.META)}  # Meta also contains headers
     log.debug(f"Handling: {wrap(request.method)} to {wrap(request.path)}", extra={"data": data})
     return request
 
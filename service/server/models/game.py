@@ -1,22 +1,87 @@
 import abc
+from typing import Any, Self
 
 from codenames.classic.state import ClassicGameState
 from codenames.duet.state import DuetGameState
 from codenames.mini.state import MiniGameState
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
+from the_spymaster_api.structs import GameType
+
+from server.logic.serialization import dump_model, forget_dump
 
 
 class Game[T: BaseModel](BaseModel, abc.ABC):
     id: str
     state_data: dict
+    owner: str | None = None
+    version: int | None = None
+    # Storage bookkeeping: the version of the stored snapshot, and the state data as it was loaded.
+    snapshot_version: int | None = None
+    loaded_state_data: dict | None = None
+    # The parsed state, whether it is newer than `state_data`, and whether the game changed since it was loaded.
+    _state: T | None = PrivateAttr(default=None)
+    _state_modified: bool = PrivateAttr(default=False)
+    _modified: bool = PrivateAttr(default=False)
+
+    @classmethod
+    def from_state(cls, id: str, state: T, **kwargs) -> Self:  # pylint: disable=redefined-builtin
+        """
+        Creates a game from a parsed state, which is dumped only when the game is saved.
+        """
+        game = cls(id=id, state_data={}, **kwargs)
+        game.set_state(state)
+        return game
 
     @classmethod
     @abc.abstractmethod
     def get_state_class(cls) -> type[T]: ...
 
+    @classmethod
+    @abc.abstractmethod
+    def get_game_type(cls) -> GameType: ...
+
     @property
     def state(self) -> T:
-        return self.get_state_class().model_validate(self.state_data)
+        """
+        Parsed once, and memoized. The state is mutable: after modifying it, call `set_state`,
+        otherwise the modification is not saved.
+        """
+        if self._state is None:
+            self._state = self.get_state_class().model_validate(self.state_data)
+        return self._state
+
+    def set_state(self, state: T) -> None:
+        # The state may have been modified since it was last dumped.
+        forget_dump(state)
+        self._state = state
+        self._state_modified = self._modified = True
+
+    @property
+    def is_modified(self) -> bool:
+        """
+        Whether the state was set (or `state_data` assigned) since the game was loaded or saved.
+        """
+        return self._modified
+
+    def dump_state(self) -> dict:
+        """
+        Brings `state_data` up to date with the parsed state, dumping it at most once per modification.
+        """
+        if self._state_modified:
+            state = self._state
+            self.state_data = dump_model(state)  # type: ignore[arg-type]
+            self._state = state
+        return self.state_data
+
+    def mark_saved(self) -> None:
+        self.loaded_state_data = self.state_data
+        self._modified = False
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "state_data":
+            # Assigned state data replaces the parsed state.
+            self._state, self._state_modified, self._modified = None, False, True
+        super().__setattr__(name, value)
 
 
 class ClassicGame(Game[ClassicGameState]):
@@ -24,14 +89,26 @@ class ClassicGame(Game[ClassicGameState]):
     def get_state_class(cls) -> type[ClassicGameState]:
         return ClassicGameState
 
+    @classmethod
+    def get_game_type(cls) -> GameType:
+        return GameType.CLASSIC
+
 
 class DuetGame(Game[DuetGameState]):
     @classmethod
     def get_state_class(cls) -> type[DuetGameState]:
         return DuetGameState
 
+    @classmethod
+    def get_game_type(cls) -> GameType:
+        return GameType.DUET
+
 
 class MiniGame(Game[MiniGameState]):
     @classmethod
     def get_state_class(cls) -> type[MiniGameState]:
         return MiniGameState
+
+    @classmethod
+    def get_game_type(cls) -> GameType:
+        return GameType.MINI
@@ -1,14 +1,45 @@
 import json
-from unittest.mock import ANY
+import os
+import threading
+from unittest.mock import ANY, patch
 
+import pytest
+from codenames.classic.color import ClassicColor
+from codenames.classic.state import ClassicGameState
+from codenames.generic.move import Clue, Guess
 from rest_framework.test import APIClient
-from the_spymaster_api.structs.classic.responses import ClassicStartGameResponse
+from the_spymaster_api import apply_state_response
+from the_spymaster_api.structs import (
+    ClueRequest,
+    Solver,
+    SolverTimeoutError,
+    parse_response,
+)
+from the_spymaster_api.structs.classic.responses import (
+    ClassicClueResponse,
+    ClassicGetGameStateResponse,
+    ClassicStartGameResponse,
+)
+from the_spymaster_solvers_api.structs.responses import (
+    GenerateClueResponse,
+    GenerateGuessResponse,
+)
 
+from server import middleware
+from server.logic.solver_calls import get_solver_caller
+from server.logic.solvers import get_solvers_client
 from server.tests.spymaster_test import SpymasterTest
 from server.tests.util.deep_diff import deep_diff
+from server.views import json_body
 
 START_GAME_PATH = "game/classic/start/"
 CLUE_PATH = "game/classic/clue/"
+GUESS_PATH = "game/classic/guess/"
+LIST_GAMES_PATH = "game/list/"
+GAME_STATE_PATH = "game/classic/state/"
+AUTO_PLAY_PATH = "game/classic/auto-play/"
+NEXT_MOVE_PATH = "game/classic/next-move/"
+NEXT_MOVE_BATCH_PATH = "game/next-move-batch/"
 
 
 class TestApi(SpymasterTest):
@@ -20,6 +51,7 @@ class TestApi(SpymasterTest):
     def test_start_game(self):
         response = self._post(START_GAME_PATH, data={})
         assert response.status_code == 200
+        assert response["Content-Type"] == "application/json"
         expected_data = {
             "game_id": ANY,
             "game_state": {
@@ -69,6 +101,223 @@ class TestApi(SpymasterTest):
         diff = deep_diff(expected_data, actual_data)
         assert diff is None
 
+    def test_clue_state_is_dumped_once_for_storage_and_response(self):
+        start_game_response = self._start_game()
+        data = {"game_id": start_game_response.game_id, "word": "test", "card_amount": 2}
+        model_dump = ClassicGameState.model_dump
+
+        with patch.object(ClassicGameState, "model_dump", autospec=True, side_effect=model_dump) as mock_dump:
+            response = self._post(path=CLUE_PATH, data=data)
+
+        assert response.status_code == 200
+        assert mock_dump.call_count == 1
+        assert response.json()["game_state"]["given_clues"] == [{"word": "test", "card_amount": 2, "team": "BLUE"}]
+
+    def test_clue_response_projection(self):
+        clue = {"game_id": self._start_game().game_id, "word": "test", "card_amount": 2}
+        other_clue = {"game_id": self._start_game().game_id, "word": "other", "card_amount": 1}
+
+        without_state = self._post(path=CLUE_PATH, data={**clue, "include_state": False})
+        only_clue = self._post(path=CLUE_PATH, data={**other_clue, "fields": ["given_clue"]})
+
+        assert without_state.json() == {"given_clue": {"word": "test", "card_amount": 2, "team": "BLUE"}}
+        assert only_clue.json() == {"given_clue": {"word": "other", "card_amount": 1, "team": "BLUE"}}
+        request = ClueRequest(**clue, include_state=False)
+        response = parse_response(ClassicClueResponse, data=without_state.json(), request=request)
+        assert response.given_clue.word == "test"
+        with pytest.raises(AttributeError):
+            _ = response.game_state
+        with patch("the_spymaster_api.structs.responses.TypeAdapter") as mock_adapter:
+            parse_response(ClassicClueResponse, data=without_state.json(), request=request)
+        mock_adapter.assert_not_called()  # The field adapters are cached.
+
+    def test_game_state_not_modified(self):
+        game_id = self._start_game().game_id
+        state_url = self._url(GAME_STATE_PATH)
+
+        response = self.api_client.get(state_url, data={"game_id": game_id})
+        etag = response["ETag"]
+        not_modified = self.api_client.get(state_url, data={"game_id": game_id}, HTTP_IF_NONE_MATCH=etag)
+        projected = self.api_client.get(
+            state_url, data={"game_id": game_id, "include_state": "false"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self._post(path=CLUE_PATH, data={"game_id": game_id, "word": "test", "card_amount": 2})
+        modified = self.api_client.get(state_url, data={"game_id": game_id}, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert projected.status_code == 200
+        assert modified.status_code == 200
+        assert modified["ETag"] != etag
+        assert modified.json()["game_state"]["given_clues"]
+
+    @patch.dict(os.environ, {"GAME_STORAGE_MODE": "move_log"})
+    def test_game_state_since_version(self):
+        game_id = self._start_game().game_id
+        state_url = self._url(GAME_STATE_PATH)
+        initial = ClassicGetGameStateResponse.model_validate(
+            self.api_client.get(state_url, {"game_id": game_id}).json()
+        )
+        # A guess that ends the game would compact it, and deltas are not replayed across a snapshot.
+        card_index = next(i for i, card in enumerate(initial.game_state.board) if card.color == ClassicColor.BLUE)
+        self._post(path=CLUE_PATH, data={"game_id": game_id, "word": "test", "card_amount": 2})
+        self._post(path=GUESS_PATH, data={"game_id": game_id, "card_index": card_index})
+
+        data = {"game_id": game_id, "since_version": initial.version}
+        delta = ClassicGetGameStateResponse.model_validate(self.api_client.get(state_url, data).json())
+        full = ClassicGetGameStateResponse.model_validate(self.api_client.get(state_url, {"game_id": game_id}).json())
+
+        assert initial.version == 1
+        assert delta.game_state is None
+        assert delta.version == full.version == 3
+        assert apply_state_response(initial.game_state, delta) == full.game_state
+
+    @patch.dict(os.environ, {"GAME_STORAGE_MODE": "full"})
+    def test_game_state_since_version_falls_back_to_full_state_in_full_mode(self):
+        game_id = self._start_game().game_id
+        state_url = self._url(GAME_STATE_PATH)
+        self._post(path=CLUE_PATH, data={"game_id": game_id, "word": "test", "card_amount": 2})
+
+        response = self.api_client.get(state_url, {"game_id": game_id, "since_version": 1})
+        parsed = ClassicGetGameStateResponse.model_validate(response.json())
+
+        assert response.status_code == 200
+        assert parsed.state_delta is None
+        assert parsed.version == 2
+        assert apply_state_response(None, parsed).given_clues
+
+    def test_auto_play_saves_once_per_batch_of_moves(self):
+        start = self._start_game()
+        game_id = start.game_id
+        # Guessing the assassin would end the game before the last move.
+        assassin_index = next(i for i, card in enumerate(start.game_state.board) if card.color == ClassicColor.ASSASSIN)
+        clue_words = (f"clue{i}" for i in range(100))
+
+        def generate_clue(request):
+            clue = Clue(word=next(clue_words), card_amount=1)
+            return GenerateClueResponse(suggested_clue=clue, used_solver=request.solver, used_model_identifier=None)
+
+        def generate_guess(request):
+            cards = request.operative_state.board.cards
+            card_index = next(i for i, card in enumerate(cards) if not card.revealed and i != assassin_index)
+            guess = Guess(card_index=card_index)
+            return GenerateGuessResponse(suggested_guess=guess, used_solver=request.solver, used_model_identifier=None)
+
+        with (
+            patch.object(get_solvers_client(), "generate_clue", side_effect=generate_clue),
+            patch.object(get_solvers_client(), "generate_guess", side_effect=generate_guess),
+        ):
+            once = self._post(path=AUTO_PLAY_PATH, data={"game_id": game_id, "max_moves": 4})
+            version_after_once = self._get_state_version(game_id)
+            batched = self._post(path=AUTO_PLAY_PATH, data={"game_id": game_id, "max_moves": 4, "save_every": 2})
+
+        played = once.json()["moves"]
+        assert once.status_code == 200
+        assert len(played) == 4
+        assert played[0]["given_clue"]["word"] == "clue0"
+        assert played[0]["used_solver"] == Solver.NAIVE
+        assert played[1]["given_guess"] is not None
+        assert version_after_once == 2
+        assert len(batched.json()["moves"]) == 4
+        assert self._get_state_version(game_id) == 4
+        assert batched.json()["game_state"]["given_clues"]
+
+    def test_next_move_batch_plays_games_concurrently(self):
+        game_ids = [self._start_game().game_id for _ in range(2)]
+        # Blocks until both games' solver calls are in flight.
+        barrier = threading.Barrier(len(game_ids), timeout=5)
+
+        def generate_clue(request):
+            barrier.wait()
+            clue = Clue(word="clue", card_amount=1)
+            return GenerateClueResponse(suggested_clue=clue, used_solver=request.solver, used_model_identifier=None)
+
+        data = {"game_type": "classic", "game_ids": [*game_ids, "missing"]}
+        # A hedged call would wait on the barrier too.
+        with (
+            patch.object(get_solver_caller(), "hedging", False),
+            patch.object(get_solvers_client(), "generate_clue", side_effect=generate_clue),
+        ):
+            response = self._post(path=NEXT_MOVE_BATCH_PATH, data=data)
+
+        results = response.json()["results"]
+        assert response.status_code == 200
+        assert [result["game_id"] for result in results] == [*game_ids, "missing"]
+        assert all(result["move"]["given_clue"] and result["version"] == 2 for result in results[:2])
+        assert results[2]["error"]["error_code"] == "GAME_DOES_NOT_EXIST_ERROR"
+        assert all(self._get_state_version(game_id) == 2 for game_id in game_ids)
+
+    def test_solver_timeout_is_a_gateway_timeout(self):
+        game_id = self._start_game().game_id
+
+        with (
+            patch.object(get_solver_caller(), "hedging", False),
+            patch.object(get_solvers_client(), "generate_clue", side_effect=SolverTimeoutError.create(solver="naive")),
+        ):
+            response = self._post(path=NEXT_MOVE_PATH, data={"game_id": game_id, "solver": "naive"})
+
+        assert response.status_code == 504
+        assert response.json()["error_code"] == "SOLVER_TIMEOUT_ERROR"
+
+    def test_json_body_is_decoded_once(self):
+        start_game_response = self._start_game()
+        data = {"game_id": start_game_response.game_id, "word": "test", "card_amount": 2}
+
+        decode = json_body._decode  # pylint: disable=protected-access
+        with patch("server.views.json_body._decode", wraps=decode) as mock_decode:
+            response = self._post(path=CLUE_PATH, data=data)
+
+        assert response.status_code == 200
+        assert mock_decode.call_count == 1
+
+    def test_json_body_is_validated_from_bytes_at_any_log_level(self):
+        decode = json_body._decode  # pylint: disable=protected-access
+        for debug in (True, False):
+            start_game_response = self._start_game()
+            data = {"game_id": start_game_response.game_id, "word": "test", "card_amount": 2}
+
+            with (
+                patch.object(middleware.log, "isEnabledFor", return_value=debug),
+                patch("server.views.json_body._decode", wraps=decode) as mock_decode,
+                patch.object(
+                    ClueRequest, "model_validate_json", wraps=ClueRequest.model_validate_json
+                ) as mock_validate,
+            ):
+                response = self._post(path=CLUE_PATH, data=data)
+
+            assert response.status_code == 200
+            assert mock_decode.call_count == int(debug)  # Only for the debug log.
+            mock_validate.assert_called_once()
+
+    def test_query_params_and_body_cannot_share_keys(self):
+        url = self._url(CLUE_PATH) + "?word=query"
+        data = json.dumps({"game_id": "some-game", "word": "body", "card_amount": 1})
+        response = self.api_client.post(path=url, data=data, content_type="application/json")
+        assert response.status_code == 400
+
+    @patch.dict(os.environ, {"GAME_STORE": "memory"})  # moto 4 does not sort GSI query pages
+    def test_list_games(self):
+        self.api_client.force_authenticate(user=self.admin)
+        game_ids = [self._start_game().game_id for _ in range(3)]
+        self.api_client.force_authenticate(user=None)
+        self._start_game()  # Anonymous games are not owned
+
+        self.api_client.force_authenticate(user=self.admin)
+        first_page = self.api_client.get(self._url(LIST_GAMES_PATH), data={"limit": 2}).json()
+        cursor = first_page["next_cursor"]
+        second_page = self.api_client.get(self._url(LIST_GAMES_PATH), data={"limit": 2, "cursor": cursor}).json()
+        self.api_client.force_authenticate(user=None)
+
+        listed_games = first_page["games"] + second_page["games"]
+        assert [game["game_id"] for game in listed_games] == game_ids[::-1]
+        assert {game["game_type"] for game in listed_games} == {"classic"}
+        assert second_page["next_cursor"] is None
+
+    def test_list_games_requires_authentication(self):
+        response = self.api_client.get(self._url(LIST_GAMES_PATH))
+        assert response.status_code == 401
+
     def _url(self, path):
         return f"/api/v1/{path}"
 
@@ -77,6 +326,9 @@ class TestApi(SpymasterTest):
         _data = json.dumps(data)
         return self.api_client.post(path=url, data=_data, content_type="application/json")
 
+    def _get_state_version(self, game_id: str) -> int:
+        return self.api_client.get(self._url(GAME_STATE_PATH), {"game_id": game_id}).json()["version"]
+
     def _start_game(self) -> ClassicStartGameResponse:
         response = self._post(path=START_GAME_PATH, data={"first_team": "BLUE"})
         return ClassicStartGameResponse.model_validate(response.json())
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+import pytest
+from codenames.classic.color import ClassicColor
+from codenames.classic.state import ClassicGameState
+from codenames.generic.move import Clue, Guess
+from the_spymaster_api.structs import GameDoesNotExistError
+
+from server.logic.archive import get_game_archive
+from server.logic.db import archive_expiring_games, get_game_cache, load_game, save_game
+from server.logic.stores.dynamo import GameItem
+from server.models.game import ClassicGame
+from server.tests.spymaster_test import SpymasterTest
+from server.tests.util.games import give_clue
+
+DAY = 24 * 60 * 60
+
+
+class TestArchive(SpymasterTest):
+    def setUp(self) -> None:
+        super().setUp()
+        get_game_cache().clear()
+        self.archive_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        archive_env = {"GAME_ARCHIVE_URL": f"file://{self.archive_dir.name}"}
+        self.env_patch = patch.dict(os.environ, archive_env)
+        self.env_patch.start()
+        get_game_archive.cache_clear()
+
+    def tearDown(self) -> None:
+        self.env_patch.stop()
+        get_game_archive.cache_clear()
+        self.archive_dir.cleanup()
+        super().tearDown()
+
+    def _save_new_game(self, game_id: str) -> ClassicGame:
+        game_state = ClassicGameState.from_language(language="english")
+        game = ClassicGame(id=game_id, state_data=game_state.model_dump())
+        save_game(game)
+        return game
+
+    def test_saved_game_expires_after_abandoned_ttl(self):
+        game = self._save_new_game(game_id="abandoned")
+
+        expire_ts = GameItem.load(game_id=game.id).expire_ts.timestamp()
+
+        assert expire_ts == pytest.approx(time.time() + self.config.game_abandoned_ttl_days * DAY, abs=60)
+
+    def test_finished_game_expires_after_finished_ttl(self):
+        game = self._save_new_game(game_id="finished")
+        game_state = game.state
+        assassin_index = next(i for i, card in enumerate(game_state.board.cards) if card.color == ClassicColor.ASSASSIN)
+        game_state.process_clue(Clue(word="something", card_amount=1))
+        game_state.process_guess(Guess(card_index=assassin_index))
+        game.state_data = game_state.model_dump()
+        save_game(game)
+
+        expire_ts = GameItem.load(game_id=game.id).expire_ts.timestamp()
+
+        assert game_state.is_game_over
+        assert expire_ts == pytest.approx(time.time() + self.config.game_finished_ttl_days * DAY, abs=60)
+
+    def test_expired_game_is_rehydrated_from_archive(self):
+        game = self._save_new_game(game_id="archived")
+        give_clue(game)
+        save_game(game)
+
+        archived_count = archive_expiring_games(lead_time=365 * DAY, batch_size=10)
+        GameItem.load(game_id=game.id).delete(add_version_condition=False)  # Expired by DynamoDB
+        get_game_cache().clear()
+        loaded_game = load_game(game.id, game_type=ClassicGame)
+
+        assert archived_count == 1
+        assert loaded_game.version == 2
+        assert loaded_game.state_data == game.state_data
+        assert GameItem.load(game_id=game.id).version == 2
+        save_game(loaded_game)  # Playable again
+
+    def test_archived_game_is_not_archived_again_until_saved(self):
+        game = self._save_new_game(game_id="archived-once")
+
+        assert archive_expiring_games(lead_time=365 * DAY, batch_size=10) == 1
+        assert archive_expiring_games(lead_time=365 * DAY, batch_size=10) == 0
+        loaded_game = load_game(game.id, game_type=ClassicGame)
+        give_clue(loaded_game)
+        save_game(loaded_game)
+        assert archive_expiring_games(lead_time=365 * DAY, batch_size=10) == 1
+
+    @patch.dict(os.environ, {"GAME_STORAGE_MODE": "move_log"})
+    def test_appended_move_refreshes_the_expiry_of_an_archived_game(self):
+        game = self._save_new_game(game_id="archived-move-log")
+        assert archive_expiring_games(lead_time=365 * DAY, batch_size=10) == 1
+
+        with patch.dict(os.environ, {"GAME_ABANDONED_TTL_DAYS": "100"}):
+            give_clue(game)
+            save_game(game)  # Appended, the snapshot is not re-written
+
+        game_item = GameItem.load(game_id=game.id)
+        assert game_item.version == 1
+        assert game_item.expire_ts.timestamp() == pytest.approx(time.time() + 100 * DAY, abs=60)
+        assert archive_expiring_games(lead_time=99 * DAY, batch_size=10) == 0
+        assert archive_expiring_games(lead_time=101 * DAY, batch_size=10) == 1
+
+    def test_missing_game_without_archive_does_not_exist(self):
+        with pytest.raises(GameDoesNotExistError):
+            load_game("never-saved", game_type=ClassicGame)
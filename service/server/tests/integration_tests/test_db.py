@@ -0,0 +1,328 @@
+import json
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from codenames.classic.color import ClassicColor
+from codenames.classic.state import ClassicGameState
+from codenames.generic.move import Clue, Guess
+from codenames.generic.player import PlayerRole
+from the_spymaster_api.structs import GameVersionConflictError, GetGameStateRequest
+
+from server.logic.batching import map_concurrently
+from server.logic.db import (
+    get_game_cache,
+    get_game_cache_read_stats,
+    load_game,
+    load_games,
+    load_state_delta,
+    save_game,
+    save_games,
+)
+from server.logic.serialization import dump_model, dump_scope
+from server.logic.stores import get_game_store
+from server.logic.stores.dynamo import (
+    DynamoGameStore,
+    GameItem,
+    GameMoveItem,
+    get_game_move_item_id,
+)
+from server.models.game import ClassicGame
+from server.tests.spymaster_test import SpymasterTest
+from server.tests.util.games import give_clue
+
+
+class TestDb(SpymasterTest):
+    def setUp(self) -> None:
+        super().setUp()
+        get_game_cache().clear()
+
+    def _save_new_game(self, game_id: str) -> ClassicGame:
+        game_state = ClassicGameState.from_language(language="english")
+        game = ClassicGame(id=game_id, state_data=game_state.model_dump())
+        save_game(game)
+        return game
+
+    def test_load_game_is_served_from_cache_after_save(self):
+        game = self._save_new_game(game_id="cached")
+        hits_before = get_game_cache().stats.hits
+
+        loaded_game = load_game(game.id, game_type=ClassicGame)
+
+        assert loaded_game.state_data == game.state_data
+        assert get_game_cache().stats.hits == hits_before + 1
+
+    def test_cache_hit_reads_the_store_unless_the_validation_window_is_set(self):
+        game = self._save_new_game(game_id="window")
+        read_stats = get_game_cache_read_stats()
+        reads_saved_before, validated_before = read_stats.reads_saved, read_stats.validated_hits
+
+        load_game(game.id, game_type=ClassicGame)
+        with (
+            patch.dict(os.environ, {"GAME_CACHE_VALIDATE_AFTER": "60"}),
+            patch.object(DynamoGameStore, "load_head", side_effect=AssertionError("Read the store")),
+        ):
+            load_game(game.id, game_type=ClassicGame)
+
+        assert read_stats.reads_saved == reads_saved_before + 1
+        assert read_stats.validated_hits == validated_before + 1
+
+    def test_stale_cache_entry_is_not_served(self):
+        game = self._save_new_game(game_id="stale")
+        game_state = game.state
+        game_state.left_guesses = 7
+        other_item = GameItem(item_id="game::stale", state_data=game_state.model_dump(), version=game.version)
+        other_item.save()  # Written by another process
+        stale_before = get_game_cache().stats.stale
+
+        loaded_game = load_game(game.id, game_type=ClassicGame)
+
+        assert loaded_game.state.left_guesses == 7
+        assert get_game_cache().stats.stale == stale_before + 1
+
+    def test_least_recently_used_game_is_evicted(self):
+        cache = get_game_cache()
+        evictions_before = cache.stats.evictions
+        for i in range(cache.max_size + 1):
+            self._save_new_game(game_id=f"evict-{i}")
+
+        assert len(cache) == cache.max_size
+        assert "evict-0" not in cache
+        assert cache.stats.evictions == evictions_before + 1
+
+    def test_save_game_bumps_version(self):
+        game = self._save_new_game(game_id="version")
+        assert game.version == 1
+
+        loaded_game = load_game(game.id, game_type=ClassicGame)
+        give_clue(loaded_game)
+        save_game(loaded_game)
+
+        assert loaded_game.version == 2
+        assert GameItem.load(game_id=game.id).version == 2
+
+    def test_unmodified_game_is_not_saved(self):
+        game = self._save_new_game(game_id="no-op")
+        loaded_game = load_game(game.id, game_type=ClassicGame)
+
+        with patch("server.logic.stores.dynamo.GameItem.save") as mock_save:
+            save_game(loaded_game)
+
+        mock_save.assert_not_called()
+        assert loaded_game.version == 1
+
+    def test_game_state_is_parsed_and_dumped_once(self):
+        game = self._save_new_game(game_id="memoized")
+        loaded_game = load_game(game.id, game_type=ClassicGame)
+
+        with patch.object(ClassicGameState, "model_validate", wraps=ClassicGameState.model_validate) as mock_validate:
+            give_clue(loaded_game)
+            save_game(loaded_game)
+
+        assert mock_validate.call_count == 1
+        assert loaded_game.state_data["given_clues"][0]["word"] == "something"
+        assert load_game(game.id, game_type=ClassicGame).state.given_clues == loaded_game.state.given_clues
+
+    def test_concurrent_save_raises_conflict(self):
+        game = self._save_new_game(game_id="conflict")
+        first = load_game(game.id, game_type=ClassicGame)
+        second = load_game(game.id, game_type=ClassicGame)
+        give_clue(first)
+        save_game(first)
+
+        give_clue(second)
+        with pytest.raises(GameVersionConflictError) as e:
+            save_game(second)
+
+        assert e.value.status_code == 409
+        assert load_game(game.id, game_type=ClassicGame).version == 2
+
+    @patch.dict(os.environ, {"GAME_STORAGE_MODE": "move_log", "GAME_SNAPSHOT_INTERVAL": "3"})
+    def test_move_log_mode_appends_moves_and_compacts_snapshots(self):
+        game = self._save_new_game(game_id="move-log")
+        initial_state_data = game.state_data
+        game_state = game.state
+
+        game_state.process_clue(Clue(word="something", card_amount=2))
+        game.state_data = game_state.model_dump()
+        save_game(game)  # Version 2, appended
+
+        assert GameItem.load(game_id=game.id).state_data == initial_state_data
+        move_item = GameMoveItem.get(hash_key=get_game_move_item_id(game_id=game.id, version=2))
+        assert len(move_item.delta) < len(game.state_data["board"]["cards"])
+
+        game_state.process_guess(Guess(card_index=-1))
+        game.state_data = game_state.model_dump()
+        save_game(game)  # Version 3, compacted
+
+        snapshot_item = GameItem.load(game_id=game.id)
+        assert snapshot_item.version == 3
+        assert snapshot_item.state_data == game_state.model_dump()
+
+        game_state.process_clue(Clue(word="another", card_amount=1))
+        game.state_data = game_state.model_dump()
+        save_game(game)  # Version 4, appended
+
+        get_game_cache().clear()
+        loaded_game = load_game(game.id, game_type=ClassicGame)
+        assert loaded_game.version == 4
+        assert loaded_game.state_data == game_state.model_dump()
+
+    @patch.dict(os.environ, {"GAME_STORAGE_MODE": "move_log", "GAME_SNAPSHOT_INTERVAL": "3"})
+    def test_compaction_expires_the_superseded_moves(self):
+        game = self._save_new_game(game_id="move-log-compaction")
+        _play_move(game)
+        save_game(game)  # Version 2, appended
+        _play_move(game)
+        save_game(game)  # Version 3, compacted
+
+        move_item = GameMoveItem.get(hash_key=get_game_move_item_id(game_id=game.id, version=2))
+        assert move_item.expire_ts.timestamp() == pytest.approx(time.time() + 600, abs=5)
+
+        with patch.dict(os.environ, {"GAME_SUPERSEDED_MOVES_TTL": "-1"}):
+            for _ in range(4):
+                _play_move(game)
+                save_game(game)  # Versions 4 and 5 appended, 6 compacted, 7 appended
+
+        store = get_game_store()
+        assert list(store.load_moves(game_id=game.id, versions=range(4, 8))) == [7]
+        assert not store.has_move(game_id=game.id, version=5)
+        get_game_cache().clear()
+        assert load_game(game.id, game_type=ClassicGame).state_data == game.state_data
+
+    @patch.dict(os.environ, {"GAME_STORAGE_MODE": "move_log"})
+    def test_move_log_mode_concurrent_save_raises_conflict(self):
+        game = self._save_new_game(game_id="move-log-conflict")
+        first = load_game(game.id, game_type=ClassicGame)
+        second = load_game(game.id, game_type=ClassicGame)
+        give_clue(first)
+        save_game(first)
+
+        give_clue(second)
+        with pytest.raises(GameVersionConflictError):
+            save_game(second)
+
+    @patch.dict(os.environ, {"GAME_STORAGE_MODE": "move_log"})
+    def test_move_log_mode_compaction_conflicts_with_a_concurrent_move(self):
+        for game_ending_first in (True, False):
+            game = self._save_new_game(game_id=f"move-log-compaction-race-{game_ending_first}")
+            give_clue(game)
+            save_game(game)  # Version 2, appended
+            game_ending = load_game(game.id, game_type=ClassicGame)
+            passing = load_game(game.id, game_type=ClassicGame)
+            _guess(game_ending, card_index=_assassin_index(game_ending))  # Compacted, as the game is over
+            _guess(passing, card_index=-1)  # Appended
+            first, second = (game_ending, passing) if game_ending_first else (passing, game_ending)
+
+            save_game(first)
+            with pytest.raises(GameVersionConflictError):
+                save_game(second)
+
+            get_game_cache().clear()
+            loaded_game = load_game(game.id, game_type=ClassicGame)
+            assert loaded_game.version == 3
+            assert loaded_game.state_data == first.state_data
+            if game_ending_first:
+                assert load_state_delta(loaded_game, since_version=2) is None
+
+    @patch.dict(os.environ, {"GAME_STATE_CODEC": "json+zlib-dict-v1"})
+    def test_game_state_is_stored_encoded(self):
+        game = self._save_new_game(game_id="encoded")
+        get_game_cache().clear()
+
+        game_item = GameItem.load(game_id=game.id)
+        loaded_game = load_game(game.id, game_type=ClassicGame)
+
+        assert game_item.state_data is None
+        assert game_item.state_codec == "json+zlib-dict-v1"
+        assert len(game_item.state_blob) < len(json.dumps(game.state_data)) / 4
+        assert loaded_game.state_data == game.state_data
+
+    def test_legacy_json_item_is_loaded_after_codec_change(self):
+        game = self._save_new_game(game_id="legacy")
+        get_game_cache().clear()
+
+        with patch.dict(os.environ, {"GAME_STATE_CODEC": "json+zlib"}):
+            loaded_game = load_game(game.id, game_type=ClassicGame)
+            give_clue(loaded_game)
+            save_game(loaded_game)
+        get_game_cache().clear()
+
+        assert GameItem.load(game_id=game.id).state_codec == "json+zlib"
+        assert load_game(game.id, game_type=ClassicGame).state_data == loaded_game.state_data
+
+    def test_load_and_save_games_in_batches(self):
+        games = [self._save_new_game(game_id=f"batch-{i}") for i in range(30)]  # More than a write batch
+        for game in games:
+            game_state = game.state
+            game_state.left_guesses = 5
+            game.state_data = game_state.model_dump()
+
+        save_games(games)
+        loaded_games = load_games([game.id for game in games] + ["missing"], game_type=ClassicGame)
+
+        assert len(loaded_games) == len(games)
+        assert all(game.version == 2 for game in loaded_games.values())
+        assert all(game.state.left_guesses == 5 for game in loaded_games.values())
+        assert load_game(games[0].id, game_type=ClassicGame).state.left_guesses == 5
+
+    @patch.dict(os.environ, {"GAME_STORAGE_MODE": "move_log"})
+    def test_load_games_replays_move_logs(self):
+        game = self._save_new_game(game_id="batch-move-log")
+        game_state = game.state
+        game_state.process_clue(Clue(word="something", card_amount=2))
+        game.state_data = game_state.model_dump()
+        save_game(game)
+
+        loaded_game = load_games([game.id], game_type=ClassicGame)[game.id]
+
+        assert loaded_game.version == 2
+        assert loaded_game.state_data == game.state_data
+
+    def test_load_games_retries_unprocessed_keys(self):
+        game = self._save_new_game(game_id="unprocessed")
+        connection = GameItem._get_connection()  # pylint: disable=protected-access
+        original_batch_get_item = connection.batch_get_item
+        table_name = GameItem.Meta.table_name
+        throttled_response = {
+            "Responses": {table_name: []},
+            "UnprocessedKeys": {table_name: {"Keys": [{"item_id": {"S": "game::unprocessed"}}]}},
+        }
+
+        responses = iter([throttled_response])
+
+        def batch_get_item(*args, **kwargs):
+            return next(responses, None) or original_batch_get_item(*args, **kwargs)
+
+        with patch.object(connection, "batch_get_item", side_effect=batch_get_item) as batch_get_mock:
+            with patch("server.logic.batching.time.sleep"):
+                loaded_games = load_games([game.id], game_type=ClassicGame)
+
+        assert batch_get_mock.call_count == 2
+        assert loaded_games[game.id].state_data == game.state_data
+
+    def test_concurrent_map_runs_in_the_callers_context(self):
+        models = [GetGameStateRequest(game_id=f"game-{i}") for i in range(4)]
+
+        with dump_scope():
+            dumps = map_concurrently(dump_model, models, max_workers=4)
+
+            assert all(dump_model(model) is dump for model, dump in zip(models, dumps, strict=True))
+
+
+def _play_move(game: ClassicGame) -> None:
+    if game.state.current_player_role == PlayerRole.SPYMASTER:
+        give_clue(game, word=f"clue{len(game.state.clues)}")
+        return
+    _guess(game, card_index=-1)
+
+
+def _guess(game: ClassicGame, card_index: int) -> None:
+    game_state = game.state
+    game_state.process_guess(Guess(card_index=card_index))
+    game.set_state(game_state)
+
+
+def _assassin_index(game: ClassicGame) -> int:
+    return next(i for i, card in enumerate(game.state.board.cards) if card.color == ClassicColor.ASSASSIN)
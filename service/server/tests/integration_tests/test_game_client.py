@@ -0,0 +1,65 @@
+from typing import List
+
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from rest_framework.test import APIClient
+from the_spymaster_api import TheSpymasterClient
+from the_spymaster_api.structs import GetGameStateRequest
+from the_spymaster_api.structs.classic.requests import ClassicStartGameRequest
+from the_spymaster_util.http.defs import CONTEXT_HEADER_KEY, CONTEXT_ID_HEADER_KEY
+
+from server.tests.spymaster_test import SpymasterTest
+
+SERVER_HOST = "http://testserver"
+
+
+class _TestClientAdapter(BaseAdapter):
+    """
+    Sends the client's requests to the Django test client, and keeps them for assertions.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.api_client = APIClient()
+        self.requests: List[PreparedRequest] = []
+
+    def send(self, request: PreparedRequest, *args, **kwargs) -> Response:  # pylint: disable=unused-argument
+        self.requests.append(request)
+        meta = {f"HTTP_{key.upper().replace('-', '_')}": value for key, value in request.headers.items()}
+        content_type = request.headers.get("Content-Type", "application/json")
+        django_response = self.api_client.generic(
+            request.method, request.url, data=request.body or "", content_type=content_type, **meta
+        )
+        response = Response()
+        response.status_code = django_response.status_code
+        response._content = django_response.content  # pylint: disable=protected-access
+        response.headers = CaseInsensitiveDict(django_response.items())
+        response.url = request.url or ""
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+class TestGameClient(SpymasterTest):
+    def test_conditional_get_sends_context_headers(self):
+        client = TheSpymasterClient(server_host=SERVER_HOST).classic
+        adapter = _TestClientAdapter()
+        client.session.mount(SERVER_HOST, adapter)
+        game_id = client.start_game(ClassicStartGameRequest()).game_id
+
+        request = GetGameStateRequest(game_id=game_id)
+        response = client.get_game_state(request)
+        not_modified = client.get_game_state(request)
+
+        assert len(adapter.requests) == 3
+        first_get, second_get = adapter.requests[1], adapter.requests[2]
+        assert not_modified is response
+        assert "If-None-Match" not in first_get.headers
+        assert second_get.headers["If-None-Match"]
+        for sent in (first_get, second_get):
+            assert sent.headers[CONTEXT_ID_HEADER_KEY]
+            assert sent.headers[CONTEXT_HEADER_KEY]
+            assert sent.path_url.startswith("/api/v1/game/classic/state/?")
@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+from io import StringIO
+from unittest.mock import patch
+
+from codenames.generic.move import Clue
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from the_spymaster_solvers_api.structs.base import APIModelIdentifier
+from the_spymaster_solvers_api.structs.requests import LoadModelsRequest
+from the_spymaster_solvers_api.structs.responses import (
+    GenerateClueResponse,
+    LoadModelsResponse,
+)
+
+from server.logic.model_usage import (
+    HOUR,
+    ModelUsageRecorder,
+    get_model_usage_key,
+    get_model_usage_recorder,
+)
+from server.logic.solvers import get_solvers_client
+from server.logic.stores import ModelPreload, get_game_store, get_model_usage_store
+from server.tests.spymaster_test import SpymasterTest
+
+SNA_HEBREW = APIModelIdentifier(language="hebrew", model_name="skv-ft-150")
+
+
+def _generate_clue(request):
+    clue = Clue(word="clue", card_amount=1)
+    return GenerateClueResponse(suggested_clue=clue, used_solver=request.solver, used_model_identifier=None)
+
+
+class TestModelUsage(SpymasterTest):
+    def setUp(self) -> None:
+        super().setUp()
+        self.env_patch = patch.dict(os.environ, {"GAME_STORE": "memory"})
+        self.env_patch.start()
+        # Usage recorded by other tests is dropped.
+        get_model_usage_recorder().join()
+        get_model_usage_recorder().flush()
+        get_game_store().clear()  # type: ignore[attr-defined]
+
+    def tearDown(self) -> None:
+        get_game_store().clear()  # type: ignore[attr-defined]
+        self.env_patch.stop()
+        super().tearDown()
+
+    def test_next_move_records_the_requested_model(self):
+        api_client = APIClient()
+        game_id = api_client.post("/api/v1/game/classic/start/", data={}, format="json").json()["game_id"]
+
+        with patch.object(get_solvers_client(), "generate_clue", side_effect=_generate_clue):
+            api_client.post("/api/v1/game/classic/next-move/", data={"game_id": game_id}, format="json")
+        get_model_usage_recorder().join()
+        get_model_usage_recorder().flush()
+
+        usage = get_model_usage_store().load_model_usage(hours=[int(time.time() // HOUR)])
+        assert list(usage.values()) == [{get_model_usage_key(language="english", model_identifier=None): 1}]
+
+    def test_preload_loads_the_hot_models_and_reports_cold_requests(self):
+        hour = int(time.time() // HOUR)
+        english_default = get_model_usage_key(language="english", model_identifier=None)
+        sna_hebrew = get_model_usage_key(language="hebrew", model_identifier=SNA_HEBREW)
+        store = get_model_usage_store()
+        store.add_model_usage(hour=hour, requests={english_default: 5, sna_hebrew: 3, '{"language":"spanish"}': 1})
+        store.save_model_preload(ModelPreload(model_keys=[english_default], preloaded_ts=time.time()))
+        load_models_response = LoadModelsResponse(success_count=2, fail_count=0)
+        stdout = StringIO()
+
+        with patch.object(get_solvers_client(), "load_models", return_value=load_models_response) as load_models:
+            call_command("preload_models", "--top", "2", stdout=stdout)
+
+        assert load_models.call_args.args[0] == LoadModelsRequest(
+            model_identifiers=[SNA_HEBREW], load_default_models=True
+        )
+        assert "4 of 9 requests were for cold models (44.4%)" in stdout.getvalue()
+        preload = store.load_model_preload()
+        assert preload and preload.model_keys == [english_default, sna_hebrew]
+
+    def test_recording_flushes_in_the_background(self):
+        recorder = ModelUsageRecorder(flush_interval=0)
+        flush_threads = []
+
+        def add_model_usage(**kwargs):  # pylint: disable=unused-argument
+            flush_threads.append(threading.current_thread())
+
+        with patch.object(get_model_usage_store(), "add_model_usage", side_effect=add_model_usage):
+            recorder.record(language="english", model_identifier=None)
+            recorder.join(timeout=5)
+
+        assert len(flush_threads) == 1
+        assert flush_threads[0] is not threading.current_thread()
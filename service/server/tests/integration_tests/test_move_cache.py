@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from codenames.classic.state import ClassicGameState
+from codenames.generic.move import Clue
+from the_spymaster_api.structs import Solver
+from the_spymaster_solvers_api.structs import APIModelIdentifier
+from the_spymaster_solvers_api.structs.requests import GenerateClueRequest
+from the_spymaster_solvers_api.structs.responses import GenerateClueResponse
+
+from server.logic.move_cache import (
+    generate_move_cached,
+    get_move_cache,
+    get_move_cache_key,
+    prefetch_move,
+    start_invocation,
+)
+from server.logic.next_move import get_ai_players
+from server.logic.next_move_classic import ClassicNextMoveHandler
+from server.logic.solvers import get_solvers_client
+from server.logic.state_pool import generate_classic_state
+from server.tests.spymaster_test import SpymasterTest
+
+MODEL = APIModelIdentifier(language="english", model_name="wiki-50", is_stemmed=False)
+
+
+class TestMoveCache(SpymasterTest):
+    def setUp(self) -> None:
+        super().setUp()
+        get_move_cache().clear()
+        self.game_state = ClassicGameState.from_language(language="english")
+        self.clue_response = GenerateClueResponse(
+            suggested_clue=Clue(word="cached", card_amount=1), used_solver=Solver.NAIVE, used_model_identifier=MODEL
+        )
+
+    def test_key_is_stable_and_covers_state_solver_and_model(self):
+        copied_state = ClassicGameState.model_validate(self.game_state.model_dump())
+
+        key = get_move_cache_key(self._clue_request(self.game_state))
+
+        assert get_move_cache_key(self._clue_request(copied_state)) == key
+        assert get_move_cache_key(self._clue_request(self.game_state, solver=Solver.GPT)) != key
+        assert get_move_cache_key(self._clue_request(self.game_state, model_identifier=None)) != key
+        self.game_state.process_clue(Clue(word="other", card_amount=1))
+        assert get_move_cache_key(self._clue_request(self.game_state)) != key
+
+    def test_repeated_position_is_answered_without_the_solver(self):
+        with patch.object(get_solvers_client(), "generate_clue", return_value=self.clue_response) as generate_clue:
+            given_clues = [self._next_move().given_clue for _ in range(2)]
+
+        assert generate_clue.call_count == 1
+        assert [clue.word for clue in given_clues] == ["cached", "cached"]
+
+    @patch.dict(os.environ, {"MOVE_CACHE_PERSIST": "true"})
+    def test_persisted_results_survive_the_memory_cache(self):
+        with patch.object(get_solvers_client(), "generate_clue", return_value=self.clue_response):
+            self._next_move()
+        get_move_cache().clear()
+
+        with patch.object(get_solvers_client(), "generate_clue", MagicMock()) as generate_clue:
+            given_clue = self._next_move().given_clue
+
+        generate_clue.assert_not_called()
+        assert given_clue.word == "cached"
+
+    @patch.dict(os.environ, {"NEXT_MOVE_SPECULATION": "true"})
+    def test_ai_move_is_speculated_after_a_human_move(self):
+        get_ai_players().clear()
+        # A later position of the same player: the first team's spymaster.
+        next_position = generate_classic_state(language="english", first_team=self.game_state.current_team)
+
+        with patch.object(get_solvers_client(), "generate_clue", return_value=self.clue_response) as generate_clue:
+            not_speculated = ClassicNextMoveHandler.speculate(game_id="other", game_state=next_position)
+            self._next_move()
+            speculated = ClassicNextMoveHandler.speculate(game_id="g", game_state=next_position)
+            given_clue = self._next_move(game_state=next_position).given_clue
+
+        assert not not_speculated
+        assert speculated
+        assert generate_clue.call_count == 2
+        assert given_clue.word == "cached"
+
+    @patch.dict(os.environ, {"MOVE_PREFETCH_CARRYOVER_WAIT": "0.05"})
+    def test_prefetch_of_an_earlier_invocation_is_waited_for_briefly(self):
+        release = threading.Event()
+        calls = iter(range(2))
+
+        def generate_clue(_):
+            if next(calls) == 0:  # The prefetch, frozen with the earlier invocation.
+                release.wait(timeout=5)
+            return self.clue_response
+
+        request = self._clue_request(self.game_state)
+        prefetch_move(request, response_type=GenerateClueResponse, generate=generate_clue)
+        start_invocation()
+
+        start = time.monotonic()
+        response = generate_move_cached(request, response_type=GenerateClueResponse, generate=generate_clue)
+        release.set()
+
+        assert response.suggested_clue.word == "cached"
+        assert time.monotonic() - start < 1
+
+    def _next_move(self, game_state: ClassicGameState | None = None):
+        game_state = ClassicGameState.model_validate((game_state or self.game_state).model_dump())
+        handler = ClassicNextMoveHandler(
+            game_id="g", game_state=game_state, solver=Solver.NAIVE, model_identifier=MODEL
+        )
+        return handler.handle()
+
+    def _clue_request(
+        self,
+        game_state: ClassicGameState,
+        solver: Solver = Solver.NAIVE,
+        model_identifier: APIModelIdentifier | None = MODEL,
+    ) -> GenerateClueRequest:
+        return GenerateClueRequest(spymaster_state=game_state, solver=solver, model_identifier=model_identifier)
@@ -0,0 +1,111 @@
+import threading
+from unittest.mock import patch
+
+from codenames.duet.card import DuetColor
+from codenames.duet.state import DuetGameState, DuetSide
+from codenames.generic.move import PASS_GUESS, Clue, Guess
+from codenames.generic.player import PlayerRole
+from rest_framework.test import APIClient
+from the_spymaster_api.structs import Solver
+from the_spymaster_api.structs.duet.responses import DuetNextMoveResponse
+from the_spymaster_solvers_api.structs.responses import (
+    GenerateClueResponse,
+    GenerateGuessResponse,
+)
+
+from server.logic.move_cache import get_move_cache
+from server.logic.next_move import get_ai_players
+from server.logic.next_move_duet import DuetNextMoveHandler
+from server.logic.next_move_mini import MiniNextMoveHandler
+from server.logic.solver_calls import get_solver_caller
+from server.logic.solvers import get_solvers_client
+from server.logic.state_pool import generate_duet_state
+from server.tests.spymaster_test import SpymasterTest
+
+
+def _generate_clue(request):
+    clue = Clue(word="clue", card_amount=1)
+    return GenerateClueResponse(suggested_clue=clue, used_solver=request.solver, used_model_identifier=None)
+
+
+class TestDuetNextMove(SpymasterTest):
+    def setUp(self) -> None:
+        super().setUp()
+        get_move_cache().clear()
+        get_ai_players().clear()
+        # Solver calls are counted, and a hedged call would wait on the barriers too.
+        hedging_patch = patch.object(get_solver_caller(), "hedging", False)
+        hedging_patch.start()
+        self.addCleanup(hedging_patch.stop)
+
+    def test_next_move_plays_the_current_side(self):
+        api_client = APIClient()
+        game_id = api_client.post("/api/v1/game/duet/start/", data={}, format="json").json()["game_id"]
+
+        with patch.object(get_solvers_client(), "generate_clue", side_effect=_generate_clue) as generate_clue:
+            response = api_client.post("/api/v1/game/duet/next-move/", data={"game_id": game_id}, format="json")
+
+        parsed = DuetNextMoveResponse.model_validate(response.json())
+        request = generate_clue.call_args.args[0]
+        assert response.status_code == 200
+        assert parsed.given_clue and parsed.given_clue.word == "clue"
+        assert parsed.game_state.side_a.current_player_role == PlayerRole.OPERATIVE
+        assert request.spymaster_state.board == parsed.game_state.side_a.board
+
+    def test_other_side_move_is_generated_concurrently(self):
+        game_state = generate_duet_state(language="english")
+        game_state.process_clue(Clue(word="something", card_amount=1))
+        # The other side's spymaster is played by the AI as well.
+        get_ai_players().set(("g", DuetSide.SIDE_B.value, PlayerRole.SPYMASTER), (Solver.NAIVE, None))
+        # Blocks until the guess of side A and the clue of side B are in flight together.
+        barrier = threading.Barrier(2, timeout=5)
+
+        def generate_clue(request):
+            barrier.wait()
+            return _generate_clue(request)
+
+        def generate_guess(request):
+            barrier.wait()
+            guess = Guess(card_index=PASS_GUESS)
+            return GenerateGuessResponse(suggested_guess=guess, used_solver=request.solver, used_model_identifier=None)
+
+        with (
+            patch.object(get_solvers_client(), "generate_clue", side_effect=generate_clue) as mock_clue,
+            patch.object(get_solvers_client(), "generate_guess", side_effect=generate_guess),
+        ):
+            self._next_move(game_state)
+            side_b_response = self._next_move(game_state)
+
+        assert game_state.current_playing_side == DuetSide.SIDE_B
+        assert side_b_response.given_clue and side_b_response.given_clue.word == "clue"
+        assert mock_clue.call_count == 1
+
+    def test_other_side_move_is_prefetched_from_its_board_after_a_correct_guess(self):
+        game_state = generate_duet_state(language="english")
+        game_state.process_clue(Clue(word="something", card_amount=1))
+        # In sudden death, every correct guess switches the turn, and both sides are guessing.
+        game_state.timer_tokens = 0
+        game_state.side_b.current_player_role = PlayerRole.OPERATIVE
+        get_ai_players().set(("g", DuetSide.SIDE_B.value, PlayerRole.OPERATIVE), (Solver.NAIVE, None))
+        green_index = next(i for i, card in enumerate(game_state.side_a.board) if card.color == DuetColor.GREEN)
+
+        def generate_guess(request):
+            card_index = PASS_GUESS if request.operative_state.board[green_index].revealed else green_index
+            guess = Guess(card_index=card_index)
+            return GenerateGuessResponse(suggested_guess=guess, used_solver=request.solver, used_model_identifier=None)
+
+        with patch.object(get_solvers_client(), "generate_guess", side_effect=generate_guess):
+            side_a_response = self._next_move(game_state)
+            side_b_handler = MiniNextMoveHandler(game_id="g", game_state=game_state.side_b, solver=Solver.NAIVE)
+            # False if side B's guess, from its board after the guess, is already cached or being generated.
+            is_prefetched = not side_b_handler.prefetch()
+            side_b_response = self._next_move(game_state)
+
+        assert side_a_response.given_guess and side_a_response.given_guess.correct
+        assert game_state.side_b.board[green_index].revealed
+        assert is_prefetched
+        assert side_b_response.given_guess is None
+
+    def _next_move(self, game_state: DuetGameState) -> DuetNextMoveResponse:
+        handler = DuetNextMoveHandler(game_id="g", game_state=game_state, solver=Solver.NAIVE)
+        return handler.handle()
@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from codenames.classic.state import ClassicGameState
+from codenames.generic.move import Clue
+from requests import ConnectionError as RequestsConnectionError
+from the_spymaster_api.structs import Solver, SolverTimeoutError
+from the_spymaster_solvers_api.structs.requests import GenerateClueRequest
+from the_spymaster_solvers_api.structs.responses import GenerateClueResponse
+
+from server.logic.metrics import emit_metrics
+from server.logic.move_cache import get_move_cache
+from server.logic.solver_calls import (
+    BreakerState,
+    CircuitBreaker,
+    LatencyTracker,
+    SolverCaller,
+)
+
+NO_MOVE_CACHE = {"MOVE_CACHE_MAX_SIZE": "0"}
+
+
+def _caller(failure_threshold: int = 5, hedge_after: float | None = None) -> SolverCaller:
+    latencies = LatencyTracker(window=10, min_samples=1)
+    if hedge_after is not None:
+        latencies.record(hedge_after)
+    breaker = CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=60)
+    return SolverCaller(breaker=breaker, latencies=latencies, max_workers=4, hedging=hedge_after is not None)
+
+
+def _clue_request(solver: Solver) -> GenerateClueRequest:
+    game_state = ClassicGameState.from_language(language="english")
+    return GenerateClueRequest(spymaster_state=game_state, solver=solver, model_identifier=None)
+
+
+def _clue_response(request: GenerateClueRequest) -> GenerateClueResponse:
+    clue = Clue(word="clue", card_amount=1)
+    return GenerateClueResponse(suggested_clue=clue, used_solver=request.solver, used_model_identifier=None)
+
+
+@patch.dict(os.environ, NO_MOVE_CACHE)
+def test_slow_call_is_hedged_and_the_first_answer_wins():
+    caller = _caller(hedge_after=0.01)
+    release = threading.Event()
+    calls = iter(range(2))
+
+    def generate(request):
+        if next(calls) == 0:  # The primary call hangs.
+            release.wait(timeout=5)
+        return _clue_response(request)
+
+    with patch("server.logic.solver_calls.emit_metrics") as mock_emit:
+        response = caller.generate(_clue_request(Solver.NAIVE), response_type=GenerateClueResponse, generate=generate)
+    release.set()
+
+    assert response.used_solver == Solver.NAIVE
+    assert caller.stats.hedged == caller.stats.hedge_wins == 1
+    metrics = mock_emit.call_args.args[0]
+    emitted_stats = mock_emit.call_args.kwargs["properties"]["solver_call_stats"]
+    assert metrics == {"solver_hedge_rate": 1.0, "solver_hedge_win_rate": 1.0, "solver_breaker_open": 0}
+    assert emitted_stats["hedged"] == emitted_stats["hedge_wins"] == 1
+    assert emitted_stats["breaker_state"] == BreakerState.CLOSED
+
+
+@patch.dict(os.environ, NO_MOVE_CACHE)
+def test_open_breaker_falls_back_to_the_naive_solver():
+    caller = _caller(failure_threshold=2)
+    solver_calls = []
+
+    def generate(request):
+        solver_calls.append(request.solver)
+        if request.solver != Solver.NAIVE:
+            raise RequestsConnectionError("Solvers backend is down")
+        return _clue_response(request)
+
+    responses = [
+        caller.generate(_clue_request(Solver.SNA), response_type=GenerateClueResponse, generate=generate)
+        for _ in range(3)
+    ]
+
+    assert all(response.used_solver == Solver.NAIVE for response in responses)
+    # The third call does not reach the failing solver.
+    assert solver_calls == [Solver.SNA, Solver.NAIVE, Solver.SNA, Solver.NAIVE, Solver.NAIVE]
+    assert caller.breaker.state == BreakerState.OPEN
+    assert caller.stats.breaker_trips == 1
+    assert caller.stats.fallbacks == 3
+
+
+@patch.dict(os.environ, NO_MOVE_CACHE)
+def test_call_gives_up_at_the_deadline():
+    caller = _caller()
+    release = threading.Event()
+
+    def generate(request):
+        release.wait(timeout=5)
+        return _clue_response(request)
+
+    start = time.monotonic()
+    with pytest.raises(SolverTimeoutError):
+        caller.generate(
+            _clue_request(Solver.NAIVE), response_type=GenerateClueResponse, generate=generate, deadline=start + 0.1
+        )
+    release.set()
+
+    assert time.monotonic() - start < 1
+    assert caller.stats.timeouts == 1
+
+
+def test_half_open_breaker_lets_one_trial_call_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.state == BreakerState.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    assert breaker.record_success()  # Closed it.
+    assert breaker.state == BreakerState.CLOSED
+
+
+def test_move_cache_hit_does_not_end_a_half_open_trial():
+    get_move_cache().clear()
+    caller = _caller(failure_threshold=1)
+    request = _clue_request(Solver.SNA)
+    caller.generate(request, response_type=GenerateClueResponse, generate=_clue_response)  # Cached
+    caller.breaker.reset_timeout = 0
+    caller.breaker.record_failure()
+
+    def generate(request):
+        raise AssertionError("Called the backend")
+
+    response = caller.generate(request, response_type=GenerateClueResponse, generate=generate)
+
+    assert response.used_solver == Solver.SNA
+    assert caller.breaker.state == BreakerState.HALF_OPEN
+    assert caller.breaker.allow_request()  # The trial was released.
+
+
+def test_prefetch_is_guarded_by_the_breaker():
+    caller = _caller(failure_threshold=1)
+
+    def generate(request):
+        raise RequestsConnectionError("Solvers backend is down")
+
+    assert caller.prefetch(_clue_request(Solver.SNA), response_type=GenerateClueResponse, generate=generate)
+    wait_until = time.monotonic() + 5
+    while caller.stats.failures == 0 and time.monotonic() < wait_until:
+        time.sleep(0.01)
+
+    assert caller.breaker.state == BreakerState.OPEN
+    assert caller.stats.breaker_trips == 1
+    assert not caller.prefetch(_clue_request(Solver.SNA), response_type=GenerateClueResponse, generate=generate)
+
+
+@patch.dict(os.environ, {"METRICS_EMF": "true"})
+def test_metrics_are_written_in_embedded_metric_format(capsys):
+    document = emit_metrics({"solver_hedge_rate": 0.5}, properties={"solver_call_stats": {"calls": 2}})
+
+    written = json.loads(capsys.readouterr().out)
+    assert written == document
+    assert written["_aws"]["CloudWatchMetrics"][0]["Metrics"] == [{"Name": "solver_hedge_rate"}]
+    assert written["solver_hedge_rate"] == 0.5
@@ -0,0 +1,15 @@
+from codenames.classic.state import ClassicGameState
+from the_spymaster_api.structs import Solver
+
+from server.logic.next_move_classic import ClassicNextMoveHandler
+from server.logic.solvers import get_solvers_client
+from the_spymaster.config import get_config
+
+
+def test_next_move_handlers_share_the_pooled_solvers_client():
+    game_state = ClassicGameState.from_language(language="english")
+    handlers = [ClassicNextMoveHandler(game_id=str(i), game_state=game_state, solver=Solver.NAIVE) for i in range(2)]
+    adapter = get_solvers_client().session.get_adapter("https://solvers")
+
+    assert all(handler.solvers_client is get_solvers_client() for handler in handlers)
+    assert adapter._pool_maxsize == get_config().solvers_pool_maxsize  # pylint: disable=protected-access
@@ -0,0 +1,78 @@
+import threading
+import time
+from unittest.mock import patch
+
+from codenames.classic.team import ClassicTeam
+
+from server.logic.state_pool import ItemPool, new_classic_state
+
+
+def _wait_for_pool(pool: ItemPool, key: str, amount: int, timeout: float = 5) -> None:
+    deadline = time.time() + timeout
+    while pool.pooled(key) < amount and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_empty_pool_generates_on_the_caller_thread_and_refills():
+    pool: ItemPool[str, int] = ItemPool(size=4)
+
+    first = pool.pop("key", generate=threading.get_ident)
+    _wait_for_pool(pool, "key", amount=4)
+    pooled = [pool.pop("key", generate=threading.get_ident) for _ in range(2)]
+
+    assert first == threading.get_ident()
+    assert len(pooled) == 2
+    assert threading.get_ident() not in pooled
+    assert pool.stats.misses == 1
+    assert pool.stats.hits == 2
+
+
+def test_pool_items_are_handed_out_once():
+    pool: ItemPool[str, object] = ItemPool(size=8)
+    pool.fill("key", generate=object)
+
+    items = [pool.pop("key", generate=object) for _ in range(8)]
+
+    assert len({id(item) for item in items}) == 8
+
+
+def test_disabled_pool_always_generates():
+    pool: ItemPool[str, int] = ItemPool(size=0)
+
+    items = [pool.pop("key", generate=lambda: 1) for _ in range(3)]
+
+    assert items == [1, 1, 1]
+    assert pool.pooled("key") == 0
+    assert pool.stats.generated == 0
+
+
+def test_pooled_states_are_fresh_boards_of_the_requested_options():
+    states = [new_classic_state(language="english", first_team=ClassicTeam.RED) for _ in range(3)]
+
+    assert all(state.current_team == ClassicTeam.RED for state in states)
+    assert all(not state.given_clues for state in states)
+    assert len({id(state.board) for state in states}) == 3
+
+
+def test_refill_emits_the_cold_and_refill_latencies():
+    pool: ItemPool[str, object] = ItemPool(size=2, name="test_pool")
+
+    def generate() -> object:
+        time.sleep(0.01)
+        return object()
+
+    def get_emitted() -> list:
+        # Refills of the shared state pool may emit as well.
+        return [call.args[0] for call in mock_emit.call_args_list if "test_pool_hit_rate" in call.args[0]]
+
+    with patch("server.logic.state_pool.emit_metrics") as mock_emit:
+        pool.pop("key", generate=generate)
+        deadline = time.time() + 5
+        while not get_emitted() and time.time() < deadline:
+            time.sleep(0.01)
+
+    [metrics] = get_emitted()
+    assert set(metrics) == {"test_pool_hit_rate", "test_pool_cold_ms", "test_pool_refill_ms"}
+    assert metrics["test_pool_hit_rate"] == 0.0
+    assert metrics["test_pool_cold_ms"] >= 10
+    assert metrics["test_pool_refill_ms"] >= 10
@@ -1,7 +1,7 @@
 from django.test import TestCase, override_settings
 from moto.dynamodb import mock_dynamodb
 
-from server.logic.db import GameItem
+from server.logic.stores.dynamo import GameItem
 from the_spymaster.config import get_config
 
 
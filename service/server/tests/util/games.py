@@ -0,0 +1,9 @@
+from codenames.generic.move import Clue
+
+from server.models.game import ClassicGame
+
+
+def give_clue(game: ClassicGame, word: str = "something", card_amount: int = 1) -> None:
+    game_state = game.state
+    game_state.process_clue(Clue(word=word, card_amount=card_amount))
+    game.set_state(game_state)
@@ -14,12 +14,16 @@ from the_spymaster_util.http.defs import CONTEXT_ID_HEADER_KEY
 from the_spymaster_util.http.errors import BadRequestError
 from the_spymaster_util.logger import get_logger
 
+from server.logic.serialization import dump_response_json, dump_scope
+from server.views.json_body import is_json_request, load_json_body
+
 log = get_logger(__name__)
 
 RequestType = Union[BaseModel, BaseRequest]
 ResponseType = Union[dict, BaseModel, HttpResponse, DjangoHttpResponse]
 ALLOWED_REQUEST_TYPES = RequestType.__args__  # type: ignore
 ALLOWED_RESPONSE_TYPES = ResponseType.__args__  # type: ignore
+JSON_CONTENT_TYPE = "application/json"
 
 
 class EndpointConfigurationError(Exception):
@@ -70,8 +74,9 @@ def endpoint(
         def wrapper(view, request: Request, *args, **kwargs):  # pylint: disable=unused-argument
             log.update_context(endpoint_name=endpoint_name, django_user_id=request.user.id)
             parsed_request = _parse_request(request_model=request_model, drf_request=request)
-            response = f(view, parsed_request)
-            json_response = _get_json_response(response=response)
+            with dump_scope():
+                response = f(view, parsed_request)
+                json_response = _get_json_response(response=response, request=parsed_request)
             if getattr(parsed_request, "debug", False):
                 log.info("Response data", extra={"content": json_response.content})
             return json_response
@@ -111,25 +116,54 @@ def _get_request_response_models(func) -> Tuple[Type[BaseRequest], Type]:
 
 
 def _parse_request(request_model: Type[BaseModel], drf_request: Request) -> BaseModel:
-    query_params = dict(drf_request.query_params.items())
-    shared_keys = set(query_params.keys()) & set(drf_request.data.keys())
-    if shared_keys:
-        raise BadRequestError(
-            message="Request parsing failed.",
-            data={"details": f"Query params and body cannot share keys: {shared_keys}"},
-        )
-    data = {**query_params, **drf_request.data}
     try:
-        parsed_request = request_model(drf_request=drf_request, **data)
+        parsed_request = _validate_request(request_model=request_model, drf_request=drf_request)
+    except BadRequestError:
+        raise
     except Exception as e:  # pylint: disable=invalid-name
         details = e.errors() if isinstance(e, ValidationError) else str(e)  # pylint: disable=no-member
         raise BadRequestError(message="Request parsing failed.", data={"details": details}) from e
+    if isinstance(parsed_request, BaseRequest):
+        parsed_request.drf_request = drf_request  # type: ignore[attr-defined]
     return parsed_request
 
 
-def _get_json_response(response: ResponseType) -> JsonResponse:
+def _validate_request(request_model: Type[BaseModel], drf_request: Request) -> BaseModel:
+    django_request = drf_request._request  # pylint: disable=protected-access
+    query_params = drf_request.query_params
+    if is_json_request(django_request):
+        # Fast path: skips DRF's parsers, and validates the raw bytes (whatever the log level, which decides whether
+        # the logging middleware decoded a copy of the body).
+        if not query_params:
+            return request_model.model_validate_json(django_request.body)
+        body = load_json_body(django_request)
+        if body is None:
+            raise BadRequestError(message="Request parsing failed.", data={"details": "Body is not a JSON object"})
+    else:
+        body = drf_request.data
+    shared_keys = query_params.keys() & body.keys()
+    if shared_keys:
+        raise BadRequestError(
+            message="Request parsing failed.",
+            data={"details": f"Query params and body cannot share keys: {shared_keys}"},
+        )
+    return request_model.model_validate({**query_params.dict(), **body})
+
+
+def _get_json_response(response: ResponseType, request: BaseModel) -> DjangoHttpResponse:
     headers = {CONTEXT_ID_HEADER_KEY: log.context_id}
     status_code = status.HTTP_200_OK
+    if isinstance(response, HttpResponse):
+        if response.headers:
+            headers.update(response.headers)
+        if response.status_code == status.HTTP_304_NOT_MODIFIED:
+            return DjangoHttpResponse(status=response.status_code, headers=headers)
+        if isinstance(response.body, BaseModel):
+            return _render_model(
+                response=response.body, request=request, status_code=response.status_code, headers=headers
+            )
+    elif isinstance(response, BaseModel):
+        return _render_model(response=response, request=request, status_code=status_code, headers=headers)
     if response is None:
         data = {"message": "No content"}
     elif isinstance(response, dict):
@@ -137,10 +171,6 @@ def _get_json_response(response: ResponseType) -> JsonResponse:
     elif isinstance(response, HttpResponse):
         status_code = response.status_code
         data = response.data
-        if response.headers:
-            headers.update(response.headers)
-    elif isinstance(response, BaseModel):
-        data = response.model_dump()
     elif isinstance(response, DjangoHttpResponse):
         status_code = response.status_code
         response_body = response.content.decode("utf-8")
@@ -153,3 +183,13 @@ def _get_json_response(response: ResponseType) -> JsonResponse:
             supported_types=ALLOWED_RESPONSE_TYPES,
         )
     return JsonResponse(data=data, status=status_code, headers=headers)
+
+
+def _render_model(response: BaseModel, request: BaseModel, status_code: int, headers: dict) -> DjangoHttpResponse:
+    # Fast path: straight to bytes, skipping the intermediate dict and Django's pure Python encoder.
+    if isinstance(request, BaseRequest) and request.is_projected:
+        include, exclude = request.get_response_include(), request.get_response_exclude()
+        content = dump_response_json(response, include=include, exclude=exclude)
+    else:
+        content = dump_response_json(response)
+    return DjangoHttpResponse(content=content, status=status_code, headers=headers, content_type=JSON_CONTENT_TYPE)
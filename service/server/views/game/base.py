@@ -1,18 +1,40 @@
 # pylint: disable=R0801
 
+import hashlib
+import time
+from typing import Any, Callable
+
 import requests
 import ulid
+from pydantic import BaseModel
+from rest_framework import status
 from rest_framework.viewsets import GenericViewSet
-from the_spymaster_api.structs import BaseRequest, HttpResponse
+from the_spymaster_api.structs import (
+    BaseRequest,
+    GameSummary,
+    GameType,
+    GetGameStateRequest,
+    HttpResponse,
+    ListGamesRequest,
+    ListGamesResponse,
+    NextMoveBatchRequest,
+    NextMoveBatchResponse,
+)
+from the_spymaster_api.structs.abstract.responses import GetGameStateResponse
 from the_spymaster_solvers_api.structs.requests import LoadModelsRequest
 from the_spymaster_solvers_api.structs.responses import LoadModelsResponse
-from the_spymaster_util.http.errors import BadRequestError
+from the_spymaster_util.http.errors import BadRequestError, UnauthenticatedError
 from the_spymaster_util.logger import get_logger
 
+from server.logic.db import list_games, load_state_delta
+from server.logic.next_move_batch import play_next_moves
 from server.logic.solvers import get_solvers_client
+from server.models.game import Game
 from server.views.endpoint import HttpMethod, endpoint
+from the_spymaster.config import get_config
 
 log = get_logger(__name__)
+config = get_config()
 
 
 class GameView(GenericViewSet):
@@ -25,6 +47,23 @@ class GameView(GenericViewSet):
         response = self.solvers_client.load_models(request)
         return response
 
+    @endpoint(methods=[HttpMethod.GET], url_path="list")
+    def list_games(self, request: ListGamesRequest) -> ListGamesResponse:
+        owner = get_owner(request)
+        if owner is None:
+            raise UnauthenticatedError(message="Log in to list your games.")
+        listings, next_cursor = list_games(owner=owner, limit=request.limit, cursor=request.cursor)
+        games = [
+            GameSummary(game_id=listing.game_id, game_type=GameType(listing.game_type), updated_ts=listing.updated_ts)
+            for listing in listings
+        ]
+        return ListGamesResponse(games=games, next_cursor=next_cursor)
+
+    @endpoint(url_path="next-move-batch")
+    def next_move_batch(self, request: NextMoveBatchRequest) -> NextMoveBatchResponse:
+        results = play_next_moves(request, deadline=get_request_deadline(request))
+        return NextMoveBatchResponse(results=results)
+
     @endpoint(methods=[HttpMethod.GET])
     def test(self, request: BaseRequest) -> HttpResponse:  # pylint: disable=unused-argument
         body = {"details": "It seems everything is working!"}
@@ -45,5 +84,87 @@ class GameView(GenericViewSet):
         return HttpResponse(body=body)
 
 
+def get_owner(request: BaseRequest) -> str | None:
+    """
+    Games are owned by the user who started them. Games of anonymous users are not owned.
+    """
+    user = request.preforming_user
+    if user is None or not user.is_authenticated:
+        return None
+    return str(user.id)
+
+
+def get_request_deadline(request: BaseRequest) -> float | None:
+    """
+    The `time.monotonic` timestamp by which the solvers must answer: the invocation's remaining Lambda time, minus
+    `solvers_deadline_margin` for saving the game and responding. None when not running on Lambda.
+    """
+    drf_request = getattr(request, "drf_request", None)
+    scope = getattr(getattr(drf_request, "_request", None), "scope", None) or {}
+    lambda_context = scope.get("aws.context")
+    if lambda_context is None:
+        return None
+    remaining = lambda_context.get_remaining_time_in_millis() / 1000
+    return time.monotonic() + remaining - config.solvers_deadline_margin
+
+
+def get_game_state_response(
+    request: GetGameStateRequest, game: Game[Any], response_type: type[GetGameStateResponse]
+) -> HttpResponse:
+    """
+    Answers with the changes since the request's `since_version` when the move log has them, and with the full state
+    otherwise. The delta is built from the stored moves, without parsing or serializing the game state.
+    Only games stored as a move log (`game_storage_mode = "move_log"`) have moves: in the default "full" mode,
+    every request is answered with the full state.
+    """
+
+    def build_response() -> GetGameStateResponse:
+        if request.since_version is not None:
+            state_delta = load_state_delta(game=game, since_version=request.since_version)
+            if state_delta is not None:
+                return response_type(version=game.version, state_delta=state_delta)
+        return response_type(game_state=game.state, version=game.version)
+
+    return get_conditional_response(request, game, build_response)
+
+
+def get_conditional_response(
+    request: GetGameStateRequest, game: Game[Any], build_response: Callable[[], BaseModel]
+) -> HttpResponse:
+    """
+    Answers a request whose `If-None-Match` matches the game's ETag with a 304, without parsing or serializing
+    the game state.
+    """
+    etag = _get_game_etag(request=request, game=game)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request=request, etag=etag):
+        return HttpResponse(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers, body={})
+    return HttpResponse(body=build_response(), headers=headers)
+
+
+def _get_game_etag(request: GetGameStateRequest, game: Game[Any]) -> str:
+    # The version changes on every save. Deltas and projected responses have a different body, so they get a
+    # different tag.
+    tag = f"{game.id}.{game.version}"
+    if request.since_version is not None:
+        tag += f".{request.since_version}"
+    if request.is_projected:
+        projection = f"{sorted(request.fields or [])}.{request.include_state}".encode()
+        tag += f".{hashlib.sha1(projection, usedforsecurity=False).hexdigest()[:8]}"
+    return f'"{tag}"'
+
+
+def _etag_matches(request: BaseRequest, etag: str) -> bool:
+    drf_request = getattr(request, "drf_request", None)
+    if_none_match = drf_request.headers.get("If-None-Match") if drf_request else None
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match.
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return etag in candidates
+
+
 def ulid_lower():
     return ulid.new().str.lower()
@@ -1,16 +1,16 @@
-from codenames.classic.board import ClassicBoard
-from codenames.classic.state import ClassicGameState
 from codenames.generic.move import Clue, Guess
-from codenames.utils.vocabulary.languages import get_vocabulary
 from rest_framework.viewsets import GenericViewSet
 from the_spymaster_api.structs import (
+    AutoPlayRequest,
     ClueRequest,
     GetGameStateRequest,
     GuessRequest,
+    HttpResponse,
     NextMoveRequest,
 )
 from the_spymaster_api.structs.classic.requests import ClassicStartGameRequest
 from the_spymaster_api.structs.classic.responses import (
+    ClassicAutoPlayResponse,
     ClassicClueResponse,
     ClassicGetGameStateResponse,
     ClassicGuessResponse,
@@ -19,11 +19,20 @@ from the_spymaster_api.structs.classic.responses import (
 )
 from the_spymaster_util.logger import get_logger
 
-from server.logic.db import load_game, save_game
+from server.logic.auto_play import auto_play_game, to_played_moves
+from server.logic.db import load_game, retry_on_conflict, save_game
+from server.logic.next_move import play_next_move
 from server.logic.next_move_classic import ClassicNextMoveHandler
+from server.logic.state_pool import new_classic_state
+from server.logic.stores import ReadConsistency
 from server.models.game import ClassicGame
 from server.views.endpoint import HttpMethod, endpoint
-from server.views.game.base import ulid_lower
+from server.views.game.base import (
+    get_game_state_response,
+    get_owner,
+    get_request_deadline,
+    ulid_lower,
+)
 
 log = get_logger(__name__)
 
@@ -32,15 +41,14 @@ class ClassicGameView(GenericViewSet):
 
     @endpoint
     def start(self, request: ClassicStartGameRequest) -> ClassicStartGameResponse:
-        vocabulary = get_vocabulary(language=request.language)
-        board = ClassicBoard.from_vocabulary(vocabulary=vocabulary, first_team=request.first_team)
-        game_state = ClassicGameState.from_board(board=board)
-        game = ClassicGame(id=ulid_lower(), state_data=game_state.model_dump())
+        game_state = new_classic_state(language=request.language, first_team=request.first_team)
+        game = ClassicGame.from_state(id=ulid_lower(), state=game_state, owner=get_owner(request))
         save_game(game)
         log.info(f"Starting classic game: {game.id}")
         return ClassicStartGameResponse(game_id=game.id, game_state=game_state)
 
     @endpoint
+    @retry_on_conflict
     def clue(self, request: ClueRequest) -> ClassicClueResponse:
         game = load_game(request.game_id, game_type=ClassicGame)
         game_state = game.state
@@ -48,37 +56,44 @@ class ClassicGameView(GenericViewSet):
         for_words = tuple(request.for_words) if request.for_words else None
         clue = Clue(word=request.word, card_amount=request.card_amount, for_words=for_words)
         given_clue = game_state.process_clue(clue)
-        game.state_data = game_state.model_dump()
+        game.set_state(game_state)
         save_game(game)
+        ClassicNextMoveHandler.speculate(game_id=game.id, game_state=game_state)
         return ClassicClueResponse(given_clue=given_clue, game_state=game_state)
 
     @endpoint
+    @retry_on_conflict
     def guess(self, request: GuessRequest) -> ClassicGuessResponse:
         game = load_game(request.game_id, game_type=ClassicGame)
         game_state = game.state
         log.debug(f"Processing guess for game [{game.id}]: [{request.card_index}]")
         guess = Guess(card_index=request.card_index)
         given_guess = game_state.process_guess(guess)
-        game.state_data = game_state.model_dump()
+        game.set_state(game_state)
         save_game(game)
+        ClassicNextMoveHandler.speculate(game_id=game.id, game_state=game_state)
         return ClassicGuessResponse(given_guess=given_guess, game_state=game_state)
 
     @endpoint(methods=[HttpMethod.GET], url_path="state")
-    def get_game_state(self, request: GetGameStateRequest) -> ClassicGetGameStateResponse:
-        game = load_game(request.game_id, game_type=ClassicGame)
-        return ClassicGetGameStateResponse(game_state=game.state)
+    def get_game_state(self, request: GetGameStateRequest) -> HttpResponse:
+        game = load_game(request.game_id, game_type=ClassicGame, consistency=ReadConsistency.EVENTUAL)
+        return get_game_state_response(request, game, response_type=ClassicGetGameStateResponse)
 
     @endpoint(url_path="next-move")
     def next_move(self, request: NextMoveRequest) -> ClassicNextMoveResponse:
         game = load_game(request.game_id, game_type=ClassicGame)
-        game_state = game.state
-        handler = ClassicNextMoveHandler(
-            game_id=game.id,
-            game_state=game_state,
+        return play_next_move(
+            game,
+            handler_type=ClassicNextMoveHandler,
             solver=request.solver,
             model_identifier=request.model_identifier,
+            deadline=get_request_deadline(request),
         )
-        response = handler.handle()
-        game.state_data = handler.game_state.model_dump()
-        save_game(game)
-        return response
+
+    @endpoint(url_path="auto-play")
+    def auto_play(self, request: AutoPlayRequest) -> ClassicAutoPlayResponse:
+        game = load_game(request.game_id, game_type=ClassicGame)
+        played = auto_play_game(
+            game, handler_type=ClassicNextMoveHandler, request=request, deadline=get_request_deadline(request)
+        )
+        return ClassicAutoPlayResponse.model_validate({"game_state": game.state, "moves": to_played_moves(played)})
@@ -1,31 +1,40 @@
 # pylint: disable=R0801
 
-from codenames.duet.board import DuetBoard
-from codenames.duet.state import DuetGameState
 from codenames.generic.move import Clue, Guess
-from codenames.utils.vocabulary.languages import get_vocabulary
 from rest_framework.viewsets import GenericViewSet
 from the_spymaster_api.structs import (
+    AutoPlayRequest,
     ClueRequest,
     GetGameStateRequest,
     GuessRequest,
+    HttpResponse,
     NextMoveRequest,
 )
 from the_spymaster_api.structs.duet.requests import DuetStartGameRequest
 from the_spymaster_api.structs.duet.responses import (
+    DuetAutoPlayResponse,
     DuetClueResponse,
     DuetGetGameStateResponse,
     DuetGuessResponse,
     DuetNextMoveResponse,
     DuetStartGameResponse,
 )
-from the_spymaster_util.http.errors import BadRequestError
 from the_spymaster_util.logger import get_logger
 
-from server.logic.db import load_game, save_game
+from server.logic.auto_play import auto_play_game, to_played_moves
+from server.logic.db import load_game, retry_on_conflict, save_game
+from server.logic.next_move import play_next_move
+from server.logic.next_move_duet import DuetNextMoveHandler
+from server.logic.state_pool import new_duet_state
+from server.logic.stores import ReadConsistency
 from server.models.game import DuetGame
 from server.views.endpoint import HttpMethod, endpoint
-from server.views.game.base import ulid_lower
+from server.views.game.base import (
+    get_game_state_response,
+    get_owner,
+    get_request_deadline,
+    ulid_lower,
+)
 
 log = get_logger(__name__)
 
@@ -34,17 +43,16 @@ class DuetGameView(GenericViewSet):
 
     @endpoint
     def start(self, request: DuetStartGameRequest) -> DuetStartGameResponse:
-        vocabulary = get_vocabulary(language=request.language)
-        board = DuetBoard.from_vocabulary(vocabulary=vocabulary)
-        game_state = DuetGameState.from_board(board=board)
+        game_state = new_duet_state(language=request.language)
         game_state.timer_tokens = request.timer_tokens
         game_state.allowed_mistakes = request.allowed_mistakes
-        game = DuetGame(id=ulid_lower(), state_data=game_state.model_dump())
+        game = DuetGame.from_state(id=ulid_lower(), state=game_state, owner=get_owner(request))
         save_game(game)
         log.info(f"Starting duet game: {game.id}")
         return DuetStartGameResponse(game_id=game.id, game_state=game_state)
 
     @endpoint
+    @retry_on_conflict
     def clue(self, request: ClueRequest) -> DuetClueResponse:
         game = load_game(request.game_id, game_type=DuetGame)
         game_state = game.state
@@ -52,35 +60,44 @@ class DuetGameView(GenericViewSet):
         for_words = tuple(request.for_words) if request.for_words else None
         clue = Clue(word=request.word, card_amount=request.card_amount, for_words=for_words)
         given_clue = game_state.process_clue(clue)
-        game.state_data = game_state.model_dump()
+        game.set_state(game_state)
         save_game(game)
+        DuetNextMoveHandler.speculate(game_id=game.id, game_state=game_state)
         return DuetClueResponse(given_clue=given_clue, game_state=game_state)
 
     @endpoint
+    @retry_on_conflict
     def guess(self, request: GuessRequest) -> DuetGuessResponse:
         game = load_game(request.game_id, game_type=DuetGame)
         game_state = game.state
         log.debug(f"Processing guess for game [{game.id}]: [{request.card_index}]")
         guess = Guess(card_index=request.card_index)
         given_guess = game_state.process_guess(guess)
-        game.state_data = game_state.model_dump()
+        game.set_state(game_state)
         save_game(game)
+        DuetNextMoveHandler.speculate(game_id=game.id, game_state=game_state)
         return DuetGuessResponse(given_guess=given_guess, game_state=game_state)
 
     @endpoint(methods=[HttpMethod.GET], url_path="state")
-    def get_game_state(self, request: GetGameStateRequest) -> DuetGetGameStateResponse:
-        game = load_game(request.game_id, game_type=DuetGame)
-        return DuetGetGameStateResponse(game_state=game.state)
+    def get_game_state(self, request: GetGameStateRequest) -> HttpResponse:
+        game = load_game(request.game_id, game_type=DuetGame, consistency=ReadConsistency.EVENTUAL)
+        return get_game_state_response(request, game, response_type=DuetGetGameStateResponse)
 
     @endpoint(url_path="next-move")
     def next_move(self, request: NextMoveRequest) -> DuetNextMoveResponse:
-        raise BadRequestError(message="Not implemented")
-        # game = get_or_create(request.game_id, game_type=DuetGame)
-        # game_state = game.state
-        # handler = NextMoveHandler(
-        #     game_state=game_state, solver=request.solver, model_identifier=request.model_identifier
-        # )
-        # response = handler.handle()
-        # game.state_data = handler.game_state.model_dump()
-        # save_game(game)
-        # return response
+        game = load_game(request.game_id, game_type=DuetGame)
+        return play_next_move(
+            game,
+            handler_type=DuetNextMoveHandler,
+            solver=request.solver,
+            model_identifier=request.model_identifier,
+            deadline=get_request_deadline(request),
+        )
+
+    @endpoint(url_path="auto-play")
+    def auto_play(self, request: AutoPlayRequest) -> DuetAutoPlayResponse:
+        game = load_game(request.game_id, game_type=DuetGame)
+        played = auto_play_game(
+            game, handler_type=DuetNextMoveHandler, request=request, deadline=get_request_deadline(request)
+        )
+        return DuetAutoPlayResponse.model_validate({"game_state": game.state, "moves": to_played_moves(played)})
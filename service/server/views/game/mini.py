@@ -1,17 +1,17 @@
 # pylint: disable=R0801
-from codenames.duet.board import DuetBoard
 from codenames.generic.move import Clue, Guess
-from codenames.mini.state import MiniGameState
-from codenames.utils.vocabulary.languages import get_vocabulary
 from rest_framework.viewsets import GenericViewSet
 from the_spymaster_api.structs import (
+    AutoPlayRequest,
     ClueRequest,
     GetGameStateRequest,
     GuessRequest,
+    HttpResponse,
     NextMoveRequest,
 )
 from the_spymaster_api.structs.mini.requests import MiniStartGameRequest
 from the_spymaster_api.structs.mini.responses import (
+    MiniAutoPlayResponse,
     MiniClueResponse,
     MiniGetGameStateResponse,
     MiniGuessResponse,
@@ -20,11 +20,20 @@ from the_spymaster_api.structs.mini.responses import (
 )
 from the_spymaster_util.logger import get_logger
 
-from server.logic.db import load_game, save_game
+from server.logic.auto_play import auto_play_game, to_played_moves
+from server.logic.db import load_game, retry_on_conflict, save_game
+from server.logic.next_move import play_next_move
 from server.logic.next_move_mini import MiniNextMoveHandler
+from server.logic.state_pool import new_mini_state
+from server.logic.stores import ReadConsistency
 from server.models.game import MiniGame
 from server.views.endpoint import HttpMethod, endpoint
-from server.views.game.base import ulid_lower
+from server.views.game.base import (
+    get_game_state_response,
+    get_owner,
+    get_request_deadline,
+    ulid_lower,
+)
 
 log = get_logger(__name__)
 
@@ -33,17 +42,16 @@ class MiniGameView(GenericViewSet):
 
     @endpoint
     def start(self, request: MiniStartGameRequest) -> MiniStartGameResponse:
-        vocabulary = get_vocabulary(language=request.language)
-        board = DuetBoard.from_vocabulary(vocabulary=vocabulary, green_amount=request.total_points)
-        game_state = MiniGameState.from_board(board=board)
+        game_state = new_mini_state(language=request.language, green_amount=request.total_points)
         game_state.timer_tokens = request.timer_tokens
         game_state.allowed_mistakes = request.allowed_mistakes
-        game = MiniGame(id=ulid_lower(), state_data=game_state.model_dump())
+        game = MiniGame.from_state(id=ulid_lower(), state=game_state, owner=get_owner(request))
         save_game(game)
         log.info(f"Starting mini game: {game.id}")
         return MiniStartGameResponse(game_id=game.id, game_state=game_state)
 
     @endpoint
+    @retry_on_conflict
     def clue(self, request: ClueRequest) -> MiniClueResponse:
         game = load_game(request.game_id, game_type=MiniGame)
         game_state = game.state
@@ -51,37 +59,44 @@ class MiniGameView(GenericViewSet):
         for_words = tuple(request.for_words) if request.for_words else None
         clue = Clue(word=request.word, card_amount=request.card_amount, for_words=for_words)
         given_clue = game_state.process_clue(clue)
-        game.state_data = game_state.model_dump()
+        game.set_state(game_state)
         save_game(game)
+        MiniNextMoveHandler.speculate(game_id=game.id, game_state=game_state)
         return MiniClueResponse(given_clue=given_clue, game_state=game_state)
 
     @endpoint
+    @retry_on_conflict
     def guess(self, request: GuessRequest) -> MiniGuessResponse:
         game = load_game(request.game_id, game_type=MiniGame)
         game_state = game.state
         log.debug(f"Processing guess for game [{game.id}]: [{request.card_index}]")
         guess = Guess(card_index=request.card_index)
         given_guess = game_state.process_guess(guess)
-        game.state_data = game_state.model_dump()
+        game.set_state(game_state)
         save_game(game)
+        MiniNextMoveHandler.speculate(game_id=game.id, game_state=game_state)
         return MiniGuessResponse(given_guess=given_guess, game_state=game_state)
 
     @endpoint(methods=[HttpMethod.GET], url_path="state")
-    def get_game_state(self, request: GetGameStateRequest) -> MiniGetGameStateResponse:
-        game = load_game(request.game_id, game_type=MiniGame)
-        return MiniGetGameStateResponse(game_state=game.state)
+    def get_game_state(self, request: GetGameStateRequest) -> HttpResponse:
+        game = load_game(request.game_id, game_type=MiniGame, consistency=ReadConsistency.EVENTUAL)
+        return get_game_state_response(request, game, response_type=MiniGetGameStateResponse)
 
     @endpoint(url_path="next-move")
     def next_move(self, request: NextMoveRequest) -> MiniNextMoveResponse:
         game = load_game(request.game_id, game_type=MiniGame)
-        game_state = game.state
-        handler = MiniNextMoveHandler(
-            game_id=game.id,
-            game_state=game_state,
+        return play_next_move(
+            game,
+            handler_type=MiniNextMoveHandler,
             solver=request.solver,
             model_identifier=request.model_identifier,
+            deadline=get_request_deadline(request),
         )
-        response = handler.handle()
-        game.state_data = handler.game_state.model_dump()
-        save_game(game)
-        return response
+
+    @endpoint(url_path="auto-play")
+    def auto_play(self, request: AutoPlayRequest) -> MiniAutoPlayResponse:
+        game = load_game(request.game_id, game_type=MiniGame)
+        played = auto_play_game(
+            game, handler_type=MiniNextMoveHandler, request=request, deadline=get_request_deadline(request)
+        )
+        return MiniAutoPlayResponse.model_validate({"game_state": game.state, "moves": to_played_moves(played)})
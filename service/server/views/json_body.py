@@ -0,0 +1,34 @@
+import json
+from typing import Any
+
+from django.http import HttpRequest
+
+# Set on the Django request, so the body is decoded at most once per request (by the first middleware or view).
+_JSON_BODY_ATTRIBUTE = "_spymaster_json_body"
+_NOT_JSON = object()
+
+
+def is_json_request(request: HttpRequest) -> bool:
+    return request.content_type == "application/json" and bool(request.body)
+
+
+def load_json_body(request: HttpRequest) -> dict | None:
+    """
+    Returns the decoded JSON object body, or None if the body is not a JSON object.
+    The result is shared, and must not be mutated.
+    """
+    cached: Any = getattr(request, _JSON_BODY_ATTRIBUTE, None)
+    if cached is None:
+        cached = _decode(request)
+        setattr(request, _JSON_BODY_ATTRIBUTE, cached)
+    return None if cached is _NOT_JSON else cached
+
+
+def _decode(request: HttpRequest) -> Any:
+    if not is_json_request(request):
+        return _NOT_JSON
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return _NOT_JSON
+    return data if isinstance(data, dict) else _NOT_JSON
@@ -6,7 +6,7 @@ from the_spymaster_util.config import LazyConfig
 log = logging.getLogger(__name__)
 
 
-class Config(LazyConfig):
+class Config(LazyConfig):  # pylint: disable=too-many-public-methods
     def load(self, extra_files: Optional[List[str]] = None):
         super().load(extra_files)
         if self.load_ssm_secrets:
@@ -54,6 +54,111 @@ class Config(LazyConfig):
     def game_items_table_name(self) -> str:
         return self.get("game_items_table_name") or f"{self.service_prefix}-game-items"
 
+    @property
+    def game_store(self) -> str:
+        return self.get("GAME_STORE", "dynamodb")
+
+    @property
+    def game_store_sqlite_path(self) -> str:
+        return self.get("GAME_STORE_SQLITE_PATH", "games.sqlite3")
+
+    @property
+    def game_batch_max_workers(self) -> int:
+        return int(self.get("GAME_BATCH_MAX_WORKERS", 8))
+
+    @property
+    def game_finished_ttl_days(self) -> float:
+        return float(self.get("GAME_FINISHED_TTL_DAYS", 30))
+
+    @property
+    def game_abandoned_ttl_days(self) -> float:
+        return float(self.get("GAME_ABANDONED_TTL_DAYS", 90))
+
+    @property
+    def game_archive_url(self) -> str | None:
+        return self.get("GAME_ARCHIVE_URL")
+
+    @property
+    def game_archive_endpoint_url(self) -> str | None:
+        return self.get("GAME_ARCHIVE_ENDPOINT_URL")
+
+    @property
+    def game_archive_lead_days(self) -> float:
+        return float(self.get("GAME_ARCHIVE_LEAD_DAYS", 3))
+
+    @property
+    def game_archive_batch_size(self) -> int:
+        return int(self.get("GAME_ARCHIVE_BATCH_SIZE", 500))
+
+    @property
+    def game_cache_max_size(self) -> int:
+        return int(self.get("GAME_CACHE_MAX_SIZE", 256))
+
+    @property
+    def game_cache_ttl(self) -> float:
+        return float(self.get("GAME_CACHE_TTL", 300))
+
+    @property
+    def game_cache_validate_after(self) -> float:
+        return float(self.get("GAME_CACHE_VALIDATE_AFTER", 0))
+
+    @property
+    def game_save_conflict_retries(self) -> int:
+        return int(self.get("GAME_SAVE_CONFLICT_RETRIES", 2))
+
+    @property
+    def game_storage_mode(self) -> str:
+        return self.get("GAME_STORAGE_MODE", "full")
+
+    @property
+    def game_snapshot_interval(self) -> int:
+        return int(self.get("GAME_SNAPSHOT_INTERVAL", 10))
+
+    @property
+    def game_superseded_moves_ttl(self) -> float:
+        return float(self.get("GAME_SUPERSEDED_MOVES_TTL", 600))
+
+    @property
+    def game_state_codec(self) -> str:
+        return self.get("GAME_STATE_CODEC", "json-attribute")
+
+    @property
+    def move_cache_max_size(self) -> int:
+        return int(self.get("MOVE_CACHE_MAX_SIZE", 1024))
+
+    @property
+    def move_cache_ttl(self) -> float:
+        return float(self.get("MOVE_CACHE_TTL", 3600))
+
+    @property
+    def move_cache_persist(self) -> bool:
+        # Environment variables are strings.
+        return str(self.get("MOVE_CACHE_PERSIST", False)).lower() == "true"
+
+    @property
+    def move_cache_persist_ttl_days(self) -> float:
+        return float(self.get("MOVE_CACHE_PERSIST_TTL_DAYS", 7))
+
+    @property
+    def move_prefetch_carryover_wait(self) -> float:
+        return float(self.get("MOVE_PREFETCH_CARRYOVER_WAIT", 1))
+
+    @property
+    def next_move_speculation(self) -> bool:
+        return str(self.get("NEXT_MOVE_SPECULATION", False)).lower() == "true"
+
+    @property
+    def next_move_speculation_workers(self) -> int:
+        return int(self.get("NEXT_MOVE_SPECULATION_WORKERS", 4))
+
+    @property
+    def next_move_batch_max_workers(self) -> int:
+        return int(self.get("NEXT_MOVE_BATCH_MAX_WORKERS", 16))
+
+    @property
+    def board_pool_size(self) -> int:
+        return int(self.get("BOARD_POOL_SIZE", 16))
+
     @property
     def django_secret_key(self) -> str:
         value = self.get(f"{self.service_prefix}-django-secret-key") or self.get("DJANGO_SECRET_KEY")
@@ -71,6 +176,67 @@ class Config(LazyConfig):
     def solvers_backend_url(self) -> str:
         return self.get("SOLVERS_BACKEND_URL") or "http://localhost:5000"
 
+    @property
+    def solvers_pool_maxsize(self) -> int:
+        return int(self.get("SOLVERS_POOL_MAXSIZE", 32))
+
+    @property
+    def solvers_read_timeout(self) -> float:
+        return float(self.get("SOLVERS_READ_TIMEOUT", 15))
+
+    @property
+    def solvers_deadline_margin(self) -> float:
+        return float(self.get("SOLVERS_DEADLINE_MARGIN", 1.5))
+
+    @property
+    def solvers_fallback_reserve(self) -> float:
+        return float(self.get("SOLVERS_FALLBACK_RESERVE", 2))
+
+    @property
+    def solvers_hedging(self) -> bool:
+        # A false setting falls back to the default, so the default must be false (settings.toml enables it).
+        return str(self.get("SOLVERS_HEDGING", False)).lower() == "true"
+
+    @property
+    def solvers_latency_window(self) -> int:
+        return int(self.get("SOLVERS_LATENCY_WINDOW", 200))
+
+    @property
+    def solvers_hedge_min_samples(self) -> int:
+        return int(self.get("SOLVERS_HEDGE_MIN_SAMPLES", 20))
+
+    @property
+    def solvers_breaker_failures(self) -> int:
+        return int(self.get("SOLVERS_BREAKER_FAILURES", 5))
+
+    @property
+    def solvers_breaker_reset_timeout(self) -> float:
+        return float(self.get("SOLVERS_BREAKER_RESET_TIMEOUT", 30))
+
+    @property
+    def metrics_emf(self) -> bool:
+        return str(self.get("METRICS_EMF", False)).lower() == "true"
+
+    @property
+    def metrics_namespace(self) -> str:
+        return self.get("METRICS_NAMESPACE", "TheSpymaster")
+
+    @property
+    def model_usage_flush_interval(self) -> float:
+        return float(self.get("MODEL_USAGE_FLUSH_INTERVAL", 60))
+
+    @property
+    def model_usage_ttl_days(self) -> float:
+        return float(self.get("MODEL_USAGE_TTL_DAYS", 7))
+
+    @property
+    def model_preload_lookback_hours(self) -> int:
+        return int(self.get("MODEL_PRELOAD_LOOKBACK_HOURS", 24))
+
+    @property
+    def model_preload_top(self) -> int:
+        return int(self.get("MODEL_PRELOAD_TOP", 8))
+
     @property
     def recaptcha_site_key(self) -> str:
         return self.get("RECAPTCHA_SITE_KEY")
@@ -9,4 +9,44 @@ resource "aws_dynamodb_table" "games_items" {
     name = "item_id"
     type = "S"
   }
+
+  attribute {
+    name = "owner"
+    type = "S"
+  }
+
+  attribute {
+    name = "updated_ts"
+    type = "N"
+  }
+
+  attribute {
+    name = "archive_shard"
+    type = "N"
+  }
+
+  attribute {
+    name = "expire_ts"
+    type = "N"
+  }
+
+  global_secondary_index {
+    name               = "owner-updated_ts-index"
+    hash_key           = "owner"
+    range_key          = "updated_ts"
+    projection_type    = "INCLUDE"
+    non_key_attributes = ["game_type"]
+  }
+
+  global_secondary_index {
+    name            = "archive_shard-expire_ts-index"
+    hash_key        = "archive_shard"
+    range_key       = "expire_ts"
+    projection_type = "KEYS_ONLY"
+  }
+
+  ttl {
+    attribute_name = "expire_ts"
+    enabled        = true
+  }
 }
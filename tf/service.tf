@@ -68,8 +68,21 @@ resource "aws_iam_role" "lambda_exec_role" {
               "dynamodb:DescribeTable",
               "dynamodb:GetItem",
               "dynamodb:PutItem",
+              "dynamodb:BatchGetItem",
+              "dynamodb:BatchWriteItem",
+              "dynamodb:UpdateItem",
             ],
             "Resource" : aws_dynamodb_table.games_items.arn
+          },
+          {
+            "Effect" : "Allow",
+            "Action" : [
+              "dynamodb:Query",
+            ],
+            "Resource" : [
+              "${aws_dynamodb_table.games_items.arn}/index/owner-updated_ts-index",
+              "${aws_dynamodb_table.games_items.arn}/index/archive_shard-expire_ts-index",
+            ]
           }
         ]
       }